@@ -0,0 +1,105 @@
+"""
+DAG Parse Benchmark:
+Imports dags/sales_pipeline_dag.py the way the scheduler does (by file
+path, in a fresh interpreter) and reports the wall time and tracemalloc
+peak of executing the DAG file, net of importing Airflow itself, plus any
+heavy modules (pandas, SQLAlchemy, Prophet, etl/forecast, ...) the parse
+pulled in. tests/test_dag_parse.py enforces DAG_PARSE_MAX_SECONDS and
+DAG_PARSE_MAX_MB on the same numbers. Needs Airflow installed.
+
+Usage:
+    python -m benchmarks.bench_dag_parse --runs 5
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+
+log = logging.getLogger("benchmarks.bench_dag_parse")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Repo checkout: dags/sales_pipeline_dag.py; Airflow image: the DAG sits next to benchmarks/ in /opt/airflow/dags
+DAG_FILE = next(
+    path for path in [
+        os.path.join(REPO_ROOT, "dags", "sales_pipeline_dag.py"),
+        os.path.join(REPO_ROOT, "sales_pipeline_dag.py"),
+    ] if os.path.exists(path)
+)
+DAG_PARSE_MAX_SECONDS = float(os.getenv("DAG_PARSE_MAX_SECONDS", "0.25"))
+DAG_PARSE_MAX_MB = float(os.getenv("DAG_PARSE_MAX_MB", "15"))
+
+# Modules the parse loop must never pay for; they belong to task execution
+HEAVY_MODULES = ["pandas", "numpy", "sqlalchemy", "prophet", "cmdstanpy", "pyarrow", "psycopg2", "dotenv", "etl", "forecast"]
+
+# Runs in the child: import Airflow first (the scheduler already has it),
+# then time (and optionally trace) only the DAG file itself
+PROBE = """
+import importlib.util, json, sys, time, tracemalloc
+path, trace, heavy = sys.argv[1], sys.argv[2] == "1", sys.argv[3].split(",")
+import airflow
+import airflow.operators.python
+import airflow.providers.postgres.operators.postgres
+before = set(sys.modules)
+if trace:
+    tracemalloc.start()
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location("sales_pipeline_dag", path)
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+seconds = time.perf_counter() - started
+peak = tracemalloc.get_traced_memory()[1] if trace else 0
+added = set(sys.modules) - before
+print(json.dumps({
+    "seconds": seconds,
+    "peak_mb": peak / 2**20,
+    "modules": len(added),
+    "heavy": sorted(m for m in added if m.split(".")[0] in heavy),
+}))
+"""
+
+
+def probe(path=DAG_FILE, trace=False):
+    """One DAG import in a fresh interpreter; returns the PROBE result dict"""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, path, "1" if trace else "0", ",".join(HEAVY_MODULES)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(path=DAG_FILE, runs=5):
+    """
+    Median import time over `runs` untraced imports (tracemalloc slows
+    imports down) and the peak memory of one traced import.
+    """
+    timings = [probe(path)["seconds"] for _ in range(runs)]
+    traced = probe(path, trace=True)
+    return {
+        "seconds": statistics.median(timings),
+        "peak_mb": traced["peak_mb"],
+        "modules": traced["modules"],
+        "heavy": traced["heavy"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh-interpreter imports to time (median)")
+    parser.add_argument("--dag", default=DAG_FILE, help="DAG file to parse")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+
+    result = measure(args.dag, args.runs)
+    log.info(
+        f"⏱️ DAG parse: {result['seconds'] * 1000:.1f} ms (median of {args.runs}, limit "
+        f"{DAG_PARSE_MAX_SECONDS * 1000:.0f} ms) | peak {result['peak_mb']:.1f} MB (limit {DAG_PARSE_MAX_MB:.0f} MB) "
+        f"| {result['modules']} modules imported"
+    )
+    if result["heavy"]:
+        log.warning(f"⚠️ Heavy modules imported at parse time: {', '.join(result['heavy'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+End-to-End Pipeline Benchmark:
+For each scale (multiples of train.csv, see benchmarks/synth_sales.py)
+generates a synthetic feed (kept under data/synth/ and reused per
+scale/seed), then runs the whole pipeline against the local Postgres:
+ETL (current ETL_MODE) -> transform graph -> forecast (current
+FORECAST_MODE) -> join view -> data-quality profile. The ETL and model
+caches are switched off so every scale pays the full cost.
+
+Each stage is measured by pipeline/instrumentation.py (wall, CPU, rows/sec,
+peak RSS; slowest SQL statements). The JSON report (one file per run,
+data/benchmarks/e2e_<commit>_<time>.json) records the commit, host,
+Postgres version and settings next to the per-scale results, so two runs
+can be compared with --compare.
+
+⚠️ The benchmark REPLACES raw_sales and every derived table with synthetic
+data (customer_keys/product_keys/order_keys keep the synthetic IDs);
+rerun the pipeline on data/train.csv afterwards.
+
+Usage:
+    python -m benchmarks.bench_e2e --scales 1 10 100
+    python -m benchmarks.bench_e2e --scales 1 10 --compare data/benchmarks/e2e_<old>.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from benchmarks import synth_sales
+from db import quality
+from db import transform_graph
+from db.engine import get_engine
+from etl import cache
+from etl import load_data
+from forecast import model_cache
+from forecast import revenue_forecast as rf
+from pipeline import instrumentation
+from pipeline.runtime import configure_logging
+
+log = logging.getLogger("benchmarks.bench_e2e")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SYNTH_DIR = os.path.join(REPO_ROOT, "data", "synth")
+REPORT_DIR = os.path.join(REPO_ROOT, "data", "benchmarks")
+JOIN_SQL = ["db/join_actuals_forecast.sql"]
+STAGES = ["etl", "transform", "forecast", "join", "validate"]
+SLOWEST_STATEMENTS = 5
+
+
+def git_commit():
+    """HEAD commit, with a -dirty suffix when the tree has uncommitted changes"""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+
+    commit = git("rev-parse", "--short", "HEAD") or "unknown"
+    return commit + ("-dirty" if git("status", "--porcelain", "--untracked-files=no") else "")
+
+
+def environment():
+    """Host, interpreter, Postgres and pipeline settings the numbers depend on"""
+    with get_engine().connect() as conn:
+        postgres = conn.execute(text("SHOW server_version")).scalar()
+    return {
+        "host": platform.node(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "postgres": postgres,
+        "etl_mode": load_data.ETL_MODE,
+        "load_method": load_data.LOAD_METHOD,
+        "parse_engine": load_data.PARSE_ENGINE,
+        "forecast_mode": rf.FORECAST_MODE,
+        "forecast_backend": rf.FORECAST_BACKEND,
+    }
+
+
+def synth_feed(scale, seed):
+    """Path of the scale-x feed, generated on first use"""
+    os.makedirs(SYNTH_DIR, exist_ok=True)
+    path = os.path.join(SYNTH_DIR, f"synth_{scale}x_seed{seed}.csv")
+    if os.path.exists(path):
+        log.info(f"♻️ Reusing {path}")
+        return path
+    partial = path + ".partial"
+    synth_sales.generate(scale, partial, seed=seed)
+    os.replace(partial, path)
+    return path
+
+
+def run_pipeline(csv_path):
+    """ETL -> transforms -> forecast -> join view -> quality profile; returns the quality failures"""
+    load_data.CSV_PATH = csv_path
+    with instrumentation.stage("etl"):
+        load_data.MODES[load_data.ETL_MODE]()
+    transform_graph.run_graph()
+    with instrumentation.stage("forecast"):
+        rf.MODES[rf.FORECAST_MODE]()
+    instrumentation.run_sql_files("join", [os.path.join(REPO_ROOT, p) for p in JOIN_SQL])
+    with instrumentation.stage("validate") as stats, get_engine().connect() as conn:
+        profiles = quality.profile_tables(conn)
+        stats.rows_in = sum(p["row_count"] for p in profiles.values())
+    return quality.failures(profiles)
+
+
+def summarize(records):
+    """Stage totals, sub-stages and slowest SQL statements from one scale's instrumentation records"""
+    stages, substages, statements = {}, {}, []
+    for r in records:
+        entry = {k: r[k] for k in ["wall_seconds", "cpu_seconds", "rows_in", "rows_out", "rows_per_sec", "peak_rss_mb", "status"]}
+        if r["step"]:
+            statements.append({"step": r["step"], "wall_seconds": r["wall_seconds"], "rows_out": r["rows_out"]})
+        elif r["stage"] in STAGES:
+            stages[r["stage"]] = entry
+        else:
+            substages[r["stage"]] = entry
+    statements.sort(key=lambda s: s["wall_seconds"], reverse=True)
+    return stages, substages, statements[:SLOWEST_STATEMENTS]
+
+
+def bench_scale(scale, seed, label):
+    """Generate (or reuse) the feed and run the pipeline on it once; returns the scale's report entry"""
+    path = synth_feed(scale, seed)
+    run = f"{label}__{scale}x"
+    os.environ["PIPELINE_RUN_ID"] = run
+    artifact = os.path.join(instrumentation.settings()["stats_dir"], f"{run}.jsonl")
+    if os.path.exists(artifact):
+        os.remove(artifact)
+
+    log.info(f"🚀 {scale}x: running the pipeline on {path}")
+    started = time.perf_counter()
+    status, problems = "ok", []
+    try:
+        problems = run_pipeline(path)
+    except Exception as e:
+        log.error(f"❌ {scale}x: pipeline failed: {e}")
+        status, problems = "failed", [str(e)]
+    total = time.perf_counter() - started
+    with open(path) as f:
+        csv_rows = sum(1 for _ in f) - 1
+
+    with open(artifact) as f:
+        stages, substages, slowest = summarize([json.loads(line) for line in f])
+    with get_engine().connect() as conn:
+        rows = conn.execute(text(f'SELECT COUNT(*) FROM "{load_data.TABLE_NAME}"')).scalar()
+    log.info(f"⏱️ {scale}x: {total:.1f}s end to end, " + ", ".join(f"{s} {v['wall_seconds']:.1f}s" for s, v in stages.items()))
+    for problem in problems:
+        log.warning(f"⚠️ {scale}x: {problem}")
+    return {
+        "scale": scale,
+        "csv_rows": csv_rows,
+        "csv_mb": os.path.getsize(path) / 1e6,
+        "loaded_rows": rows,
+        "status": status,
+        "total_seconds": total,
+        "stages": stages,
+        "substages": substages,
+        "slowest_statements": slowest,
+        "quality_failures": problems,
+    }
+
+
+def compare(report, baseline):
+    """Log per-stage wall-time ratios (this run / baseline) for the scales both reports contain"""
+    old = {r["scale"]: r for r in baseline["results"]}
+    log.info(f"📐 {report['commit']} vs {baseline['commit']} (ratio < 1 = faster)")
+    for result in report["results"]:
+        base = old.get(result["scale"])
+        if base is None:
+            continue
+        ratios = [f"total {result['total_seconds'] / base['total_seconds']:.2f}x"]
+        ratios += [
+            f"{s} {v['wall_seconds'] / base['stages'][s]['wall_seconds']:.2f}x"
+            for s, v in result["stages"].items() if base["stages"].get(s, {}).get("wall_seconds")
+        ]
+        log.info(f"   {result['scale']}x: " + ", ".join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="feed sizes as multiples of train.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="report path (default data/benchmarks/e2e_<commit>_<time>.json)")
+    parser.add_argument("--compare", help="earlier report to compare against")
+    args = parser.parse_args()
+    configure_logging()
+    load_data.configure()
+    rf.configure()
+
+    cache.CACHE_ENABLED = False
+    model_cache.MODEL_CACHE_ENABLED = False
+    instrumentation.STATS_ENABLED = True
+    instrumentation.STATS_DIR = os.path.join(REPORT_DIR, "stats")
+
+    commit = git_commit()
+    started_at = datetime.now(timezone.utc)
+    label = f"e2e_{commit}_{started_at:%Y%m%dT%H%M%S}"
+    report = {
+        "commit": commit,
+        "started_at": started_at.isoformat(),
+        "seed": args.seed,
+        "environment": environment(),
+        "results": [bench_scale(scale, args.seed, label) for scale in args.scales],
+    }
+
+    out = args.out or os.path.join(REPORT_DIR, f"{label}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    log.info(f"📝 Report written to {out}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    log.warning("⚠️ raw_sales and the derived tables now hold synthetic data; rerun the pipeline on data/train.csv")
+
+
+if __name__ == "__main__":
+    main()
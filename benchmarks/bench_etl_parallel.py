@@ -0,0 +1,73 @@
+"""
+Parallel ETL Benchmark:
+Loads data/train.csv replicated N times (default 50x) into raw_sales with
+the serial full path and with ETL_MODE=parallel at several worker counts,
+and reports wall time and speedup per configuration. The Parquet cache is
+disabled so every run parses the CSV. Leaves raw_sales loaded from the
+scaled file; re-run the ETL afterwards to restore it.
+
+Usage:
+    python -m benchmarks.bench_etl_parallel --scale 50 --workers 1 2 4 8
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from etl import cache
+from etl import load_data
+from pipeline.runtime import configure_logging
+
+log = logging.getLogger("benchmarks.bench_etl_parallel")
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "train.csv")
+
+
+def build_csv(scale, path):
+    """train.csv x scale, each copy with its own Order IDs so duplicates stay per copy"""
+    base = pd.read_csv(CSV_PATH, dtype=str, keep_default_na=False)
+    with open(path, "w", newline="") as fh:
+        base.head(0).to_csv(fh, index=False)
+        for i in range(scale):
+            part = base.assign(**{"Order ID": base["Order ID"] + f"-{i:04d}"})
+            part.to_csv(fh, index=False, header=False)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=50, help="copies of data/train.csv")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to try")
+    args = parser.parse_args()
+    configure_logging()
+    load_data.configure()
+
+    cache.CACHE_ENABLED = False
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "train_scaled.csv")
+        build_csv(args.scale, path)
+        load_data.CSV_PATH = path
+        log.info(f"Benchmark file: {os.path.getsize(path) / 1e6:,.1f} MB ({args.scale}x train.csv)")
+
+        serial_s = timed(load_data.run_full)
+        results = {}
+        for workers in args.workers:
+            load_data.ETL_WORKERS = workers
+            load_data.MIN_SHARD_BYTES = 1
+            results[workers] = timed(load_data.run_parallel)
+
+    log.info(f"serial (ETL_MODE=full)  : {serial_s:.2f}s")
+    for workers, seconds in results.items():
+        log.info(f"parallel, {workers:>2} workers   : {seconds:.2f}s  x{serial_s / seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Forecast Backend Benchmark:
+Holds out the last N days of kpi_daily (default 90), fits the Prophet and
+the NumPy backends on the rest, and reports fit time and holdout MAPE
+(daily, and on weekly totals) for each, plus the one-off cost of
+importing Prophet. Then times the NumPy backend on many series at once
+(noisy rescaled copies of the total) to show the batched solve.
+Read-only: nothing is written to the database.
+
+Usage:
+    python -m benchmarks.bench_forecast --holdout 90 --series 1 100 1000 5000
+"""
+import argparse
+import logging
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from db.engine import get_engine
+from forecast import numpy_backend
+from forecast import revenue_forecast as rf
+from pipeline.runtime import configure_logging
+
+log = logging.getLogger("benchmarks.bench_forecast")
+
+
+def mape(actual, forecast, freq=None):
+    """MAPE over the holdout days that had sales; freq="W" compares weekly totals instead"""
+    merged = actual.merge(forecast, on="ds")
+    if freq:
+        merged = merged.resample(freq, on="ds")[["y", "yhat"]].sum()
+    merged = merged[merged["y"] > 0]
+    return float((merged["y"] - merged["yhat"]).abs().div(merged["y"]).mean() * 100)
+
+
+def import_seconds(module):
+    """Import time of `module` in a fresh interpreter"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    return float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout)
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--holdout", type=int, default=90, help="days held out at the end of kpi_daily")
+    parser.add_argument("--series", type=int, nargs="+", default=[1, 100, 1000], help="batch sizes for the numpy backend")
+    args = parser.parse_args()
+    configure_logging()
+
+    history = rf.load_history(get_engine())
+    if history is None:
+        raise ValueError("❌ kpi_daily is empty; run the ETL and transforms first")
+    cutoff = history["ds"].max() - pd.Timedelta(days=args.holdout)
+    train, test = history[history["ds"] <= cutoff], history[history["ds"] > cutoff]
+    log.info(f"Train: {len(train):,} days up to {cutoff:%Y-%m-%d}; holdout: {len(test):,} days")
+
+    prophet_import = import_seconds("prophet")
+    prophet_s, (_, prophet_fc) = timed(rf.fit_prophet, train, args.holdout)
+    numpy_s, numpy_fc = timed(numpy_backend.forecast_many, {"total": train}, args.holdout)
+
+    for name, seconds, forecast in [
+        ("prophet", prophet_s, prophet_fc),
+        ("numpy", numpy_s, numpy_fc["total"]),
+    ]:
+        log.info(
+            f"{name:<8}: fit+predict {seconds * 1000:9.1f} ms | holdout MAPE daily "
+            f"{mape(test, forecast):6.1f}%, weekly {mape(test, forecast, 'W'):5.1f}%"
+        )
+    log.info(f"prophet import (fresh interpreter): {prophet_import:.2f}s, paid once per process")
+
+    rng = np.random.default_rng(0)
+    for n in args.series:
+        series = {
+            f"s{i}": train.assign(y=train["y"] * rng.uniform(0.2, 2.0) + rng.normal(0, 50, len(train)))
+            for i in range(n)
+        }
+        seconds, _ = timed(numpy_backend.forecast_many, series, args.holdout)
+        log.info(f"numpy backend, {n:>6,} series: {seconds:.3f}s ({seconds / n * 1e6:,.0f} µs/series)")
+
+
+if __name__ == "__main__":
+    main()
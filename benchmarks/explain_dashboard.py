@@ -0,0 +1,193 @@
+"""
+Dashboard Query Benchmark:
+Runs EXPLAIN ANALYZE on the standard dashboard queries and reports
+planning/execution time per query.
+
+- "after" measures the tables as db/transform/ leaves them
+- "before" drops every key and index on the star schema inside a
+  transaction that is rolled back, so no rebuild is needed to compare
+- Writes a JSON report (--out) and prints the speedup per query
+
+Usage:
+    python -m benchmarks.explain_dashboard --runs 5 --out explain.json
+"""
+import argparse
+import json
+import logging
+import statistics
+
+from sqlalchemy import text
+
+from db.engine import get_engine
+from pipeline.runtime import configure_logging
+
+log = logging.getLogger("benchmarks.explain_dashboard")
+
+STAR_TABLES = [
+    "customer_keys", "product_keys", "order_keys", "fact_sales", "dim_customer", "dim_product",
+    "kpi_daily", "customer_first_purchase", "cohort_analysis", "sales_rollup",
+]
+
+# name -> SQL; :start/:end/:customer/:product/:cohort/:region are bound from the data
+QUERIES = {
+    "kpi_last_30_days": """
+        SELECT order_date, total_revenue, total_orders, avg_order_value
+        FROM kpi_daily
+        WHERE order_date BETWEEN :start AND :end
+    """,
+    "revenue_by_region_category": """
+        SELECT c.region, p.category, SUM(f.sales) AS revenue
+        FROM fact_sales f
+        JOIN dim_customer c ON c.customer_key = f.customer_key
+        JOIN dim_product p ON p.product_key = f.product_key
+        WHERE f.order_date BETWEEN :start AND :end
+        GROUP BY c.region, p.category
+    """,
+    "customer_history": """
+        SELECT f.order_date, o.order_id, f.product_key, f.sales
+        FROM fact_sales f
+        JOIN order_keys o ON o.order_key = f.order_key
+        WHERE f.customer_key = :customer
+        ORDER BY f.order_date
+    """,
+    "product_history": """
+        SELECT order_date, SUM(sales) AS revenue
+        FROM fact_sales
+        WHERE product_key = :product
+        GROUP BY order_date
+    """,
+    "cohort_row": """
+        SELECT order_month, customers, retained_customers
+        FROM cohort_analysis
+        WHERE cohort_month = :cohort
+        ORDER BY order_month
+    """,
+    "rollup_region_trend": """
+        SELECT period_start, revenue, orders, customers
+        FROM sales_rollup
+        WHERE grain = 'month' AND region = :region AND segment = 'All'
+          AND category = 'All' AND ship_mode = 'All'
+          AND period_start BETWEEN :start - INTERVAL '1 year' AND :end
+    """,
+    "order_lookup": """
+        SELECT f.*, c.customer_name, p.product_name
+        FROM fact_sales f
+        JOIN dim_customer c ON c.customer_key = f.customer_key
+        JOIN dim_product p ON p.product_key = f.product_key
+        WHERE f.order_date = :end
+    """,
+}
+
+
+def pick_params(conn):
+    """Bind realistic parameter values from the current data"""
+    end = conn.execute(text("SELECT MAX(order_date) FROM kpi_daily")).scalar()
+    start = conn.execute(
+        text("SELECT (MAX(order_date) - INTERVAL '30 days')::DATE FROM kpi_daily")
+    ).scalar()
+    customer = conn.execute(text(
+        "SELECT customer_key FROM fact_sales GROUP BY customer_key ORDER BY COUNT(*) DESC LIMIT 1"
+    )).scalar()
+    product = conn.execute(text(
+        "SELECT product_key FROM fact_sales GROUP BY product_key ORDER BY COUNT(*) DESC LIMIT 1"
+    )).scalar()
+    cohort = conn.execute(text("SELECT MIN(cohort_month) FROM cohort_analysis")).scalar()
+    region = conn.execute(text(
+        "SELECT region FROM dim_customer GROUP BY region ORDER BY COUNT(*) DESC LIMIT 1"
+    )).scalar()
+    return {
+        "start": start, "end": end, "customer": customer, "product": product,
+        "cohort": cohort, "region": region,
+    }
+
+
+def drop_keys_and_indexes(conn):
+    """Drop constraints, then remaining indexes, on the star schema (caller rolls back)"""
+    constraints = conn.execute(text("""
+        SELECT conrelid::regclass::text, conname
+        FROM pg_constraint
+        WHERE contype IN ('p', 'u') AND conrelid::regclass::text = ANY(:tables)
+    """), {"tables": STAR_TABLES}).all()
+    for table, name in constraints:
+        conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+
+    indexes = conn.execute(text("""
+        SELECT indexname FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = ANY(:tables)
+    """), {"tables": STAR_TABLES}).scalars().all()
+    for name in indexes:
+        conn.execute(text(f'DROP INDEX "{name}"'))
+    log.info(f"Dropped {len(constraints)} constraints and {len(indexes)} indexes (rolled back afterwards)")
+
+
+def explain(conn, sql, params, runs):
+    """Median planning/execution time (ms) over `runs` EXPLAIN ANALYZE passes"""
+    planning, execution, plan = [], [], None
+    for _ in range(runs):
+        result = conn.execute(
+            text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params
+        ).scalar()
+        report = result[0] if isinstance(result, list) else json.loads(result)[0]
+        planning.append(report["Planning Time"])
+        execution.append(report["Execution Time"])
+        plan = report["Plan"]
+    return {
+        "planning_ms": statistics.median(planning),
+        "execution_ms": statistics.median(execution),
+        "top_node": plan["Node Type"],
+        "scans": sorted({n["Node Type"] for n in _walk(plan) if "Scan" in n["Node Type"]}),
+    }
+
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def run(runs=5):
+    engine = get_engine()
+    report = {}
+    with engine.connect() as conn:
+        params = pick_params(conn)
+        conn.rollback()
+        log.info(f"Parameters: {params}")
+
+        for label in ["before", "after"]:
+            trans = conn.begin()
+            try:
+                if label == "before":
+                    drop_keys_and_indexes(conn)
+                report[label] = {
+                    name: explain(conn, sql, params, runs) for name, sql in QUERIES.items()
+                }
+            finally:
+                trans.rollback()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="EXPLAIN ANALYZE passes per query (median)")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    configure_logging()
+
+    report = run(args.runs)
+
+    for name in QUERIES:
+        before, after = report["before"][name], report["after"][name]
+        speedup = before["execution_ms"] / max(after["execution_ms"], 1e-6)
+        log.info(
+            f"{name:<28} before={before['execution_ms']:8.3f}ms {before['scans']}  "
+            f"after={after['execution_ms']:8.3f}ms {after['scans']}  x{speedup:.1f}"
+        )
+
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(report, fh, indent=2)
+        log.info(f"✅ Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Synthetic Sales Feed Generator:
+Writes a train.csv-shaped feed of roughly SCALE x len(train.csv) rows by
+bootstrapping whole orders from data/train.csv, so the real joint
+distributions carry over: items per order, product mix, Sales per
+product, ship modes and delays, locations, and the daily/weekly/yearly
+shape of order dates (dates are kept, so each day simply gets SCALE times
+the orders).
+- Every sampled order gets a fresh Order ID (same "CA-2017-" style prefix)
+- Customers scale with the feed: each order goes to one of SCALE clones of
+  its real customer (clone 0 keeps the real Customer ID)
+- Sales are jittered per line (lognormal, sigma SALES_JITTER)
+- Duplicate (Order ID, Product ID) lines occur at train.csv's own rate
+  (they are part of the sampled orders); dirty rows (blank/garbled Sales,
+  impossible or missing dates, missing Order ID) are injected at
+  --dirty-rate. The ETL merges the former and drops the latter
+- Written in chunks, so 1000x fits in memory; deterministic per --seed
+
+Usage:
+    python -m benchmarks.synth_sales --scale 10 --out data/synth_10x.csv
+"""
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger("benchmarks.synth_sales")
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "train.csv")
+SALES_JITTER = 0.1
+DIRTY_RATE = 0.001
+CHUNK_COPIES = 20  # train.csv-sized batches generated per write
+DIRTY_KINDS = ["blank_sales", "garbled_sales", "bad_order_date", "missing_ship_date", "missing_order_id"]
+
+
+def load_template(path=CSV_PATH):
+    """train.csv as raw strings, rows grouped by order; returns (frame, order starts, order sizes)"""
+    base = pd.read_csv(path, dtype=str, keep_default_na=False)
+    codes, _ = pd.factorize(base["Order ID"])
+    base = base.iloc[np.argsort(codes, kind="stable")].reset_index(drop=True)
+    sizes = np.bincount(np.sort(codes))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    return base, starts, sizes
+
+
+def synth_chunk(rng, template, n_orders, scale, first_order, first_row, dirty_rate):
+    """
+    `n_orders` bootstrapped orders as a raw-string frame. Returns
+    (frame, duplicate order lines, dirty rows by kind).
+    """
+    base, starts, sizes = template
+    pick = rng.integers(0, len(sizes), n_orders)
+    lengths = sizes[pick]
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    chunk = base.iloc[np.repeat(starts[pick], lengths) + offsets].reset_index(drop=True)
+
+    order_seq = np.repeat(np.arange(first_order, first_order + n_orders), lengths)
+    chunk["Order ID"] = chunk["Order ID"].str[:8] + pd.Series(order_seq).astype(str).str.zfill(9)
+    clone = np.repeat(rng.integers(0, scale, n_orders), lengths)
+    suffix = pd.Series(clone).astype(str).radd("-").where(clone > 0, "")
+    chunk["Customer ID"] = chunk["Customer ID"] + suffix
+
+    sales = chunk["Sales"].astype(float) * rng.lognormal(0, SALES_JITTER, len(chunk))
+    chunk["Sales"] = np.round(sales, 3).astype(str)
+    # train.csv's repeated (Order ID, Product ID) lines come along with their orders
+    duplicates = int(chunk.duplicated(["Order ID", "Product ID"]).sum())
+
+    dirty = {}
+    hit = rng.choice(len(chunk), int(rng.binomial(len(chunk), dirty_rate)), replace=False)
+    kinds = rng.integers(0, len(DIRTY_KINDS), len(hit))
+    for k, kind in enumerate(DIRTY_KINDS):
+        rows = hit[kinds == k]
+        dirty[kind] = len(rows)
+        if kind == "blank_sales":
+            chunk.loc[rows, "Sales"] = ""
+        elif kind == "garbled_sales":
+            chunk.loc[rows, "Sales"] = "#VALUE!"
+        elif kind == "bad_order_date":
+            chunk.loc[rows, "Order Date"] = "31/02/" + chunk.loc[rows, "Order Date"].str[-4:]
+        elif kind == "missing_ship_date":
+            chunk.loc[rows, "Ship Date"] = ""
+        else:
+            chunk.loc[rows, "Order ID"] = ""
+
+    chunk["Row ID"] = np.arange(first_row, first_row + len(chunk)).astype(str)
+    return chunk, duplicates, dirty
+
+
+def generate(scale, out, seed=0, dirty_rate=DIRTY_RATE, path=CSV_PATH):
+    """
+    Write a SCALE x train.csv synthetic feed to `out`. Returns a summary dict
+    (rows, orders, duplicate lines, dirty rows by kind, bytes, seconds).
+    """
+    if scale < 1:
+        raise ValueError(f"❌ scale must be >= 1, got {scale}")
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    template = load_template(path)
+    base, _, sizes = template
+    orders_total = len(sizes) * scale
+
+    rows = duplicates = orders = 0
+    dirty = dict.fromkeys(DIRTY_KINDS, 0)
+    with open(out, "w", newline="") as fh:
+        base.head(0).to_csv(fh, index=False)
+        while orders < orders_total:
+            n = min(len(sizes) * CHUNK_COPIES, orders_total - orders)
+            chunk, dups, bad = synth_chunk(rng, template, n, scale, 1_000_000 + orders, rows + 1, dirty_rate)
+            chunk.to_csv(fh, index=False, header=False)
+            rows += len(chunk)
+            duplicates += dups
+            orders += n
+            dirty = {k: dirty[k] + bad[k] for k in DIRTY_KINDS}
+
+    summary = {
+        "scale": scale,
+        "seed": seed,
+        "rows": rows,
+        "orders": orders,
+        "duplicate_lines": duplicates,
+        "dirty_rows": dirty,
+        "bytes": os.path.getsize(out),
+        "seconds": time.perf_counter() - started,
+    }
+    log.info(
+        f"🧪 {out}: {rows:,} rows, {orders:,} orders ({scale}x), {duplicates:,} duplicate lines, "
+        f"{sum(dirty.values()):,} dirty rows, {summary['bytes'] / 1e6:,.1f} MB in {summary['seconds']:.1f}s"
+    )
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=10, help="multiple of train.csv's order count (1, 10, 100, 1000, ...)")
+    parser.add_argument("--out", required=True, help="CSV file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dirty-rate", type=float, default=DIRTY_RATE, help="share of rows corrupted")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    generate(args.scale, args.out, args.seed, args.dirty_rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,75 @@
 from airflow import DAG
-from airflow.providers.postgres.operators.postgres import PostgresOperator
 from airflow.operators.python import PythonOperator
 from datetime import datetime
 import os
 import sys
-import pandas as pd
-from sqlalchemy import create_engine
 
-sys.path.append("/opt/airflow/dags")
+DAGS_HOME = "/opt/airflow/dags"
+sys.path.append(DAGS_HOME)
 
-from etl.load_data import main as etl_main
-from forecast.revenue_forecast import main as forecast_main
-import subprocess
+# The scheduler re-parses this file every few seconds: keep it to Airflow
+# and the stdlib (db/transform_graph.py only imports the stdlib too).
+# pandas, SQLAlchemy, Prophet and the etl/forecast modules (with their env
+# settings) are imported by the task callables at run time.
 
-def tests_main():
-    subprocess.run(["pytest", "-v", "/opt/airflow/dags/tests/"], check=True)
+from db.transform_graph import TRANSFORM_GRAPH
+
+# "full" rebuilds every derived table as one task per object
+# (db/transform_graph.py); "incremental" merges only the keys touched by
+# the last ETL load in one task (pair with ETL_MODE=incremental)
+TRANSFORM_MODE = os.getenv("TRANSFORM_MODE", "full")
+if TRANSFORM_MODE not in ("full", "incremental"):
+    raise ValueError(f"❌ Unknown TRANSFORM_MODE '{TRANSFORM_MODE}' (expected 'full' or 'incremental')")
+
+# Transform nodes the forecast reads: kpi_daily, plus the dimensions for per-series forecasts
+FORECAST_INPUTS = {
+    "total": ["kpi_daily"],
+    "series": ["kpi_daily", "dim_customer", "dim_product"],
+}[os.getenv("FORECAST_MODE", "total")]
+
+def run_sql(stage_name, *paths):
+    """SQL files in one transaction, timed per statement (pipeline/instrumentation.py)"""
+    from pipeline.instrumentation import run_sql_files
+    run_sql_files(stage_name, [os.path.join(DAGS_HOME, path) for path in paths])
+
+
+def transform_node(node):
+    """One object of the full transform (db/transform/<node>.sql) on its own connection"""
+    from db.transform_graph import run_node
+    run_node(node)
+
+
+def etl_main():
+    from etl.load_data import main
+    main()
+
+
+def forecast_main():
+    from forecast.revenue_forecast import main
+    main()
+
+
+def backtest_main():
+    from forecast.backtest import main
+    main()
+
+
+def quality_main():
+    """One-scan data-quality profile -> dq_results; raises on any failed check"""
+    from db.quality import main
+    main()
 
 
 # Final sanity check function
 def check_final_table():
-    """Ensure actual_vs_forecast has rows for Tableau"""
-    DB_USER = os.getenv("DB_USER", "salesuser")
-    DB_PASS = os.getenv("DB_PASS", "salespass")
-    DB_NAME = os.getenv("DB_NAME", "salesdb")
-    DB_HOST = os.getenv("DB_HOST", "postgres_db")
-    DB_PORT = os.getenv("DB_PORT", "5432")
+    """Ensure the actual_vs_forecast materialized view has rows for Tableau"""
+    import pandas as pd
+    from db.engine import get_engine
+    from pipeline.instrumentation import stage
 
-    engine = create_engine(f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
-    df = pd.read_sql("SELECT COUNT(*) AS cnt FROM actual_vs_forecast", engine)
+    with stage("check_final_table") as stats:
+        df = pd.read_sql("SELECT COUNT(*) AS cnt FROM actual_vs_forecast", get_engine())
+        stats.rows_out = int(df["cnt"].iloc[0])
 
     if df["cnt"].iloc[0] == 0:
         raise ValueError("❌ actual_vs_forecast is empty! Tableau has nothing to show.")
@@ -57,26 +99,53 @@ with DAG(
         python_callable=etl_main,
     )
 
-    transform = PostgresOperator(
-        task_id="transform_sql",
-        postgres_conn_id="postgres_sales_conn",
-        sql="db/transform.sql",
-    )
+    if TRANSFORM_MODE == "full":
+        # One task per object, wired as TRANSFORM_GRAPH: independent builds run concurrently
+        transform = {
+            node: PythonOperator(
+                task_id=f"transform_{node}",
+                python_callable=transform_node,
+                op_args=[node],
+            )
+            for node in TRANSFORM_GRAPH
+        }
+        for node, upstream in TRANSFORM_GRAPH.items():
+            for up in upstream:
+                transform[up] >> transform[node]
+    else:
+        # HLL + partition helpers, then the incremental merge as a single task
+        transform_sql = PythonOperator(
+            task_id="transform_sql",
+            python_callable=run_sql,
+            op_args=["transform_sql", "db/hll.sql", "db/partitions.sql", "db/transform_incremental.sql"],
+        )
+        transform = dict.fromkeys(TRANSFORM_GRAPH, transform_sql)
+    # Distinct tasks (incremental mode maps every node to the one task)
+    roots = list(dict.fromkeys(transform[n] for n, upstream in TRANSFORM_GRAPH.items() if not upstream))
+    leaves = list(dict.fromkeys(transform[n] for n in TRANSFORM_GRAPH if not any(n in ups for ups in TRANSFORM_GRAPH.values())))
+    forecast_inputs = list(dict.fromkeys(transform[n] for n in FORECAST_INPUTS))
 
     forecast = PythonOperator(
         task_id="forecast_revenue",
         python_callable=forecast_main,
     )
 
-    join_view = PostgresOperator(
+    # Rolling-origin accuracy -> forecast_accuracy (bounded by BACKTEST_BUDGET_SECONDS)
+    backtest = PythonOperator(
+        task_id="backtest_forecast",
+        python_callable=backtest_main,
+    )
+
+    join_view = PythonOperator(
         task_id="join_actual_forecast",
-        postgres_conn_id="postgres_sales_conn",
-        sql="db/join_actuals_forecast.sql",
+        python_callable=run_sql,
+        op_args=["join_actual_forecast", "db/join_actuals_forecast.sql"],
     )
 
+    # In-process profiler (db/quality.py); the pytest suite runs in CI
     validate = PythonOperator(
         task_id="validate_tests",
-        python_callable=tests_main,
+        python_callable=quality_main,
     )
 
     check_final = PythonOperator(
@@ -84,5 +153,10 @@ with DAG(
         python_callable=check_final_table,
     )
 
-    etl >> transform >> forecast >> join_view >> validate >> check_final
+    # The forecast starts once its inputs are built; the backtest only needs
+    # kpi_daily; validate waits for every branch (cohorts, rollup included)
+    etl >> roots
+    forecast_inputs >> forecast >> join_view
+    transform["kpi_daily"] >> backtest
+    [join_view, backtest, *leaves] >> validate >> check_final
 
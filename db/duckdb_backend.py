@@ -0,0 +1,239 @@
+"""
+Embedded DuckDB Analytics Backend
+- Builds the transform layer in-process, in an in-memory DuckDB, directly
+  over the cleaned sales feed: the ETL's Parquet snapshot
+  (etl/cache.py) for the current CSV, else the CSV cleaned on the spot.
+  No Postgres needed to run or profile the transforms. Given rows instead,
+  raw_sales can also be fed chunk by chunk (e.g. Postgres raw_sales through
+  db.engine.read_sql_chunks), never holding the whole table in pandas
+- Same logic as Postgres: each node of db/transform_graph.py runs the
+  CREATE TABLE ... AS / INSERT ... SELECT statements of its
+  db/transform/<node>.sql file (::NUMERIC read as DOUBLE). Only the
+  surrogate keys (append-only identity tables in Postgres) are DuckDB
+  SQL: dense per-build keys, same distinct counts and groupings.
+  sales_rollup (HLL sketches) is Postgres-only
+- Results leave as Arrow tables (fetch_arrow); the forecaster reads its
+  inputs here when ANALYTICS_BACKEND=duckdb, Postgres stays the publish
+  target for the forecast and Tableau
+- profile() runs the db/quality.py one-scan profile over the built tables;
+  actual_vs_forecast() is db/join_actuals_forecast.sql's join
+- Optional: needs the duckdb package (requirements.txt)
+- Run as a module from the repo root: python -m db.duckdb_backend
+"""
+import os
+import re
+import time
+import logging
+import importlib.util
+import pandas as pd
+
+from db import quality
+from db.transform_graph import node_sql, topological_order
+from pipeline.instrumentation import split_sql, stage
+from pipeline.runtime import configure_logging
+
+log = logging.getLogger("db.duckdb_backend")
+
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "postgres")  # "postgres" | "duckdb"
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", str(os.cpu_count() or 1)))
+HAS_DUCKDB = importlib.util.find_spec("duckdb") is not None
+
+# Stateful in Postgres (identity columns, kept across runs): rebuilt per connection here
+KEYS_SQL = [
+    f"""
+    CREATE TABLE {entity}_keys AS
+    SELECT (ROW_NUMBER() OVER (ORDER BY {entity}_id))::INT AS {entity}_key, {entity}_id
+    FROM (SELECT DISTINCT "{column}" AS {entity}_id FROM raw_sales)
+    """
+    for entity, column in [("customer", "Customer ID"), ("product", "Product ID"), ("order", "Order ID")]
+]
+SKIPPED_NODES = {"sales_rollup"}  # needs the db/hll.sql functions
+BUILT_TABLES = ["raw_sales", "dim_customer", "dim_product", "fact_sales", "kpi_daily", "customer_first_purchase", "cohort_analysis"]
+
+ACTUAL_VS_FORECAST_SQL = """
+    SELECT
+        COALESCE(k.order_date, f.ds) AS ds,
+        k.total_revenue AS actual_revenue,
+        f.yhat AS forecast,
+        f.yhat_lower,
+        f.yhat_upper
+    FROM kpi_daily k
+    FULL OUTER JOIN forecast_revenue f
+        ON k.order_date = f.ds
+    ORDER BY ds
+"""
+
+_CTAS = re.compile(r"^CREATE TABLE (\w+) AS$", re.M)
+_INSERT_SELECT = re.compile(r"^INSERT INTO (\w+)\s*\n(?=SELECT)", re.M)
+
+_connection = None
+
+
+def enabled():
+    """True when ANALYTICS_BACKEND=duckdb and duckdb is installed"""
+    if ANALYTICS_BACKEND == "duckdb" and not HAS_DUCKDB:
+        log.warning("⚠️ ANALYTICS_BACKEND=duckdb but duckdb is not installed; reading from Postgres")
+    return ANALYTICS_BACKEND == "duckdb" and HAS_DUCKDB
+
+
+def to_duckdb(sql):
+    """Postgres SQL as run here: NUMERIC (DECIMAL(18,3) in DuckDB) becomes DOUBLE"""
+    return sql.replace("::NUMERIC", "::DOUBLE")
+
+
+def node_statements(node):
+    """The node's table-building statements from its Postgres SQL file, as DuckDB CREATE TABLE ... AS"""
+    if node == "keys":
+        return KEYS_SQL
+    statements = []
+    for path in node_sql(node):
+        with open(path) as f:
+            for statement in split_sql(f.read()):
+                # Postgres creates fact_sales (partitioned) first, then fills it
+                statement = _INSERT_SELECT.sub(r"CREATE TABLE \1 AS\n", statement)
+                if _CTAS.search(statement):
+                    statements.append(to_duckdb(statement))
+    return statements
+
+
+def load_raw(con, raw=None):
+    """
+    raw_sales as a DuckDB table: from `raw` (DataFrame / Arrow table, or an
+    iterable of DataFrame chunks appended one at a time) if given, else the
+    Parquet snapshot of the current CSV, else the CSV cleaned now (and
+    cached as a snapshot, like the full ETL)
+    """
+    if raw is None:
+        from etl import cache, load_data
+
+        path = load_data.csv_path()
+        fingerprint = load_data.file_fingerprint(path)
+        key = load_data.cached_snapshot(fingerprint)
+        if key is not None:
+            path = os.path.join(cache.snapshot_path(key), "**", "*.parquet")
+            con.execute(f"""
+                CREATE TABLE raw_sales AS
+                SELECT * EXCLUDE ({cache.PARTITION_COLUMN})
+                FROM read_parquet('{path}', hive_partitioning = true)
+            """)
+            log.info(f"✅ raw_sales from Parquet snapshot {key[:12]}")
+            return con.execute("SELECT COUNT(*) FROM raw_sales").fetchone()[0]
+        raw = load_data.clean_csv(path)
+        if cache.enabled():
+            load_data.write_cleaned_snapshot(raw, fingerprint)
+    chunks = [raw] if isinstance(raw, pd.DataFrame) or hasattr(raw, "schema") else raw
+    rows = None
+    for chunk in chunks:
+        con.register("raw_input", chunk)
+        if rows is None:
+            con.execute("CREATE TABLE raw_sales AS SELECT * FROM raw_input")
+            rows = 0
+        else:
+            con.execute("INSERT INTO raw_sales SELECT * FROM raw_input")
+        con.unregister("raw_input")
+        rows += len(chunk)
+    if rows is None:
+        raise ValueError("❌ No raw_sales chunks to load into DuckDB")
+    return rows
+
+
+def build(con):
+    """Run the transform graph's nodes in dependency order; returns {node: seconds}"""
+    seconds = {}
+    for node in topological_order():
+        if node in SKIPPED_NODES:
+            continue
+        started = time.perf_counter()
+        with stage(f"duckdb.{node}"):
+            for statement in node_statements(node):
+                con.execute(statement)
+        seconds[node] = time.perf_counter() - started
+    log.info(
+        f"✅ DuckDB transform: {len(seconds)} nodes in {sum(seconds.values()):.2f}s "
+        f"({', '.join(f'{n} {s:.2f}s' for n, s in seconds.items())})"
+    )
+    return seconds
+
+
+def connect(raw=None):
+    """New in-memory DuckDB with raw_sales loaded (see load_raw) and every transform table built"""
+    import duckdb
+
+    con = duckdb.connect(config={"threads": DUCKDB_THREADS})
+    with stage("duckdb.load_raw") as stats:
+        stats.rows_out = load_raw(con, raw)
+    build(con)
+    return con
+
+
+def get_connection():
+    """The process-wide DuckDB build (built on first use, like db.engine.get_engine)"""
+    global _connection
+    if _connection is None:
+        _connection = connect()
+    return _connection
+
+
+def fetch_arrow(sql, con=None):
+    """Query result as a pyarrow.Table (columnar, no row-by-row transfer)"""
+    # A cursor per call: DuckDB connections must not be shared between threads
+    cursor = (con or get_connection()).cursor()
+    try:
+        return cursor.execute(sql).arrow()
+    finally:
+        cursor.close()
+
+
+def fetch_df(sql, con=None):
+    return fetch_arrow(sql, con).to_pandas()
+
+
+def actual_vs_forecast(forecast, con=None):
+    """kpi_daily joined with `forecast` (ds, yhat, yhat_lower, yhat_upper) on one daily timeline, as Arrow"""
+    cursor = (con or get_connection()).cursor()
+    try:
+        forecast = forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]].assign(ds=pd.to_datetime(forecast["ds"]).dt.date)
+        cursor.register("forecast_input", forecast)
+        cursor.execute("CREATE OR REPLACE TEMP VIEW forecast_revenue AS SELECT ds::DATE AS ds, yhat, yhat_lower, yhat_upper FROM forecast_input")
+        return cursor.execute(ACTUAL_VS_FORECAST_SQL).arrow()
+    finally:
+        cursor.close()
+
+
+def profile(con=None):
+    """db/quality.py's one-scan profile of every built table; returns (profiles, failures)"""
+    cursor = (con or get_connection()).cursor()
+    profiles = {}
+    try:
+        for table in BUILT_TABLES:
+            if table not in quality.PROFILES:
+                continue
+            sql, fields = quality.profile_sql(table, quality.PROFILES[table])
+            started = time.perf_counter()
+            profiles[table] = quality.profile_from_row(fields, cursor.execute(to_duckdb(sql)).fetchone())
+            profiles[table]["seconds"] = time.perf_counter() - started
+    finally:
+        cursor.close()
+    return profiles, quality.failures(profiles, tables=list(profiles))
+
+
+def main():
+    """Build the transform layer in DuckDB over the cleaned feed and validate it; no Postgres needed"""
+    configure_logging()
+    if not HAS_DUCKDB:
+        raise ValueError("❌ duckdb is not installed (pip install -r requirements.txt)")
+    con = get_connection()
+    for table in BUILT_TABLES:
+        rows = con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        log.info(f"📦 {table}: {rows:,} rows")
+
+    profiles, problems = profile(con)
+    for problem in problems:
+        log.error(f"❌ {problem}")
+    if problems:
+        raise ValueError(f"❌ DuckDB build: {len(problems)} check(s) failed")
+    log.info(f"✅ DuckDB build: {len(profiles)} tables profiled and passed")
+
+
+if __name__ == "__main__":
+    main()
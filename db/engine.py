@@ -0,0 +1,157 @@
+"""
+Shared database access for every pipeline stage
+- get_engine(): ONE pooled SQLAlchemy engine per process, built from the
+  DB_* settings on first use and reused by the ETL, the forecast, the DAG's
+  final check and the test suite. settings() reads DB_* (and .env) when the
+  engine is built, not at import
+- Pool tuning: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE seconds,
+  pre-ping on checkout (stale connections are replaced, not raised), and a
+  server-side statement_timeout of DB_STATEMENT_TIMEOUT_MS (0 disables)
+- Fork-safe: a child process (ProcessPoolExecutor workers) gets a fresh pool
+  on its first get_engine() and never reuses the parent's sockets
+- read_sql_chunks(): streaming reads through a server-side cursor, one
+  DataFrame of `chunksize` rows at a time
+- copy_dataframe(): bulk COPY of a DataFrame into an existing table,
+  serialized to CSV lazily
+- dispose() closes the pooled connections (registered at exit)
+"""
+import os
+import io
+import atexit
+import logging
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL
+
+from pipeline.runtime import load_env
+
+log = logging.getLogger("db.engine")
+
+COPY_CHUNKSIZE = 50_000  # rows serialized per COPY buffer refill
+
+_engine = None
+_engine_pid = None
+
+
+def settings():
+    """DB_* connection and pool settings, read from the environment (and .env) now"""
+    load_env()
+    return {
+        "user": os.getenv("DB_USER", "salesuser"),
+        "password": os.getenv("DB_PASS", "salespass"),
+        "database": os.getenv("DB_NAME", "salesdb"),
+        "host": os.getenv("DB_HOST", "postgres_db"),  # For Docker networking
+        "port": int(os.getenv("DB_PORT", "5432")),
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "5")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),  # seconds
+        "statement_timeout_ms": int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "1800000")),  # 30 min; 0 = no limit
+        "read_chunksize": int(os.getenv("DB_READ_CHUNKSIZE", "50000")),  # rows per streamed DataFrame
+    }
+
+
+def get_engine():
+    """The process-wide pooled engine (created on first use, re-pooled after a fork)"""
+    global _engine, _engine_pid
+    if _engine is None:
+        db = settings()
+        _engine = create_engine(
+            URL.create(
+                "postgresql",
+                username=db["user"],
+                password=db["password"],
+                host=db["host"],
+                port=db["port"],
+                database=db["database"],
+            ),
+            pool_size=db["pool_size"],
+            max_overflow=db["max_overflow"],
+            pool_recycle=db["pool_recycle"],
+            pool_pre_ping=True,
+            connect_args={"options": f"-c statement_timeout={db['statement_timeout_ms']}"},
+        )
+        _engine_pid = os.getpid()
+        log.info(
+            f"🔌 Engine for {db['host']}:{db['port']}/{db['database']} (pool {db['pool_size']}+{db['max_overflow']}, "
+            f"statement_timeout {db['statement_timeout_ms']} ms)"
+        )
+    elif _engine_pid != os.getpid():
+        # Inherited through fork: start an empty pool, leave the parent's connections alone
+        _engine.dispose(close=False)
+        _engine_pid = os.getpid()
+    return _engine
+
+
+def dispose():
+    """Close every pooled connection; the next get_engine() builds a new engine"""
+    global _engine, _engine_pid
+    if _engine is not None and _engine_pid == os.getpid():
+        _engine.dispose()
+    _engine = None
+    _engine_pid = None
+
+
+atexit.register(dispose)
+
+
+def read_sql_chunks(sql, params=None, chunksize=None, engine=None):
+    """
+    Stream a query's rows as DataFrames of `chunksize` rows (default
+    DB_READ_CHUNKSIZE) through a server-side cursor: only one chunk is held
+    in memory at a time. The connection returns to the pool when the
+    generator is exhausted or closed.
+    """
+    import pandas as pd
+
+    chunksize = chunksize or settings()["read_chunksize"]
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=chunksize)
+        yield from pd.read_sql(text(sql), conn, params=params, chunksize=chunksize)
+
+
+class DataFrameCsvStream:
+    """
+    Read-only file object that serializes a DataFrame to CSV lazily,
+    one slice of rows at a time, so COPY can stream it without a second
+    full in-memory copy of the data.
+    """
+
+    def __init__(self, df, rows_per_chunk=COPY_CHUNKSIZE, date_format=None):
+        self._df = df
+        self._rows = rows_per_chunk
+        self._date_format = date_format
+        self._pos = 0
+        self._buf = io.StringIO()
+
+    def _refill(self):
+        chunk = self._df.iloc[self._pos:self._pos + self._rows]
+        self._pos += self._rows
+        self._buf = io.StringIO(chunk.to_csv(index=False, header=False, date_format=self._date_format))
+
+    def read(self, size=-1):
+        out = []
+        remaining = size
+        while size < 0 or remaining > 0:
+            piece = self._buf.read(remaining if size >= 0 else -1)
+            if not piece:
+                if self._pos >= len(self._df):
+                    break
+                self._refill()
+                continue
+            out.append(piece)
+            remaining -= len(piece)
+        return "".join(out)
+
+
+def copy_dataframe(conn, df, table, date_format=None):
+    """COPY a DataFrame into an existing table on an open SQLAlchemy connection"""
+    columns = ", ".join(f'"{c}"' for c in df.columns)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f'COPY "{table}" ({columns}) FROM STDIN WITH (FORMAT csv)',
+            DataFrameCsvStream(df, date_format=date_format),
+            size=1 << 20,
+        )
+    finally:
+        cursor.close()
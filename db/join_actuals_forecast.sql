@@ -1,17 +1,68 @@
-    -- Drop the view if it already exists to ensure a clean update.
-    DROP VIEW IF EXISTS actual_vs_forecast;
+-- Materialized view for Tableau: historical actual revenue joined with the
+-- forecasted revenue on one continuous daily timeline, indexed on ds.
+-- kpi_daily.order_date and forecast_revenue.ds are both DATE, so the join
+-- needs no casts.
+--
+-- Refresh rules:
+-- - created (and populated) here if missing: the first run, or after kpi_daily
+--   or forecast_revenue was dropped (the transforms rebuild both in place)
+-- - otherwise REFRESH ... CONCURRENTLY, so readers are never blocked
+-- - skipped when neither input changed since the last refresh: the
+--   transforms and the forecast stamp <table>.version in pipeline_state
 
-    -- Create a single, clean view for Tableau to consume for time-series analysis.
-    -- This view combines historical actual revenue with future forecasted revenue.
-    CREATE VIEW actual_vs_forecast AS
-    SELECT
-        -- COALESCE ensures a single continuous timeline.
-        COALESCE(k.order_date::DATE, f.ds::DATE) AS ds,
-        k.total_revenue AS actual_revenue,
-        f.yhat AS forecast,
-        f.yhat_lower,
-        f.yhat_upper
-    FROM kpi_daily k
-    FULL OUTER JOIN forecast_revenue f
-        ON k.order_date::DATE = f.ds::DATE
-    ORDER BY ds;
+CREATE TABLE IF NOT EXISTS pipeline_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+DO $$
+DECLARE
+    kpi_version      TEXT := (SELECT value FROM pipeline_state WHERE key = 'kpi_daily.version');
+    forecast_version TEXT := (SELECT value FROM pipeline_state WHERE key = 'forecast_revenue.version');
+    inputs           TEXT := kpi_version || '|' || forecast_version;
+    kind             "char" := (
+        SELECT c.relkind FROM pg_class c
+        WHERE c.relname = 'actual_vs_forecast' AND c.relnamespace = current_schema()::regnamespace
+    );
+BEGIN
+    -- Earlier deployments created a plain view
+    IF kind = 'v' THEN
+        DROP VIEW actual_vs_forecast;
+        kind := NULL;
+    END IF;
+
+    IF kind IS NULL THEN
+        CREATE MATERIALIZED VIEW actual_vs_forecast AS
+        SELECT
+            -- COALESCE ensures a single continuous timeline.
+            COALESCE(k.order_date, f.ds) AS ds,
+            k.total_revenue AS actual_revenue,
+            f.yhat AS forecast,
+            f.yhat_lower,
+            f.yhat_upper
+        FROM kpi_daily k
+        FULL OUTER JOIN forecast_revenue f
+            ON k.order_date = f.ds
+        ORDER BY ds;
+
+        -- Required by REFRESH ... CONCURRENTLY; also serves range reads on ds
+        CREATE UNIQUE INDEX actual_vs_forecast_ds_idx ON actual_vs_forecast (ds);
+        RAISE NOTICE 'actual_vs_forecast created';
+    ELSIF inputs IS NOT NULL
+        AND inputs = (SELECT value FROM pipeline_state WHERE key = 'actual_vs_forecast.inputs') THEN
+        RAISE NOTICE 'actual_vs_forecast is up to date; refresh skipped';
+        RETURN;
+    ELSE
+        REFRESH MATERIALIZED VIEW CONCURRENTLY actual_vs_forecast;
+        RAISE NOTICE 'actual_vs_forecast refreshed';
+    END IF;
+
+    ANALYZE actual_vs_forecast;
+
+    -- Unknown versions (NULL) are never recorded, so the next run refreshes again
+    DELETE FROM pipeline_state WHERE key = 'actual_vs_forecast.inputs';
+    IF inputs IS NOT NULL THEN
+        INSERT INTO pipeline_state (key, value) VALUES ('actual_vs_forecast.inputs', inputs);
+    END IF;
+END $$;
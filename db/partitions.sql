@@ -0,0 +1,31 @@
+-- Monthly range partitions (fact_sales by order_date, raw_sales by "Order Date")
+-- Partitions are named <parent>_yYYYYmMM and cover [month, month + 1).
+--
+-- Run before db/transform/ / db/transform_incremental.sql (idempotent).
+
+-- Create the missing monthly partitions of `parent` between two dates;
+-- returns how many were created
+CREATE OR REPLACE FUNCTION create_month_partitions(parent TEXT, first_day DATE, last_day DATE)
+RETURNS INT
+LANGUAGE plpgsql AS $$
+DECLARE
+    month   DATE := DATE_TRUNC('month', first_day)::DATE;
+    part    TEXT;
+    created INT := 0;
+BEGIN
+    IF first_day IS NULL OR last_day IS NULL THEN
+        RETURN 0;
+    END IF;
+    WHILE month <= last_day LOOP
+        part := parent || '_' || to_char(month, '"y"YYYY"m"MM');
+        IF to_regclass(quote_ident(part)) IS NULL THEN
+            EXECUTE 'CREATE TABLE ' || quote_ident(part)
+                || ' PARTITION OF ' || quote_ident(parent)
+                || ' FOR VALUES FROM (' || quote_literal(month)
+                || ') TO (' || quote_literal((month + INTERVAL '1 month')::DATE) || ')';
+            created := created + 1;
+        END IF;
+        month := (month + INTERVAL '1 month')::DATE;
+    END LOOP;
+    RETURN created;
+END $$;
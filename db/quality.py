@@ -0,0 +1,239 @@
+"""
+Data-Quality Profiler
+- Profiles every table in PROFILES with ONE aggregate query (one scan):
+  row count, NULLs per required column, negative measures, duplicate keys,
+  date bounds, revenue total and table-specific violation counts
+- Appends the profile to dq_results, one row per table, keyed by run_id
+  (dq_results_run_id_seq)
+- failures() turns a profile into violation messages, including the
+  cross-table checks (raw/fact/KPI revenue agree, forecast starts after
+  the last actual day); main() raises when there are any, after persisting
+- Runs in-process as the DAG's validate task; the pytest suite asserts on
+  the same profile (tests/conftest.py `profile` fixture)
+- Run as a module from the repo root: python -m db.quality
+"""
+import json
+import time
+import logging
+from sqlalchemy import text
+
+from db.engine import get_engine
+from pipeline.instrumentation import stage
+from pipeline.runtime import configure_logging
+
+log = logging.getLogger("db.quality")
+
+RESULTS_TABLE = "dq_results"
+REVENUE_TOLERANCE = 1e-6
+SEGMENTS = ["Consumer", "Corporate", "Home Office"]
+REGIONS = ["West", "East", "Central", "South"]
+
+# Per table: required (non-NULL) columns, negative-measure condition, key
+# columns, date column, revenue column, named violation conditions
+PROFILES = {
+    "raw_sales": {
+        "nulls": ["Order ID", "Product ID", "Order Date", "Ship Date", "Sales"],
+        "negative": '"Sales" < 0',
+        "key": ["Order ID", "Product ID"],
+        "date": "Order Date",
+        "revenue": "Sales",
+    },
+    "fact_sales": {
+        "nulls": ["customer_key", "ship_date", "sales"],
+        "negative": "sales < 0",
+        "key": ["order_key", "product_key"],
+        "date": "order_date",
+        "revenue": "sales",
+    },
+    "kpi_daily": {
+        "nulls": ["order_date", "total_orders", "unique_customers", "total_revenue", "avg_order_value"],
+        "negative": "total_revenue < 0",
+        "key": ["order_date"],
+        "date": "order_date",
+        "revenue": "total_revenue",
+    },
+    "cohort_analysis": {
+        "nulls": ["customers", "retained_customers"],
+        "negative": "retained_customers < 0",
+        "key": ["cohort_month", "order_month"],
+        "date": "order_month",
+    },
+    "forecast_revenue": {
+        "nulls": ["ds", "yhat", "yhat_lower", "yhat_upper"],
+        "negative": "yhat < 0",
+        "key": ["ds"],
+        "date": "ds",
+        "checks": {"outside_interval": "yhat < yhat_lower OR yhat > yhat_upper"},
+    },
+    "dim_customer": {
+        "key": ["customer_id"],
+        "checks": {
+            "unexpected_segment": "segment NOT IN (" + ", ".join(f"'{s}'" for s in SEGMENTS) + ")",
+            "unexpected_region": "region NOT IN (" + ", ".join(f"'{r}'" for r in REGIONS) + ")",
+        },
+    },
+}
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def profile_sql(table, spec):
+    """One-scan aggregate query for `table`; returns (sql, output field names in column order)"""
+    fields = ["row_count"]
+    exprs = ["COUNT(*)"]
+    for column in spec.get("nulls", []):
+        fields.append(("nulls", column))
+        exprs.append(f"COUNT(*) - COUNT({_quote(column)})")
+    if "negative" in spec:
+        fields.append("negative_count")
+        exprs.append(f"COUNT(*) FILTER (WHERE {spec['negative']})")
+    if "key" in spec:
+        key = ", ".join(_quote(c) for c in spec["key"])
+        fields.append("duplicate_keys")
+        # Rows beyond the first per key; the distinct count shares the single scan
+        exprs.append(f"COUNT(*) - COUNT(DISTINCT ({key}))")
+    if "date" in spec:
+        fields += ["min_date", "max_date"]
+        exprs += [f"MIN({_quote(spec['date'])})::DATE", f"MAX({_quote(spec['date'])})::DATE"]
+    if "revenue" in spec:
+        fields.append("revenue")
+        exprs.append(f"SUM({_quote(spec['revenue'])})::NUMERIC")
+    for name, condition in spec.get("checks", {}).items():
+        fields.append(("checks", name))
+        exprs.append(f"COUNT(*) FILTER (WHERE {condition})")
+    return f"SELECT {', '.join(exprs)} FROM {_quote(table)}", fields
+
+
+def profile_from_row(fields, row):
+    """The profile dict for one result row of profile_sql()"""
+    profile = {
+        "row_count": 0, "nulls": {}, "negative_count": None, "duplicate_keys": None,
+        "min_date": None, "max_date": None, "revenue": None, "checks": {},
+    }
+    for field, value in zip(fields, row):
+        if isinstance(field, tuple):
+            profile[field[0]][field[1]] = int(value)
+        else:
+            profile[field] = value
+    return profile
+
+
+def profile_table(conn, table, spec):
+    """Run the one-scan profile of `table`; returns a flat dict of its metrics"""
+    sql, fields = profile_sql(table, spec)
+    started = time.perf_counter()
+    profile = profile_from_row(fields, conn.execute(text(sql)).one())
+    profile["seconds"] = time.perf_counter() - started
+    log.info(f"🔎 Profiled {table}: {profile['row_count']:,} rows in {profile['seconds'] * 1000:.1f} ms")
+    return profile
+
+
+def profile_tables(conn, profiles=PROFILES):
+    """Profile every existing table in `profiles` (one scan each); missing tables are skipped"""
+    existing = set(conn.execute(
+        text("SELECT t FROM unnest(CAST(:tables AS TEXT[])) t WHERE to_regclass(t) IS NOT NULL"),
+        {"tables": list(profiles)},
+    ).scalars())
+    result = {}
+    for table, spec in profiles.items():
+        if table not in existing:
+            log.warning(f"⚠️ {table} does not exist; not profiled")
+            continue
+        result[table] = profile_table(conn, table, spec)
+    return result
+
+
+def write_results(conn, profiles):
+    """Append one dq_results row per profiled table under a new run_id; returns the run_id"""
+    conn.execute(text(f"""
+        CREATE SEQUENCE IF NOT EXISTS {RESULTS_TABLE}_run_id_seq;
+        CREATE TABLE IF NOT EXISTS {RESULTS_TABLE} (
+            run_id BIGINT NOT NULL,
+            run_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            table_name TEXT NOT NULL,
+            row_count BIGINT NOT NULL,
+            null_counts JSONB NOT NULL,
+            negative_count BIGINT,
+            duplicate_keys BIGINT,
+            min_date DATE,
+            max_date DATE,
+            revenue NUMERIC,
+            checks JSONB NOT NULL,
+            seconds DOUBLE PRECISION,
+            PRIMARY KEY (run_id, table_name)
+        );
+    """))
+    run_id = conn.execute(text(f"SELECT nextval('{RESULTS_TABLE}_run_id_seq')")).scalar()
+    conn.execute(text(f"""
+        INSERT INTO {RESULTS_TABLE}
+            (run_id, table_name, row_count, null_counts, negative_count, duplicate_keys,
+             min_date, max_date, revenue, checks, seconds)
+        VALUES
+            (:run_id, :table_name, :row_count, CAST(:nulls AS JSONB), :negative_count, :duplicate_keys,
+             :min_date, :max_date, :revenue, CAST(:checks AS JSONB), :seconds)
+    """), [
+        {**p, "run_id": run_id, "table_name": table, "nulls": json.dumps(p["nulls"]), "checks": json.dumps(p["checks"])}
+        for table, p in profiles.items()
+    ])
+    return run_id
+
+
+def failures(profiles, tables=None):
+    """Violation messages for a profile (empty list = all checks pass); `tables` limits which must exist"""
+    problems = []
+    for table, spec in PROFILES.items():
+        if tables is not None and table not in tables:
+            continue
+        p = profiles.get(table)
+        if p is None:
+            problems.append(f"{table} is missing")
+            continue
+        if p["row_count"] == 0:
+            problems.append(f"{table} is empty")
+        problems += [f"{table}: {n} NULL {c}" for c, n in p["nulls"].items() if n]
+        if p["negative_count"]:
+            problems.append(f"{table}: {p['negative_count']} rows with {spec['negative']}")
+        if p["duplicate_keys"]:
+            problems.append(f"{table}: {p['duplicate_keys']} duplicate ({', '.join(spec['key'])}) rows")
+        problems += [f"{table}: {n} rows {name}" for name, n in p["checks"].items() if n]
+
+    revenue = {t: profiles[t]["revenue"] for t in ["raw_sales", "fact_sales", "kpi_daily"] if t in profiles}
+    if len(revenue) > 1 and None not in revenue.values():
+        base = revenue.get("raw_sales", next(iter(revenue.values())))
+        problems += [
+            f"{t} revenue {total} does not match raw_sales {base}"
+            for t, total in revenue.items() if abs(total - base) >= REVENUE_TOLERANCE
+        ]
+
+    if "kpi_daily" in profiles and "forecast_revenue" in profiles:
+        last_actual = profiles["kpi_daily"]["max_date"]
+        first_forecast = profiles["forecast_revenue"]["min_date"]
+        if last_actual and first_forecast and first_forecast <= last_actual:
+            problems.append(f"forecast_revenue starts {first_forecast}, not after the last actual day {last_actual}")
+    return problems
+
+
+def main():
+    """Profile, persist to dq_results, then fail on any violation"""
+    configure_logging()
+    started = time.perf_counter()
+    with stage("quality.profile") as stats, get_engine().begin() as conn:
+        profiles = profile_tables(conn)
+        run_id = write_results(conn, profiles)
+        stats.rows_in = sum(p["row_count"] for p in profiles.values())
+
+    problems = failures(profiles)
+    for problem in problems:
+        log.error(f"❌ {problem}")
+    if problems:
+        raise ValueError(f"❌ Data quality run {run_id}: {len(problems)} check(s) failed")
+    log.info(
+        f"✅ Data quality run {run_id}: {len(profiles)} tables profiled and passed "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
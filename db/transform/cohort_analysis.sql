@@ -0,0 +1,37 @@
+-- Transform node: cohort_analysis (after fact_sales)
+DROP TABLE IF EXISTS cohort_analysis CASCADE;
+DROP TABLE IF EXISTS customer_first_purchase CASCADE;
+
+-- Customer first purchase (cohort assignment)
+-- Persisted so db/transform_incremental.sql can update cohorts in place
+CREATE TABLE customer_first_purchase AS
+SELECT
+    customer_key,
+    DATE_TRUNC('month', MIN(order_date))::DATE AS cohort_month
+FROM fact_sales
+GROUP BY customer_key;
+
+-- Cohort Analysis (Retention)
+-- Proper CREATE TABLE with CTE
+CREATE TABLE cohort_analysis AS
+WITH order_periods AS (
+    SELECT
+        f.customer_key,
+        DATE_TRUNC('month', f.order_date)::DATE AS order_month,
+        fp.cohort_month
+    FROM fact_sales f
+    JOIN customer_first_purchase fp ON f.customer_key = fp.customer_key
+)
+SELECT
+    cohort_month,
+    order_month,
+    COUNT(DISTINCT customer_key) AS customers,
+    COUNT(DISTINCT CASE WHEN order_month > cohort_month THEN customer_key END) AS retained_customers
+FROM order_periods
+GROUP BY cohort_month, order_month
+ORDER BY cohort_month, order_month;
+
+ALTER TABLE customer_first_purchase ADD PRIMARY KEY (customer_key);
+ALTER TABLE cohort_analysis ADD PRIMARY KEY (cohort_month, order_month);
+ANALYZE customer_first_purchase;
+ANALYZE cohort_analysis;
@@ -0,0 +1,23 @@
+-- Transform node: dim_customer (after keys)
+DROP TABLE IF EXISTS dim_customer CASCADE;
+
+-- Dimension: Customer
+-- One row per customer: attributes as of their first order
+CREATE TABLE dim_customer AS
+SELECT DISTINCT ON (r."Customer ID")
+    k.customer_key,
+    r."Customer ID"   AS customer_id,
+    r."Customer Name" AS customer_name,
+    r."Segment"       AS segment,
+    r."Country"       AS country,
+    r."City"          AS city,
+    r."State"         AS state,
+    r."Postal Code"   AS postal_code,
+    r."Region"        AS region
+FROM raw_sales r
+JOIN customer_keys k ON k.customer_id = r."Customer ID"
+ORDER BY r."Customer ID", r."Order Date", r."Order ID", r."Product ID";
+
+ALTER TABLE dim_customer ADD PRIMARY KEY (customer_key);
+ALTER TABLE dim_customer ADD UNIQUE (customer_id);
+ANALYZE dim_customer;
@@ -0,0 +1,19 @@
+-- Transform node: dim_product (after keys)
+DROP TABLE IF EXISTS dim_product CASCADE;
+
+-- Dimension: Product
+-- One row per product: attributes as first sold
+CREATE TABLE dim_product AS
+SELECT DISTINCT ON (r."Product ID")
+    k.product_key,
+    r."Product ID"    AS product_id,
+    r."Category"      AS category,
+    r."Sub-Category"  AS sub_category,
+    r."Product Name"  AS product_name
+FROM raw_sales r
+JOIN product_keys k ON k.product_id = r."Product ID"
+ORDER BY r."Product ID", r."Order Date", r."Order ID";
+
+ALTER TABLE dim_product ADD PRIMARY KEY (product_key);
+ALTER TABLE dim_product ADD UNIQUE (product_id);
+ANALYZE dim_product;
@@ -0,0 +1,54 @@
+-- Transform node: fact_sales (after keys; needs db/partitions.sql)
+DROP TABLE IF EXISTS fact_sales CASCADE;
+
+-- Fact: Sales
+-- Deduplicate by Order ID + Product ID; integer keys only.
+-- Range-partitioned by order month so date-bounded reads and the
+-- incremental refresh only touch the months involved
+CREATE TABLE fact_sales (
+    order_key    INT NOT NULL,
+    product_key  INT NOT NULL,
+    customer_key INT,
+    order_date   DATE NOT NULL,
+    ship_date    DATE,
+    ship_mode    TEXT,
+    sales        NUMERIC
+) PARTITION BY RANGE (order_date);
+
+DO $$
+BEGIN
+    PERFORM create_month_partitions('fact_sales', MIN("Order Date")::DATE, MAX("Order Date")::DATE)
+    FROM raw_sales;
+END $$;
+
+INSERT INTO fact_sales
+SELECT
+    o.order_key,
+    p.product_key,
+    c.customer_key,
+    r.order_date,
+    r.ship_date,
+    r.ship_mode,
+    r.sales
+FROM (
+    SELECT
+        "Order ID"                   AS order_id,
+        "Product ID"                 AS product_id,
+        MIN("Order Date")::DATE      AS order_date,
+        MIN("Ship Date")::DATE       AS ship_date,
+        MIN("Ship Mode")             AS ship_mode,
+        MIN("Customer ID")           AS customer_id,
+        SUM("Sales")::NUMERIC        AS sales
+    FROM raw_sales
+    GROUP BY "Order ID", "Product ID"
+) r
+JOIN order_keys o ON o.order_id = r.order_id
+JOIN product_keys p ON p.product_id = r.product_id
+JOIN customer_keys c ON c.customer_id = r.customer_id;
+
+-- The partition key has to be part of the primary key; an order has one date
+ALTER TABLE fact_sales ADD PRIMARY KEY (order_key, product_key, order_date);
+CREATE INDEX fact_sales_order_date_idx ON fact_sales (order_date);
+CREATE INDEX fact_sales_customer_key_idx ON fact_sales (customer_key);
+CREATE INDEX fact_sales_product_key_idx ON fact_sales (product_key);
+ANALYZE fact_sales;
@@ -0,0 +1,41 @@
+-- Transform node: keys (db/transform_graph.py; runs first)
+-- Surrogate keys: natural ID -> stable integer, append-only.
+-- customer_keys / product_keys / order_keys are never dropped: they hold
+-- the surrogate key assignments and must stay stable across runs
+CREATE TABLE IF NOT EXISTS customer_keys (
+    customer_key INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    customer_id  TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS product_keys (
+    product_key INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    product_id  TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS order_keys (
+    order_key INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    order_id  TEXT NOT NULL UNIQUE
+);
+
+-- Anti-join rather than ON CONFLICT so existing IDs don't burn identity values
+INSERT INTO customer_keys (customer_id)
+SELECT DISTINCT r."Customer ID"
+FROM raw_sales r
+WHERE NOT EXISTS (SELECT 1 FROM customer_keys k WHERE k.customer_id = r."Customer ID")
+ORDER BY 1;
+
+INSERT INTO product_keys (product_id)
+SELECT DISTINCT r."Product ID"
+FROM raw_sales r
+WHERE NOT EXISTS (SELECT 1 FROM product_keys k WHERE k.product_id = r."Product ID")
+ORDER BY 1;
+
+INSERT INTO order_keys (order_id)
+SELECT DISTINCT r."Order ID"
+FROM raw_sales r
+WHERE NOT EXISTS (SELECT 1 FROM order_keys k WHERE k.order_id = r."Order ID")
+ORDER BY 1;
+
+ANALYZE customer_keys;
+ANALYZE product_keys;
+ANALYZE order_keys;
@@ -0,0 +1,58 @@
+-- Transform node: kpi_daily (after fact_sales)
+-- Rebuilt in place (DELETE + INSERT in this node's transaction), never
+-- dropped: actual_vs_forecast depends on kpi_daily, and a DROP ... CASCADE
+-- would take the materialized view and its unique index with it, so
+-- db/join_actuals_forecast.sql could only ever recreate it instead of
+-- refreshing it concurrently (or skipping an unchanged refresh).
+-- Readers keep seeing the previous rows until the node commits.
+CREATE TABLE IF NOT EXISTS kpi_daily (
+    order_date       DATE,
+    total_orders     BIGINT,
+    unique_customers BIGINT,
+    total_revenue    NUMERIC,
+    avg_order_value  NUMERIC,
+    PRIMARY KEY (order_date)
+);
+
+DELETE FROM kpi_daily;
+
+-- CREATE TABLE IF NOT EXISTS leaves an existing kpi_daily alone: databases
+-- built before order_date became its primary key get it added here, on
+-- the emptied table so old duplicates can't block it
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'kpi_daily'::REGCLASS AND contype = 'p'
+    ) THEN
+        ALTER TABLE kpi_daily ADD PRIMARY KEY (order_date);
+    END IF;
+END
+$$;
+
+-- KPI Table (Daily Metrics)
+-- avg_order_value guarded against nulls
+INSERT INTO kpi_daily
+SELECT
+    order_date,
+    COUNT(DISTINCT order_key)    AS total_orders,
+    COUNT(DISTINCT customer_key) AS unique_customers,
+    SUM(sales)                   AS total_revenue,
+    CASE
+        WHEN COUNT(DISTINCT order_key) = 0 THEN 0
+        ELSE SUM(sales)::NUMERIC / COUNT(DISTINCT order_key)
+    END AS avg_order_value
+FROM fact_sales
+GROUP BY order_date;
+
+ANALYZE kpi_daily;
+
+-- New kpi_daily version for db/join_actuals_forecast.sql's refresh check
+CREATE TABLE IF NOT EXISTS pipeline_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO pipeline_state (key, value) VALUES ('kpi_daily.version', clock_timestamp()::TEXT)
+ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = now();
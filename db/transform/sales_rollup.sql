@@ -0,0 +1,47 @@
+-- Transform node: sales_rollup (after fact_sales, dim_customer, dim_product;
+-- needs db/hll.sql)
+DROP TABLE IF EXISTS sales_rollup CASCADE;
+
+-- Sales rollup for dashboard slices: revenue, orders and distinct
+-- customers per date grain (day/week/month) x CUBE(region, segment,
+-- category, ship_mode). 'All' marks a rolled-up dimension, so every
+-- slice is one equality lookup. customers_hll is a mergeable sketch
+-- (db/hll.sql): roll slices up further with hll_union_agg
+CREATE TABLE sales_rollup AS
+SELECT
+    grain,
+    period_start,
+    region,
+    segment,
+    category,
+    ship_mode,
+    revenue,
+    orders,
+    hll_cardinality(customers_hll) AS customers,
+    customers_hll
+FROM (
+    SELECT
+        g.grain,
+        g.period_start,
+        CASE WHEN GROUPING(c.region) = 1 THEN 'All' ELSE COALESCE(c.region, 'Unknown') END       AS region,
+        CASE WHEN GROUPING(c.segment) = 1 THEN 'All' ELSE COALESCE(c.segment, 'Unknown') END     AS segment,
+        CASE WHEN GROUPING(p.category) = 1 THEN 'All' ELSE COALESCE(p.category, 'Unknown') END   AS category,
+        CASE WHEN GROUPING(f.ship_mode) = 1 THEN 'All' ELSE COALESCE(f.ship_mode, 'Unknown') END AS ship_mode,
+        SUM(f.sales)                           AS revenue,
+        COUNT(DISTINCT f.order_key)            AS orders,
+        hll_compact(array_agg(f.customer_reg)) AS customers_hll
+    FROM (SELECT *, hll_register(customer_key) AS customer_reg FROM fact_sales) f
+    JOIN dim_customer c ON c.customer_key = f.customer_key
+    JOIN dim_product p ON p.product_key = f.product_key
+    CROSS JOIN LATERAL (VALUES
+        ('day', f.order_date),
+        ('week', DATE_TRUNC('week', f.order_date)::DATE),
+        ('month', DATE_TRUNC('month', f.order_date)::DATE)
+    ) g(grain, period_start)
+    GROUP BY g.grain, g.period_start, CUBE (c.region, c.segment, p.category, f.ship_mode)
+) r;
+
+-- Dimensions first, period last: any slice + date range is one index range scan
+ALTER TABLE sales_rollup ADD PRIMARY KEY (grain, region, segment, category, ship_mode, period_start);
+CREATE INDEX sales_rollup_period_idx ON sales_rollup (grain, period_start);
+ANALYZE sales_rollup;
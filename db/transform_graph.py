@@ -0,0 +1,149 @@
+"""
+Transform Task Graph
+- The full rebuild as one SQL file per object (db/transform/<node>.sql),
+  each run in its own transaction on its own pooled connection
+- TRANSFORM_GRAPH lists every node's upstream nodes; independent builds
+  (the dimensions and fact_sales; kpi_daily, cohort_analysis and
+  sales_rollup) run concurrently, so a run takes its critical path
+  instead of the sum of all steps
+- The DAG turns the same graph into one task per node; run_graph() is the
+  local/CI runner (TRANSFORM_WORKERS threads, .env included, read when it
+  runs)
+- Imports only the stdlib at module level: the DAG file reads the graph
+  every time the scheduler parses it
+- Run as a module from the repo root: python -m db.transform_graph
+"""
+import os
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from pipeline.runtime import configure_logging, load_env
+
+log = logging.getLogger("db.transform_graph")
+
+DB_DIR = os.path.dirname(os.path.abspath(__file__))
+TRANSFORM_DIR = os.path.join(DB_DIR, "transform")
+TRANSFORM_WORKERS = None  # TRANSFORM_WORKERS (default 4); None: read from the environment by settings()
+
+# SQL helpers the nodes call (idempotent CREATE OR REPLACE), loaded by the first node
+HELPER_SQL = ["hll.sql", "partitions.sql"]
+
+# node -> upstream nodes; one db/transform/<node>.sql per node
+TRANSFORM_GRAPH = {
+    "keys": [],
+    "dim_customer": ["keys"],
+    "dim_product": ["keys"],
+    "fact_sales": ["keys"],
+    "kpi_daily": ["fact_sales"],
+    "cohort_analysis": ["fact_sales"],
+    "sales_rollup": ["fact_sales", "dim_customer", "dim_product"],
+}
+
+
+def settings():
+    """TRANSFORM_* settings: the module globals where set, else the environment (and .env), read now"""
+    load_env()
+    return {"workers": TRANSFORM_WORKERS or int(os.getenv("TRANSFORM_WORKERS", "4"))}
+
+
+def node_sql(node):
+    """SQL files run by `node`, in order"""
+    paths = [os.path.join(DB_DIR, p) for p in HELPER_SQL] if node == "keys" else []
+    return paths + [os.path.join(TRANSFORM_DIR, f"{node}.sql")]
+
+
+def topological_order(graph=TRANSFORM_GRAPH):
+    """Nodes with every node after its upstream nodes (graph order among ready nodes)"""
+    unknown = {up for ups in graph.values() for up in ups} - set(graph)
+    if unknown:
+        raise ValueError(f"❌ Transform graph depends on unknown node(s) {sorted(unknown)}")
+    order, done = [], set()
+    while len(order) < len(graph):
+        ready = [n for n, ups in graph.items() if n not in done and done.issuperset(ups)]
+        if not ready:
+            raise ValueError(f"❌ Transform graph has a cycle among {sorted(set(graph) - done)}")
+        order += ready
+        done.update(ready)
+    return order
+
+
+def critical_path(graph, seconds):
+    """Longest chain of nodes by wall time; returns (nodes, seconds)"""
+    longest = {}
+    for node in topological_order(graph):
+        before = max((longest[up] for up in graph[node]), key=lambda p: p[1], default=([], 0.0))
+        longest[node] = (before[0] + [node], before[1] + seconds[node])
+    return max(longest.values(), key=lambda p: p[1])
+
+
+def run_node(node):
+    """Build one node: its SQL files in one transaction, timed per statement"""
+    from pipeline.instrumentation import run_sql_files
+    run_sql_files(f"transform.{node}", node_sql(node))
+
+
+def run_graph(graph=TRANSFORM_GRAPH, workers=None, runner=run_node, stage_name="transform"):
+    """
+    Run every node once its upstream nodes have succeeded, up to `workers`
+    at a time. A failed node's downstream nodes are skipped; independent
+    branches still finish, then ValueError names what failed.
+    Each node's stage records its own thread's CPU and no peak RSS (see
+    pipeline/instrumentation.py); the enclosing stage has the process totals.
+    Returns {node: wall seconds}.
+    """
+    from pipeline.instrumentation import stage
+
+    workers = workers or settings()["workers"]
+    order = topological_order(graph)
+    seconds, failed = {}, {}
+
+    def timed(node):
+        started = time.perf_counter()
+        try:
+            runner(node)
+        finally:
+            seconds[node] = time.perf_counter() - started
+
+    with stage(stage_name), ThreadPoolExecutor(max_workers=workers) as pool:
+        started = time.perf_counter()
+        running, done, skipped = {}, set(), set()
+        while True:
+            for node in order:
+                if node in done or node in failed or node in skipped or node in running.values():
+                    continue
+                if any(up in failed or up in skipped for up in graph[node]):
+                    skipped.add(node)
+                elif done.issuperset(graph[node]):
+                    running[pool.submit(timed, node)] = node
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                node = running.pop(future)
+                if future.exception() is not None:
+                    failed[node] = future.exception()
+                    log.error(f"❌ Transform node {node} failed: {future.exception()}")
+                else:
+                    done.add(node)
+        elapsed = time.perf_counter() - started
+
+    if failed:
+        raise ValueError(
+            f"❌ Transform failed at {sorted(failed)}; skipped {sorted(skipped) or 'nothing'}"
+        )
+    path, path_seconds = critical_path(graph, seconds)
+    log.info(
+        f"✅ Transform graph: {len(order)} nodes in {elapsed:.2f}s with {workers} workers "
+        f"(serial {sum(seconds.values()):.2f}s); critical path {' → '.join(path)} {path_seconds:.2f}s"
+    )
+    return seconds
+
+
+def main():
+    configure_logging()
+    run_graph()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Parquet staging cache for the cleaned raw sales feed
+- One snapshot per input file and cleaning schema: the caller's key is the
+  file's content hash plus a hash of the schema/cleaning version
+  (etl.load_data.snapshot_key), so a schema change never serves stale rows
+- Snapshots are the cleaned, typed, deduplicated frame, partitioned by
+  order month (ETL_CACHE_DIR/<fingerprint>/order_month=YYYY-MM/*.parquet)
+- Written to a temp directory and renamed into place, so a snapshot is
+  either complete or absent
+- A snapshot can carry a small JSON sidecar (META_FILE, e.g. the schema
+  violations coerced while cleaning); the "_" prefix keeps it out of the
+  Parquet dataset
+- Readers prune partitions by date range and read only the columns they need
+- Keeps the ETL_CACHE_RETENTION most recently used snapshots, deletes the rest
+- Settings (ETL_CACHE, ETL_CACHE_DIR, ETL_CACHE_RETENTION; .env included)
+  are read by settings() when the cache is used, never at import; the
+  CACHE_* globals override them when set (tests, benchmarks)
+"""
+import os
+import json
+import shutil
+import time
+import importlib.util
+import logging
+import pandas as pd
+
+from pipeline.runtime import load_env
+
+log = logging.getLogger("etl.cache")
+
+# None: read from the environment by settings(); set to override it
+CACHE_ENABLED = None  # ETL_CACHE (default on)
+CACHE_DIR = None  # ETL_CACHE_DIR (default data/cache)
+CACHE_RETENTION = None  # ETL_CACHE_RETENTION: snapshots kept (default 3)
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache")
+STALE_TMP_SECONDS = 3600  # leftover temp dirs of crashed writers
+PARTITION_COLUMN = "order_month"
+DATE_COLUMN = "Order Date"
+META_FILE = "_meta.json"
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def settings():
+    """ETL_CACHE* settings: the CACHE_* globals where set, else the environment (and .env), read now"""
+    load_env()
+    return {
+        "enabled": (
+            CACHE_ENABLED if CACHE_ENABLED is not None
+            else os.getenv("ETL_CACHE", "1").lower() in ("1", "true", "yes")
+        ),
+        "dir": CACHE_DIR or os.getenv("ETL_CACHE_DIR", DEFAULT_CACHE_DIR),
+        "retention": CACHE_RETENTION if CACHE_RETENTION is not None else int(os.getenv("ETL_CACHE_RETENTION", "3")),
+    }
+
+
+def cache_dir():
+    return settings()["dir"]
+
+
+def enabled():
+    """True when the cache is switched on and pyarrow is available"""
+    on = settings()["enabled"]
+    if on and not HAS_PYARROW:
+        log.warning("⚠️ ETL_CACHE is on but pyarrow is not installed; Parquet cache disabled")
+    return on and HAS_PYARROW
+
+
+def snapshot_path(fingerprint):
+    return os.path.join(cache_dir(), fingerprint)
+
+
+def list_snapshots():
+    """Snapshot fingerprints, most recently used first"""
+    root = cache_dir()
+    if not os.path.isdir(root):
+        return []
+    names = [
+        name for name in os.listdir(root)
+        if not name.startswith(".") and os.path.isdir(snapshot_path(name))
+    ]
+    return sorted(names, key=lambda name: os.path.getmtime(snapshot_path(name)), reverse=True)
+
+
+def has_snapshot(fingerprint):
+    return os.path.isdir(snapshot_path(fingerprint))
+
+
+def write_snapshot(df, fingerprint, meta=None):
+    """Write df (and its `meta` dict, if any) as the snapshot for fingerprint (no-op if it already exists)"""
+    target = snapshot_path(fingerprint)
+    if has_snapshot(fingerprint):
+        return target
+
+    root = cache_dir()
+    os.makedirs(root, exist_ok=True)
+    tmp = os.path.join(root, f".tmp-{fingerprint}-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    try:
+        df.assign(**{PARTITION_COLUMN: df[DATE_COLUMN].dt.strftime("%Y-%m")}).to_parquet(
+            tmp, engine="pyarrow", index=False, partition_cols=[PARTITION_COLUMN]
+        )
+        if meta is not None:
+            with open(os.path.join(tmp, META_FILE), "w") as fh:
+                json.dump(meta, fh)
+        os.replace(tmp, target)
+    except OSError:
+        # Another run published the same snapshot first
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not has_snapshot(fingerprint):
+            raise
+    log.info(f"✅ Cached {len(df):,} rows as Parquet snapshot {fingerprint[:12]} in {root}")
+    prune()
+    return target
+
+
+def read_meta(fingerprint):
+    """The snapshot's sidecar dict ({} if it was written without one)"""
+    path = os.path.join(snapshot_path(fingerprint), META_FILE)
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def read_snapshot(fingerprint=None, start=None, end=None, columns=None):
+    """
+    Read a snapshot (latest if fingerprint is None) as a DataFrame.
+    start/end bound Order Date (inclusive) and skip whole month partitions
+    outside the range; columns limits which columns are read.
+    """
+    if fingerprint is None:
+        snapshots = list_snapshots()
+        if not snapshots:
+            raise ValueError(f"❌ No Parquet snapshots in {cache_dir()}; run the ETL first")
+        fingerprint = snapshots[0]
+    elif not has_snapshot(fingerprint):
+        raise ValueError(f"❌ No Parquet snapshot for {fingerprint[:12]} in {cache_dir()}")
+
+    filters = []
+    if start is not None:
+        start = pd.Timestamp(start)
+        filters += [(PARTITION_COLUMN, ">=", start.strftime("%Y-%m")), (DATE_COLUMN, ">=", start)]
+    if end is not None:
+        end = pd.Timestamp(end)
+        filters += [(PARTITION_COLUMN, "<=", end.strftime("%Y-%m")), (DATE_COLUMN, "<=", end)]
+
+    path = snapshot_path(fingerprint)
+    df = pd.read_parquet(path, engine="pyarrow", columns=columns, filters=filters or None)
+    os.utime(path)  # mark as recently used for retention
+    return df.drop(columns=[PARTITION_COLUMN], errors="ignore")
+
+
+def prune(keep=None):
+    """Delete all but the `keep` most recently used snapshots (and leftover temp dirs)"""
+    config = settings()
+    root = config["dir"]
+    keep = config["retention"] if keep is None else keep
+    stale = list_snapshots()[max(keep, 0):]
+    if os.path.isdir(root):
+        stale += [
+            name for name in os.listdir(root)
+            if name.startswith(".tmp-")
+            and time.time() - os.path.getmtime(os.path.join(root, name)) > STALE_TMP_SECONDS
+        ]
+    for name in stale:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    if stale:
+        log.info(f"🧹 Pruned {len(stale)} cached snapshot(s) from {root} (keeping {keep})")
+    return stale
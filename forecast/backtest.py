@@ -0,0 +1,233 @@
+"""
+Forecast Backtesting
+- Rolling-origin evaluation of the configured FORECAST_BACKEND on kpi_daily:
+  BACKTEST_CUTOFFS cutoffs, BACKTEST_STEP days apart, the latest one
+  FORECAST_HORIZON days before the last actual so every horizon is scored
+- kpi_daily is queried once; each worker process receives the history when
+  it starts and slices its own training frame per cutoff
+- Cutoffs run in a BACKTEST_WORKERS process pool, most recent first, under
+  a BACKTEST_BUDGET_SECONDS time budget: cutoffs not finished in time are
+  dropped (and logged) instead of stalling the DAG. The budget is a hard
+  limit: when it runs out, the workers still fitting are killed with their
+  process group (Prophet's Stan subprocess included), nothing runs on
+- Appends MAPE, RMSE and prediction-interval coverage per horizon bucket to
+  forecast_accuracy (one set of rows per run)
+- Run as a module from the repo root: python -m forecast.backtest
+"""
+import os
+import time
+import signal
+import logging
+import multiprocessing
+import concurrent.futures
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from db.engine import get_engine
+from forecast import model_cache
+from forecast import revenue_forecast as rf
+from pipeline.instrumentation import stage
+from pipeline.runtime import configure_logging, load_env
+
+log = logging.getLogger("forecast.backtest")
+
+# Defaults; configure() overrides them from the environment when the backtest runs
+BACKTEST_CUTOFFS = 6  # BACKTEST_CUTOFFS
+BACKTEST_STEP = 30  # BACKTEST_STEP: days between cutoffs
+BACKTEST_MIN_TRAIN = 365  # BACKTEST_MIN_TRAIN: days of history before the first cutoff
+BACKTEST_WORKERS = os.cpu_count() or 1  # BACKTEST_WORKERS
+BACKTEST_BUDGET_SECONDS = 600.0  # BACKTEST_BUDGET_SECONDS
+ACCURACY_TABLE = "forecast_accuracy"
+HORIZON_BUCKETS = [(1, 7), (8, 30), (31, 60), (61, 90)]  # days after the cutoff, inclusive
+
+_history = None
+
+
+def configure():
+    """Read the BACKTEST_* (and FORECAST_*) settings from the environment (and .env); main() calls it"""
+    global BACKTEST_CUTOFFS, BACKTEST_STEP, BACKTEST_MIN_TRAIN, BACKTEST_WORKERS, BACKTEST_BUDGET_SECONDS
+    load_env()
+    rf.configure()
+    BACKTEST_CUTOFFS = int(os.getenv("BACKTEST_CUTOFFS", BACKTEST_CUTOFFS))
+    BACKTEST_STEP = int(os.getenv("BACKTEST_STEP", BACKTEST_STEP))
+    BACKTEST_MIN_TRAIN = int(os.getenv("BACKTEST_MIN_TRAIN", BACKTEST_MIN_TRAIN))
+    BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", BACKTEST_WORKERS))
+    BACKTEST_BUDGET_SECONDS = float(os.getenv("BACKTEST_BUDGET_SECONDS", BACKTEST_BUDGET_SECONDS))
+
+
+def _init_worker(history, started):
+    """
+    Process-pool initializer: keep the shared history, never touch the
+    production model cache, and report this worker's process group on
+    `started` for stop_workers()
+    """
+    global _history
+    _history = history
+    model_cache.MODEL_CACHE_ENABLED = False
+    # Own process group: stop_workers() kills the worker and the Stan process it may be running
+    os.setpgrp()
+    started.put(os.getpid())
+
+
+def plan_cutoffs(history, horizon=rf.FORECAST_HORIZON, count=None, step=None):
+    """Cutoff dates, most recent first, each leaving `horizon` observable days after it"""
+    count = BACKTEST_CUTOFFS if count is None else count
+    step = BACKTEST_STEP if step is None else step
+    first, last = history["ds"].min(), history["ds"].max()
+    cutoffs = [last - pd.Timedelta(days=horizon + i * step) for i in range(count)]
+    return [c for c in cutoffs if c - first >= pd.Timedelta(days=BACKTEST_MIN_TRAIN)]
+
+
+def evaluate_cutoff(cutoff, horizon):
+    """
+    Pool task: forecast from the history up to `cutoff` and line it up with
+    the actuals. Returns (frame of cutoff/ds/h/y/yhat/bounds, fit seconds).
+    """
+    started = time.perf_counter()
+    train = _history[_history["ds"] <= cutoff]
+    forecast = rf.forecast_all({rf.TOTAL_KEY: train})[rf.TOTAL_KEY]
+    scored = forecast.merge(_history, on="ds")  # days with actual sales
+    scored["h"] = (scored["ds"] - cutoff).dt.days
+    scored["cutoff"] = cutoff
+    return scored[scored["h"] <= horizon], time.perf_counter() - started
+
+
+def stop_workers(pool, started):
+    """
+    Kill the process groups of the workers that reported on `started` (the
+    worker and its children) now; running fits can't be cancelled otherwise.
+    A worker that has not reported yet has not picked up a cutoff either.
+    """
+    groups = []
+    while not started.empty():
+        groups.append(started.get())
+    for pgid in groups:
+        try:
+            os.killpg(pgid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass  # already exited
+    # The pool sees its workers die, terminates the rest and joins them all
+    pool.shutdown(wait=True, cancel_futures=True)
+    return len(groups)
+
+
+def run_backtest(history, cutoffs, horizon=rf.FORECAST_HORIZON, workers=None, budget=None):
+    """Evaluate the cutoffs in parallel within `budget` seconds; returns the scored frames finished in time"""
+    workers = BACKTEST_WORKERS if workers is None else workers
+    budget = BACKTEST_BUDGET_SECONDS if budget is None else budget
+    if workers < 1:
+        raise ValueError(f"❌ BACKTEST_WORKERS must be >= 1, got {workers}")
+    scored = []
+    started = multiprocessing.SimpleQueue()
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(cutoffs)), initializer=_init_worker, initargs=(history, started)
+    )
+    futures = {pool.submit(evaluate_cutoff, cutoff, horizon): cutoff for cutoff in cutoffs}
+    try:
+        for future in as_completed(futures, timeout=budget):
+            frame, seconds = future.result()
+            scored.append(frame)
+            log.info(f"⏱️ Cutoff {futures[future]:%Y-%m-%d}: {len(frame)} days scored, forecast in {seconds:.2f}s")
+    except concurrent.futures.TimeoutError:
+        log.warning(
+            f"⚠️ Backtest budget of {budget:.0f}s used up: {len(scored)} of {len(cutoffs)} cutoffs "
+            f"evaluated, the rest dropped"
+        )
+    finally:
+        if all(future.done() for future in futures):
+            pool.shutdown()
+        else:
+            log.info(f"🛑 Stopped {stop_workers(pool, started)} backtest worker(s) with cutoffs still running")
+        started.close()
+    return scored
+
+
+def accuracy_by_bucket(scored):
+    """MAPE (days with sales), RMSE and interval coverage per horizon bucket, pooled over cutoffs"""
+    df = pd.concat(scored, ignore_index=True)
+    rows = []
+    for start, end in HORIZON_BUCKETS:
+        bucket = df[(df["h"] >= start) & (df["h"] <= end)]
+        if bucket.empty:
+            continue
+        error = bucket["yhat"] - bucket["y"]
+        sold = bucket["y"] > 0
+        rows.append({
+            "horizon_bucket": f"{start}-{end}",
+            "horizon_start": start,
+            "horizon_end": end,
+            "cutoffs": int(bucket["cutoff"].nunique()),
+            "points": len(bucket),
+            "mape": float((error[sold].abs() / bucket.loc[sold, "y"]).mean() * 100),
+            "rmse": float(np.sqrt((error ** 2).mean())),
+            "coverage": float(((bucket["y"] >= bucket["yhat_lower"]) & (bucket["y"] <= bucket["yhat_upper"])).mean()),
+        })
+    return pd.DataFrame(rows)
+
+
+def write_accuracy(engine, metrics, backend):
+    """Append this run's metrics to forecast_accuracy"""
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {ACCURACY_TABLE} (
+                run_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                backend TEXT NOT NULL,
+                horizon_bucket TEXT NOT NULL,
+                horizon_start INT NOT NULL,
+                horizon_end INT NOT NULL,
+                cutoffs INT NOT NULL,
+                points INT NOT NULL,
+                mape DOUBLE PRECISION,
+                rmse DOUBLE PRECISION,
+                coverage DOUBLE PRECISION,
+                PRIMARY KEY (run_at, backend, horizon_bucket)
+            );
+        """))
+        # now() is the transaction start: one run_at for the whole run
+        conn.execute(text(f"""
+            INSERT INTO {ACCURACY_TABLE}
+                (backend, horizon_bucket, horizon_start, horizon_end, cutoffs, points, mape, rmse, coverage)
+            VALUES
+                (:backend, :horizon_bucket, :horizon_start, :horizon_end, :cutoffs, :points, :mape, :rmse, :coverage)
+        """), [{"backend": backend, **row} for row in metrics.to_dict(orient="records")])
+
+
+def main():
+    configure_logging()
+    configure()
+    engine = get_engine()
+    history = rf.load_history(engine)
+    if history is None:
+        return
+
+    cutoffs = plan_cutoffs(history)
+    if not cutoffs:
+        log.error(f"❌ Not enough history for a {rf.FORECAST_HORIZON}-day backtest; skipping")
+        return
+    log.info(
+        f"🧪 Backtesting '{rf.FORECAST_BACKEND}' over {len(cutoffs)} cutoffs "
+        f"({cutoffs[-1]:%Y-%m-%d} → {cutoffs[0]:%Y-%m-%d}), budget {BACKTEST_BUDGET_SECONDS:.0f}s"
+    )
+
+    started = time.perf_counter()
+    with stage("forecast.backtest", rows_in=len(history)) as stats:
+        scored = run_backtest(history, cutoffs)
+        stats.rows_out = sum(len(frame) for frame in scored)
+    if not scored:
+        log.error("❌ No cutoff finished within the budget; forecast_accuracy not updated")
+        return
+
+    metrics = accuracy_by_bucket(scored)
+    write_accuracy(engine, metrics, rf.FORECAST_BACKEND)
+    for row in metrics.itertuples():
+        log.info(
+            f"📏 h={row.horizon_bucket:>5}: MAPE {row.mape:7.1f}% | RMSE {row.rmse:9.1f} | "
+            f"coverage {row.coverage:.0%} ({row.points} points, {row.cutoffs} cutoffs)"
+        )
+    log.info(f"✅ {ACCURACY_TABLE} updated from {len(scored)} cutoffs in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Fitted-model cache for the revenue forecasts
+- One directory per series (FORECAST_CACHE_DIR/<series_key>/), one JSON entry
+  per training frame: <rows>-<fingerprint>.json holding the serialized
+  Prophet model and the forecast it produced
+- fingerprint() hashes the training frame (ds, y) plus the horizon, so an
+  unchanged kpi_daily reuses the stored forecast without fitting
+- When the frame only gained rows at the end, the newest entry whose
+  fingerprint matches a prefix of it supplies warm-start parameters
+  (k, m, delta, beta, sigma_obs) for the Stan optimizer
+- Entries are written to a temp file and renamed into place; each series
+  keeps its FORECAST_CACHE_RETENTION most recently used entries
+- Settings (FORECAST_CACHE, FORECAST_CACHE_DIR, FORECAST_CACHE_RETENTION;
+  .env included) are read by settings() when the cache is used, never at
+  import; the MODEL_CACHE_* globals override them when set
+"""
+import os
+import json
+import hashlib
+import logging
+import pandas as pd
+
+from pipeline.runtime import load_env
+
+log = logging.getLogger("forecast.model_cache")
+
+# None: read from the environment by settings(); set to override it
+MODEL_CACHE_ENABLED = None  # FORECAST_CACHE (default on)
+MODEL_CACHE_DIR = None  # FORECAST_CACHE_DIR (default data/models)
+MODEL_CACHE_RETENTION = None  # FORECAST_CACHE_RETENTION: entries kept per series (default 3)
+DEFAULT_MODEL_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "models")
+
+
+def settings():
+    """FORECAST_CACHE* settings: the MODEL_CACHE_* globals where set, else the environment (and .env), read now"""
+    load_env()
+    return {
+        "enabled": (
+            MODEL_CACHE_ENABLED if MODEL_CACHE_ENABLED is not None
+            else os.getenv("FORECAST_CACHE", "1").lower() in ("1", "true", "yes")
+        ),
+        "dir": MODEL_CACHE_DIR or os.getenv("FORECAST_CACHE_DIR", DEFAULT_MODEL_CACHE_DIR),
+        "retention": (
+            MODEL_CACHE_RETENTION if MODEL_CACHE_RETENTION is not None
+            else int(os.getenv("FORECAST_CACHE_RETENTION", "3"))
+        ),
+    }
+
+
+def enabled():
+    return settings()["enabled"]
+
+
+def fingerprint(history, horizon):
+    """SHA-256 of the (ds, y) training frame and the forecast horizon"""
+    digest = hashlib.sha256(f"horizon={horizon};".encode())
+    digest.update(pd.to_datetime(history["ds"]).to_numpy("datetime64[ns]").tobytes())
+    digest.update(history["y"].to_numpy(dtype="float64").tobytes())
+    return digest.hexdigest()
+
+
+def series_dir(key):
+    # series keys look like "region=West"; keep them readable but path-safe
+    safe = "".join(c if c.isalnum() or c in "=-_." else "_" for c in key)
+    return os.path.join(settings()["dir"], safe)
+
+
+def entry_path(key, rows, fp):
+    return os.path.join(series_dir(key), f"{rows:08d}-{fp}.json")
+
+
+def list_entries(key):
+    """(rows, fingerprint) of a series' entries, most recently used first"""
+    folder = series_dir(key)
+    if not os.path.isdir(folder):
+        return []
+    names = [n for n in os.listdir(folder) if n.endswith(".json") and not n.startswith(".")]
+    names.sort(key=lambda n: os.path.getmtime(os.path.join(folder, n)), reverse=True)
+    entries = []
+    for name in names:
+        rows, _, fp = name[:-len(".json")].partition("-")
+        entries.append((int(rows), fp))
+    return entries
+
+
+def _read(key, rows, fp):
+    path = entry_path(key, rows, fp)
+    with open(path) as fh:
+        entry = json.load(fh)
+    os.utime(path)  # mark as recently used for retention
+    return entry
+
+
+def load_forecast(key, history, horizon):
+    """Stored forecast for exactly this training frame, or None"""
+    fp = fingerprint(history, horizon)
+    if not os.path.exists(entry_path(key, len(history), fp)):
+        return None
+    entry = _read(key, len(history), fp)
+    forecast = pd.DataFrame(entry["forecast"])
+    forecast["ds"] = pd.to_datetime(forecast["ds"])
+    return forecast
+
+
+def warm_start_params(key, history, horizon):
+    """
+    Prophet init parameters from the newest model trained on a prefix of
+    `history` (data appended since), or None. Returns (params, rows).
+    """
+    for rows, fp in sorted(list_entries(key), reverse=True):
+        if rows >= len(history) or fingerprint(history.iloc[:rows], horizon) != fp:
+            continue
+        from prophet.serialize import model_from_json
+
+        model = model_from_json(_read(key, rows, fp)["model"])
+        params = {name: float(model.params[name][0][0]) for name in ["k", "m", "sigma_obs"]}
+        params.update({name: model.params[name][0] for name in ["delta", "beta"]})
+        return params, rows
+    return None
+
+
+def save(key, history, horizon, model, forecast):
+    """Store a fitted model and its forecast for this training frame"""
+    from prophet.serialize import model_to_json
+
+    fp = fingerprint(history, horizon)
+    path = entry_path(key, len(history), fp)
+    os.makedirs(series_dir(key), exist_ok=True)
+    entry = {
+        "series_key": key,
+        "rows": len(history),
+        "horizon": horizon,
+        "model": model_to_json(model),
+        "forecast": forecast.assign(ds=forecast["ds"].dt.strftime("%Y-%m-%d")).to_dict(orient="list"),
+    }
+    tmp = os.path.join(series_dir(key), f".tmp-{fp}-{os.getpid()}")
+    with open(tmp, "w") as fh:
+        json.dump(entry, fh)
+    os.replace(tmp, path)
+    prune(key)
+    return path
+
+
+def prune(key, keep=None):
+    """Delete all but the `keep` most recently used entries of a series"""
+    keep = settings()["retention"] if keep is None else keep
+    stale = list_entries(key)[max(keep, 0):]
+    for rows, fp in stale:
+        try:
+            os.remove(entry_path(key, rows, fp))
+        except FileNotFoundError:
+            pass
+    if stale:
+        log.info(f"🧹 Pruned {len(stale)} cached model(s) of {key} (keeping {keep})")
+    return stale
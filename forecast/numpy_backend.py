@@ -0,0 +1,65 @@
+"""
+Vectorized NumPy forecasting backend (FORECAST_BACKEND=numpy)
+- Model: linear trend + Fourier terms for weekly and yearly seasonality
+- All series sharing the same dates are fitted with ONE least-squares solve
+  (the design matrix is shared, each series is a column of the target)
+- Prediction intervals come from each series' residual quantiles, with the
+  same coverage as Prophet's default (80%)
+- Output frames match the Prophet path: ds, yhat, yhat_lower, yhat_upper
+"""
+import logging
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger("forecast.numpy_backend")
+
+WEEKLY_ORDER = 3
+YEARLY_ORDER = 10
+INTERVAL_WIDTH = 0.8
+
+
+def design_matrix(days, span):
+    """[1, trend, weekly sin/cos, yearly sin/cos] for day offsets from the first history day"""
+    columns = [np.ones_like(days), days / span]
+    for period, order in [(7.0, WEEKLY_ORDER), (365.25, YEARLY_ORDER)]:
+        for k in range(1, order + 1):
+            angle = 2 * np.pi * k * days / period
+            columns += [np.sin(angle), np.cos(angle)]
+    return np.column_stack(columns)
+
+
+def forecast_many(series, horizon):
+    """
+    Forecast every (ds, y) frame in `series` (dict key -> frame, all on the
+    same dates) `horizon` days past the last date. Returns dict key -> frame.
+    """
+    keys = list(series)
+    ds = pd.DatetimeIndex(series[keys[0]]["ds"])
+    for key in keys[1:]:
+        if not ds.equals(pd.DatetimeIndex(series[key]["ds"])):
+            raise ValueError(f"❌ numpy backend needs all series on the same dates; '{key}' differs from '{keys[0]}'")
+
+    origin = ds[0]
+    days = ((ds - origin) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+    span = max(days[-1], 1.0)
+    future = pd.date_range(ds[-1] + pd.Timedelta(days=1), periods=horizon, freq="D")
+    future_days = ((future - origin) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+
+    # (T, n_series): one column per series, solved together
+    y = np.column_stack([series[key]["y"].to_numpy(dtype=float) for key in keys])
+    x = design_matrix(days, span)
+    coef, *_ = np.linalg.lstsq(x, y, rcond=None)
+
+    residuals = y - x @ coef
+    low, high = np.quantile(residuals, [(1 - INTERVAL_WIDTH) / 2, (1 + INTERVAL_WIDTH) / 2], axis=0)
+    yhat = design_matrix(future_days, span) @ coef
+
+    return {
+        key: pd.DataFrame({
+            "ds": future,
+            "yhat": yhat[:, i],
+            "yhat_lower": yhat[:, i] + low[i],
+            "yhat_upper": yhat[:, i] + high[i],
+        })
+        for i, key in enumerate(keys)
+    }
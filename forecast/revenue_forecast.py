@@ -1,52 +1,94 @@
 """
 Revenue Forecasting Script
-- Uses Prophet to generate N-day revenue forecasts
-- Refreshes forecast_revenue table (TRUNCATE + reload, so views remain intact)
+- Generates N-day revenue forecasts with a pluggable FORECAST_BACKEND:
+  "prophet" (default) or "numpy" (forecast/numpy_backend.py: trend +
+  Fourier seasonality, every series in one least-squares solve); Prophet
+  is only imported when its backend runs
+- Publishes forecast_revenue atomically: COPY into a temp staging table,
+  then DELETE + INSERT in one transaction (the table is kept, so views
+  depending on it stay intact, and readers see the old or the new
+  forecast, never an empty or partial one)
+- Stamps forecast_revenue.version in pipeline_state so the
+  actual_vs_forecast refresh can tell the forecast changed
 - Forecast starts strictly after last actual order_date
+- FORECAST_MODE=series also forecasts daily revenue per Region and per
+  Category (from fact_sales + dimensions) into forecast_revenue_series,
+  fitting every series in a FORECAST_WORKERS process pool; with
+  FORECAST_RECONCILE=1 each level's series are scaled to sum to the total
+- Fitted models are cached per series (forecast/model_cache.py): an
+  unchanged training frame reuses its stored forecast, a frame that only
+  gained new days warm-starts Stan from the previous fit (FORECAST_CACHE=0
+  disables)
+- ANALYTICS_BACKEND=duckdb reads the history and series from the embedded
+  DuckDB build (db/duckdb_backend.py, as Arrow) instead of Postgres; the
+  forecast is still published to Postgres
+- Cheap to import: pandas, SQLAlchemy, the DuckDB backend and the
+  instrumentation are imported by the functions that use them, and the
+  FORECAST_* settings (.env included) are read by configure() from main()
+- Run as a module from the repo root: python -m forecast.revenue_forecast
 """
 import os
+import time
 import logging
-from xml.parsers.expat import model
-import pandas as pd
-from prophet import Prophet
-from sqlalchemy import create_engine, text
-from dotenv import load_dotenv
-
-# Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s"
-)
-log = logging.getLogger("forecast.revenue")
+from concurrent.futures import ProcessPoolExecutor
 
-# Env variables
-load_dotenv()
+from pipeline.runtime import configure_logging, load_env
 
-DB_USER = os.getenv("DB_USER", "salesuser")
-DB_PASS = os.getenv("DB_PASS", "salespass")
-DB_NAME = os.getenv("DB_NAME", "salesdb")
-DB_HOST = os.getenv("DB_HOST", "postgres_db")
-DB_PORT = os.getenv("DB_PORT", "5432")
+log = logging.getLogger("forecast.revenue")
 
+# Defaults; configure() overrides them from the environment when the forecast runs
 FORECAST_HORIZON = 90  # days
+FORECAST_MODE = "total"  # FORECAST_MODE: "total" | "series"
+FORECAST_BACKEND = "prophet"  # FORECAST_BACKEND: "prophet" | "numpy"
+FORECAST_WORKERS = os.cpu_count() or 1  # FORECAST_WORKERS
+RECONCILE = True  # FORECAST_RECONCILE
+SERIES_TABLE = "forecast_revenue_series"
+TOTAL_KEY = "total"
 
-def get_engine():
-    return create_engine(
-        f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    )
+# Daily revenue per series; series_key is "<level>=<member>"
+SERIES_SQL = """
+    SELECT 'region=' || c.region AS series_key, f.order_date AS ds, SUM(f.sales) AS y
+    FROM fact_sales f
+    JOIN dim_customer c ON c.customer_key = f.customer_key
+    GROUP BY 1, 2
+    UNION ALL
+    SELECT 'category=' || p.category, f.order_date, SUM(f.sales)
+    FROM fact_sales f
+    JOIN dim_product p ON p.product_key = f.product_key
+    GROUP BY 1, 2
+"""
 
-def main():
-    engine = get_engine()
+def configure():
+    """Read the FORECAST_* settings from the environment (and .env); main() calls it before running"""
+    global FORECAST_MODE, FORECAST_BACKEND, FORECAST_WORKERS, RECONCILE
+    load_env()
+    FORECAST_MODE = os.getenv("FORECAST_MODE", FORECAST_MODE)
+    FORECAST_BACKEND = os.getenv("FORECAST_BACKEND", FORECAST_BACKEND)
+    FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", FORECAST_WORKERS))
+    RECONCILE = os.getenv("FORECAST_RECONCILE", str(int(RECONCILE))).lower() in ("1", "true", "yes")
+
+def read_frame(sql, engine):
+    """Query result from Postgres, or from the DuckDB build with ANALYTICS_BACKEND=duckdb"""
+    import pandas as pd
+    from db import duckdb_backend
 
-    # 1. Load KPI data
-    df = pd.read_sql(
+    if duckdb_backend.enabled():
+        return duckdb_backend.fetch_df(sql)
+    # Per-day aggregates (a few thousand rows), read whole; row-level reads stream through db.engine.read_sql_chunks
+    return pd.read_sql(sql, engine)
+
+def load_history(engine):
+    """Daily total revenue from kpi_daily as a Prophet frame (ds, y); None if unusable"""
+    import pandas as pd
+
+    df = read_frame(
         "SELECT order_date, total_revenue FROM kpi_daily ORDER BY order_date",
         engine
     )
 
     if df.empty:
         log.error("❌ No data in kpi_daily; aborting forecast")
-        return
+        return None
 
     # Ensure datetime and clean nulls
     df["order_date"] = pd.to_datetime(df["order_date"], errors="coerce")
@@ -58,45 +100,286 @@ def main():
 
     if df.empty:
         log.error("❌ No valid data left for forecasting after cleaning")
-        return
+        return None
 
-    last_actual = df["order_date"].max()
-    log.info(f"Last actual order_date = {last_actual}")
+    df["total_revenue"] = df["total_revenue"].astype(float)
+    return df.rename(columns={"order_date": "ds", "total_revenue": "y"}).reset_index(drop=True)
 
-    prophet_df = df.rename(columns={"order_date": "ds", "total_revenue": "y"})
+def fit_prophet(history, horizon=FORECAST_HORIZON, init=None):
+    """Fit Prophet on (ds, y); returns (model, the `horizon` days after the last ds)"""
+    from prophet import Prophet  # heavy import, only paid by the Prophet backend
 
-    # 2. Fit Prophet
     model = Prophet(daily_seasonality=True, yearly_seasonality=True)
-    model.fit(prophet_df)
+    if init is None:
+        model.fit(history)
+    else:
+        model.fit(history, init=init)
 
-    # 3. Forecast future only
     future = model.make_future_dataframe(
-        periods=FORECAST_HORIZON,
+        periods=horizon,
         freq="D",
         include_history=True
     )
     forecast = model.predict(future)[["ds", "yhat", "yhat_lower", "yhat_upper"]]
 
-    forecast = forecast[forecast["ds"] > last_actual].reset_index(drop=True)
+    # Forecast future only
+    return model, forecast[forecast["ds"] > history["ds"].max()].reset_index(drop=True)
+
+def fit_forecast(history, horizon=FORECAST_HORIZON, key=TOTAL_KEY):
+    """Forecast of series `key` via the model cache: reuse, warm-start or fit from scratch"""
+    from forecast import model_cache
+
+    started = time.perf_counter()
+    if not model_cache.enabled():
+        _, forecast = fit_prophet(history, horizon)
+        log.info(f"⏱️ {key}: cache off, cold fit in {time.perf_counter() - started:.2f}s")
+        return forecast
+
+    forecast = model_cache.load_forecast(key, history, horizon)
+    if forecast is not None:
+        log.info(f"🗃️ {key}: model cache hit ({len(history):,} unchanged rows); fit skipped")
+        return forecast
 
+    warm = model_cache.warm_start_params(key, history, horizon)
+    model, forecast = fit_prophet(history, horizon, init=warm[0] if warm else None)
+    fit_seconds = time.perf_counter() - started
+    model_cache.save(key, history, horizon, model, forecast)
+    how = f"warm start from the {warm[1]:,}-row model" if warm else "cold fit"
+    log.info(f"🗃️ {key}: model cache miss, {how} in {fit_seconds:.2f}s")
+    return forecast
 
-    # 4. Ensure table exists & refresh it
-    with engine.begin() as conn:
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS forecast_revenue (
-                ds DATE,
-                yhat NUMERIC,
-                yhat_lower NUMERIC,
-                yhat_upper NUMERIC
-            );
-        """))
-        conn.execute(text("TRUNCATE TABLE forecast_revenue;"))
+def fit_series(key, history):
+    """Pool task: forecast one series, returns (key, forecast, fit seconds)"""
+    started = time.perf_counter()
+    forecast = fit_forecast(history, key=key)
+    return key, forecast, time.perf_counter() - started
 
-    forecast.to_sql("forecast_revenue", engine, if_exists="append", index=False)
+def load_series(engine, days):
+    """
+    Per-Region and per-Category daily revenue, one (ds, y) frame per
+    series_key. Every series covers the same `days` (the total's), with 0
+    on days it had no sales, so each level sums to the total.
+    """
+    import pandas as pd
+
+    df = read_frame(SERIES_SQL, engine)
+    df["ds"] = pd.to_datetime(df["ds"])
+    df["y"] = df["y"].astype(float)
+    wide = df.pivot(index="ds", columns="series_key", values="y").reindex(days, fill_value=0).fillna(0)
+    return {
+        key: pd.DataFrame({"ds": wide.index, "y": wide[key].to_numpy()})
+        for key in sorted(wide.columns)
+    }
+
+def reconcile(forecasts):
+    """
+    Scale each level's series (region=..., category=...) per day so their
+    yhat sums to the total's yhat; intervals are scaled by the same factor.
+    """
+    total = forecasts[TOTAL_KEY].set_index("ds")["yhat"]
+    levels = {}
+    for key in forecasts:
+        if key != TOTAL_KEY:
+            levels.setdefault(key.split("=", 1)[0], []).append(key)
+
+    out = {TOTAL_KEY: forecasts[TOTAL_KEY]}
+    for level, keys in levels.items():
+        level_sum = sum(forecasts[k].set_index("ds")["yhat"] for k in keys)
+        # Days where the level sums to ~0 have no meaningful split; leave them as fitted
+        factor = (total / level_sum).where(level_sum.abs() > 1e-9, 1.0)
+        for key in keys:
+            fc = forecasts[key].copy()
+            scale = fc["ds"].map(factor).to_numpy()
+            for col in ["yhat", "yhat_lower", "yhat_upper"]:
+                fc[col] = fc[col] * scale
+            out[key] = fc
+        log.info(f"🔗 Reconciled {len(keys)} {level} series to the total (mean factor {factor.mean():.3f})")
+    return out
+
+FORECAST_DDL = """
+    CREATE TABLE IF NOT EXISTS forecast_revenue (
+        ds DATE,
+        yhat NUMERIC,
+        yhat_lower NUMERIC,
+        yhat_upper NUMERIC
+    );
+"""
+
+SERIES_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {SERIES_TABLE} (
+        series_key TEXT NOT NULL,
+        ds DATE NOT NULL,
+        yhat NUMERIC,
+        yhat_lower NUMERIC,
+        yhat_upper NUMERIC,
+        PRIMARY KEY (series_key, ds)
+    );
+"""
+
+def publish(conn, table, frame):
+    """
+    Replace the rows of `table` with `frame` inside the caller's
+    transaction: COPY into a temp staging table, then DELETE + INSERT.
+    DELETE (unlike TRUNCATE) doesn't lock out readers, who keep seeing
+    the previous rows until commit.
+    """
+    from sqlalchemy import text
+    from db.engine import copy_dataframe
+
+    started = time.perf_counter()
+    staging_table = f"{table}__stage"
+    columns = ", ".join(f'"{c}"' for c in frame.columns)
+    conn.execute(text(f'CREATE TEMP TABLE "{staging_table}" (LIKE "{table}")'))
+    copy_dataframe(conn, frame, staging_table, date_format="%Y-%m-%d")
+    conn.execute(text(f'DELETE FROM "{table}"'))
+    conn.execute(text(f'INSERT INTO "{table}" ({columns}) SELECT {columns} FROM "{staging_table}"'))
+    conn.execute(text(f'DROP TABLE "{staging_table}"'))
+    log.info(f"📤 Published {len(frame):,} rows to {table} in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+def write_forecast(conn, forecast):
+    """Publish forecast_revenue and stamp its version (caller owns the transaction)"""
+    from sqlalchemy import text
+
+    conn.execute(text(FORECAST_DDL))
+    publish(conn, "forecast_revenue", forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]])
+
+    # New version for db/join_actuals_forecast.sql's refresh check
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS pipeline_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """))
+    conn.execute(text("""
+        INSERT INTO pipeline_state (key, value) VALUES ('forecast_revenue.version', clock_timestamp()::TEXT)
+        ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = now();
+    """))
 
     log.info(f"✅ Forecast table refreshed with {len(forecast)} days")
     log.info(f"Range: {forecast['ds'].min()} → {forecast['ds'].max()}")
 
+def write_series(conn, forecasts):
+    """Publish forecast_revenue_series, keyed by (series_key, ds) (caller owns the transaction)"""
+    import pandas as pd
+    from sqlalchemy import text
+
+    rows = pd.concat(
+        [fc.assign(series_key=key) for key, fc in forecasts.items()], ignore_index=True
+    )[["series_key", "ds", "yhat", "yhat_lower", "yhat_upper"]]
+    conn.execute(text(SERIES_DDL))
+    publish(conn, SERIES_TABLE, rows)
+    log.info(f"✅ {SERIES_TABLE} refreshed: {len(forecasts)} series x {FORECAST_HORIZON} days")
+
+def forecast_prophet(series):
+    """
+    Prophet backend: one (cached) model per series. Several series are
+    fitted in a FORECAST_WORKERS process pool, a single one in-process.
+    """
+    if FORECAST_WORKERS < 1:
+        raise ValueError(f"❌ FORECAST_WORKERS must be >= 1, got {FORECAST_WORKERS}")
+    if len(series) == 1:
+        [(key, history)] = series.items()
+        return {key: fit_forecast(history, key=key)}
+
+    workers = min(FORECAST_WORKERS, len(series))
+    log.info(f"🧩 Forecasting {len(series)} series on {workers} workers")
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fit_series, key, frame) for key, frame in series.items()]
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - started
+
+    # Slowest first, so stragglers that hold up the pool are visible
+    for key, _, seconds in sorted(results, key=lambda r: r[2], reverse=True):
+        log.info(f"⏱️ {key}: forecast in {seconds:.2f}s")
+    fit_seconds = sum(r[2] for r in results)
+    log.info(
+        f"⏱️ {len(results)} series: {fit_seconds:.2f}s of forecasting in {elapsed:.2f}s wall "
+        f"(x{fit_seconds / max(elapsed, 1e-9):.2f} vs serial)"
+    )
+    return {key: forecast for key, forecast, _ in results}
+
+def forecast_numpy(series):
+    """NumPy backend: all series in one batched least-squares fit"""
+    from forecast import numpy_backend
+
+    started = time.perf_counter()
+    forecasts = numpy_backend.forecast_many(series, FORECAST_HORIZON)
+    log.info(f"⏱️ numpy backend: {len(series)} series fitted in {time.perf_counter() - started:.3f}s")
+    return forecasts
+
+BACKENDS = {"prophet": forecast_prophet, "numpy": forecast_numpy}
+
+def forecast_all(series):
+    """Forecast every (ds, y) frame in `series` with FORECAST_BACKEND"""
+    if FORECAST_BACKEND not in BACKENDS:
+        raise ValueError(f"❌ Unknown FORECAST_BACKEND '{FORECAST_BACKEND}' (expected one of {sorted(BACKENDS)})")
+    return BACKENDS[FORECAST_BACKEND](series)
+
+def run_total():
+    """Single model on total daily revenue -> forecast_revenue"""
+    from db.engine import get_engine
+    from pipeline.instrumentation import stage
+
+    engine = get_engine()
+    with stage("forecast.load_history") as stats:
+        history = load_history(engine)
+        stats.rows_out = 0 if history is None else len(history)
+    if history is None:
+        return
+    log.info(f"Last actual order_date = {history['ds'].max()}")
+
+    with stage(f"forecast.fit.{FORECAST_BACKEND}", rows_in=len(history)) as stats:
+        forecast = forecast_all({TOTAL_KEY: history})[TOTAL_KEY]
+        stats.rows_out = len(forecast)
+    with stage("forecast.publish", rows_in=len(forecast)), engine.begin() as conn:
+        write_forecast(conn, forecast)
+
+def run_series():
+    """
+    Total plus per-Region / per-Category forecasts (in parallel with the
+    Prophet backend, batched with numpy). The total still refreshes
+    forecast_revenue; every series (total included) goes to
+    forecast_revenue_series.
+    """
+    import pandas as pd
+    from db.engine import get_engine
+    from pipeline.instrumentation import stage
+
+    engine = get_engine()
+    with stage("forecast.load_history") as stats:
+        history = load_history(engine)
+        if history is not None:
+            series = {TOTAL_KEY: history, **load_series(engine, pd.DatetimeIndex(history["ds"]))}
+        stats.rows_out = 0 if history is None else sum(len(s) for s in series.values())
+    if history is None:
+        return
+    log.info(f"Last actual order_date = {history['ds'].max()}")
+
+    with stage(f"forecast.fit.{FORECAST_BACKEND}", rows_in=sum(len(s) for s in series.values())) as stats:
+        forecasts = forecast_all(series)
+        if RECONCILE:
+            forecasts = reconcile(forecasts)
+        stats.rows_out = sum(len(f) for f in forecasts.values())
+
+    # One transaction: the total and its series are always published together
+    with stage("forecast.publish", rows_in=sum(len(f) for f in forecasts.values())), engine.begin() as conn:
+        write_forecast(conn, forecasts[TOTAL_KEY])
+        write_series(conn, forecasts)
+
+MODES = {"total": run_total, "series": run_series}
+
+def main():
+    from pipeline.instrumentation import stage
+
+    configure_logging()
+    configure()
+    if FORECAST_MODE not in MODES:
+        raise ValueError(f"❌ Unknown FORECAST_MODE '{FORECAST_MODE}' (expected one of {sorted(MODES)})")
+    with stage(f"forecast.{FORECAST_MODE}"):
+        MODES[FORECAST_MODE]()
+
 if __name__ == "__main__":
     main()
-
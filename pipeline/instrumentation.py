@@ -0,0 +1,433 @@
+"""
+Pipeline Instrumentation
+- stage(name): context manager around one pipeline step; records wall
+  time, CPU time (this process plus reaped worker processes), rows in/out,
+  rows/sec, peak RSS during the stage and ok/failed status
+- Thread-safe: a stage opened while another thread has a stage open
+  (e.g. the nodes db/transform_graph.run_graph runs in its "transform"
+  stage) is concurrent. It records its own thread's CPU time and no peak
+  RSS, because the high-water mark is process-wide and resetting it would
+  clobber its siblings' peaks; the enclosing stage keeps the process-wide
+  figures that cover all of them
+- run_sql_files(): runs SQL files statement by statement in one
+  transaction (what the PostgresOperator did) and records each
+  statement's wall time and row count as a step of its stage
+- Every record goes to pipeline_run_stats and to a JSON Lines artifact
+  PIPELINE_STATS_DIR/<run_id>.jsonl (PIPELINE_STATS=0 disables both;
+  a failed write is logged, never raised)
+- Records are grouped by run: PIPELINE_RUN_ID, else the Airflow DAG run
+  id of the task, else one id per process
+- Opt-in profiling: PIPELINE_PROFILE=<stage name or fnmatch pattern>
+  captures that stage with cProfile (PIPELINE_PROFILE_MODE=cprofile,
+  writes <run_id>.<stage>.prof) or a stack sampler
+  (PIPELINE_PROFILE_MODE=sample, writes <run_id>.<stage>.folded for
+  flame graphs) next to the JSON artifact
+- Settings (PIPELINE_STATS*, PIPELINE_PROFILE*; .env included) are read by
+  settings() when a stage runs, never at import; the module globals
+  override them when set (tests, benchmarks)
+"""
+import os
+import io
+import re
+import sys
+import json
+import time
+import socket
+import fnmatch
+import logging
+import resource
+import threading
+import collections
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from sqlalchemy import text
+
+from db.engine import get_engine
+from pipeline.runtime import load_env
+
+log = logging.getLogger("pipeline.instrumentation")
+
+# None: read from the environment by settings(); set to override it
+STATS_ENABLED = None  # PIPELINE_STATS (default on)
+STATS_DIR = None  # PIPELINE_STATS_DIR (default data/run_stats)
+STATS_TABLE = "pipeline_run_stats"
+PROFILE_STAGE = None  # PIPELINE_PROFILE: stage name or fnmatch pattern, "" = off (default)
+PROFILE_MODE = None  # PIPELINE_PROFILE_MODE: "cprofile" (default) | "sample"
+SAMPLE_INTERVAL = None  # PIPELINE_PROFILE_INTERVAL: seconds between samples (default 0.005)
+
+_LOCAL_RUN_ID = f"local__{datetime.now(timezone.utc):%Y%m%dT%H%M%S}_{os.getpid()}"
+_local = threading.local()  # .stages: this thread's open stages, innermost last
+_lock = threading.Lock()  # guards _open_threads and the artifact file
+_table_lock = threading.Lock()
+_open_threads = collections.Counter()  # thread ident -> number of stages it has open
+_table_ready = False
+
+
+def settings():
+    """PIPELINE_STATS* / PIPELINE_PROFILE* settings: the module globals where set, else the environment (and .env), read now"""
+    load_env()
+    return {
+        "stats_enabled": (
+            STATS_ENABLED if STATS_ENABLED is not None
+            else os.getenv("PIPELINE_STATS", "1").lower() in ("1", "true", "yes")
+        ),
+        "stats_dir": STATS_DIR or os.getenv("PIPELINE_STATS_DIR", "data/run_stats"),
+        "profile_stage": PROFILE_STAGE if PROFILE_STAGE is not None else os.getenv("PIPELINE_PROFILE", ""),
+        "profile_mode": PROFILE_MODE or os.getenv("PIPELINE_PROFILE_MODE", "cprofile"),
+        "sample_interval": (
+            SAMPLE_INTERVAL if SAMPLE_INTERVAL is not None
+            else float(os.getenv("PIPELINE_PROFILE_INTERVAL", "0.005"))
+        ),
+    }
+
+
+def run_id():
+    """Run the records belong to: explicit, the Airflow DAG run, or this process"""
+    return os.getenv("PIPELINE_RUN_ID") or os.getenv("AIRFLOW_CTX_DAG_RUN_ID") or _LOCAL_RUN_ID
+
+
+def _artifact_base(stage_name=None):
+    base = re.sub(r"[^A-Za-z0-9_.-]+", "_", run_id())
+    if stage_name:
+        base += "." + re.sub(r"[^A-Za-z0-9_.-]+", "_", stage_name)
+    return os.path.join(settings()["stats_dir"], base)
+
+
+def _peak_rss_mb():
+    """Resident-set high-water mark of this process (VmHWM; ru_maxrss where /proc is missing)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _reset_peak_rss():
+    """Restart the high-water mark at the current RSS (Linux); returns False where unsupported"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _cpu_seconds(concurrent=False):
+    """Process plus reaped children; only the calling thread's CPU for a concurrent stage"""
+    if concurrent:
+        return time.thread_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _open_stages():
+    """The calling thread's open stages, innermost last"""
+    if not hasattr(_local, "stages"):
+        _local.stages = []
+    return _local.stages
+
+
+class StageStats:
+    """Measurements of one stage (or SQL statement step); set rows_in/rows_out inside the block"""
+
+    def __init__(self, name, step="", rows_in=None):
+        self.name = name
+        self.step = step
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.started_at = datetime.now(timezone.utc)
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_rss_mb = None
+        self.concurrent = False
+        self.status = "ok"
+
+    def as_record(self):
+        rows = self.rows_out if self.rows_out is not None else self.rows_in
+        return {
+            "run_id": run_id(),
+            "task": os.getenv("AIRFLOW_CTX_TASK_ID", ""),
+            "stage": self.name,
+            "step": self.step,
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "rows_per_sec": rows / self.wall_seconds if rows is not None and self.wall_seconds else None,
+            "peak_rss_mb": self.peak_rss_mb,
+            "status": self.status,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+        }
+
+
+class _StackSampler:
+    """Samples the calling thread's stack every `interval` seconds into folded-stack counts"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.counts = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.counts[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _start_profile(name):
+    config = settings()
+    pattern, mode = config["profile_stage"], config["profile_mode"]
+    if not pattern or not fnmatch.fnmatchcase(name, pattern):
+        return None
+    if mode not in ("cprofile", "sample"):
+        raise ValueError(f"❌ Unknown PIPELINE_PROFILE_MODE '{mode}' (expected 'cprofile' or 'sample')")
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        profiler = _StackSampler(config["sample_interval"])
+        profiler.start()
+    log.info(f"🔬 Profiling stage '{name}' ({mode})")
+    return profiler
+
+
+def _finish_profile(name, profiler):
+    os.makedirs(settings()["stats_dir"], exist_ok=True)
+    if not isinstance(profiler, _StackSampler):
+        import pstats
+        profiler.disable()
+        path = _artifact_base(name) + ".prof"
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(15)
+        log.info(f"🔬 cProfile of '{name}' -> {path}\n{summary.getvalue()}")
+    else:
+        profiler.stop()
+        path = _artifact_base(name) + ".folded"
+        with open(path, "w") as f:
+            for stack, count in profiler.counts.most_common():
+                f.write(f"{stack} {count}\n")
+        leaves = collections.Counter()
+        for stack, count in profiler.counts.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        top = "\n".join(f"{count / total:6.1%}  {leaf}" for leaf, count in leaves.most_common(10))
+        log.info(f"🔬 {total} samples of '{name}' -> {path}\n{top}")
+    return path
+
+
+def _write_table(records):
+    global _table_ready
+    if not _table_ready:
+        # Two threads' CREATE ... IF NOT EXISTS can still collide in the catalog
+        with _table_lock:
+            if not _table_ready:
+                with get_engine().begin() as conn:
+                    conn.execute(text(f"""
+                        CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+                            run_id TEXT NOT NULL,
+                            task TEXT NOT NULL,
+                            stage TEXT NOT NULL,
+                            step TEXT NOT NULL,
+                            started_at TIMESTAMPTZ NOT NULL,
+                            wall_seconds DOUBLE PRECISION,
+                            cpu_seconds DOUBLE PRECISION,
+                            rows_in BIGINT,
+                            rows_out BIGINT,
+                            rows_per_sec DOUBLE PRECISION,
+                            peak_rss_mb DOUBLE PRECISION,
+                            status TEXT NOT NULL,
+                            host TEXT,
+                            pid INT
+                        );
+                        CREATE INDEX IF NOT EXISTS {STATS_TABLE}_stage_idx ON {STATS_TABLE} (stage, started_at);
+                        CREATE INDEX IF NOT EXISTS {STATS_TABLE}_run_idx ON {STATS_TABLE} (run_id);
+                    """))
+                _table_ready = True
+    with get_engine().begin() as conn:
+        conn.execute(text(f"""
+            INSERT INTO {STATS_TABLE}
+                (run_id, task, stage, step, started_at, wall_seconds, cpu_seconds,
+                 rows_in, rows_out, rows_per_sec, peak_rss_mb, status, host, pid)
+            VALUES
+                (:run_id, :task, :stage, :step, :started_at, :wall_seconds, :cpu_seconds,
+                 :rows_in, :rows_out, :rows_per_sec, :peak_rss_mb, :status, :host, :pid)
+        """), records)
+
+
+def record(stats):
+    """Persist stage/step measurements to the JSON artifact and pipeline_run_stats; never raises"""
+    config = settings()
+    if not config["stats_enabled"] or not stats:
+        return
+    records = [s.as_record() for s in stats]
+    try:
+        os.makedirs(config["stats_dir"], exist_ok=True)
+        with _lock, open(_artifact_base() + ".jsonl", "a") as f:
+            f.writelines(json.dumps(r) + "\n" for r in records)
+    except OSError as e:
+        log.warning(f"⚠️ Could not write run stats artifact: {e}")
+    try:
+        _write_table(records)
+    except Exception as e:
+        log.warning(f"⚠️ Could not write {STATS_TABLE}: {e}")
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Measure the enclosed block as pipeline stage `name`; yields its StageStats"""
+    stats = StageStats(name, rows_in=rows_in)
+    me = threading.get_ident()
+    with _lock:
+        stats.concurrent = any(n for thread, n in _open_threads.items() if thread != me)
+        _open_threads[me] += 1
+    own = _open_stages()
+    reset = False
+    if not stats.concurrent:
+        peak = _peak_rss_mb()
+        for outer in own:
+            outer.peak_rss_mb = max(outer.peak_rss_mb or 0, peak)
+        reset = _reset_peak_rss()
+    own.append(stats)
+    profiler = _start_profile(name)
+    cpu = _cpu_seconds(stats.concurrent)
+    started = time.perf_counter()
+    try:
+        yield stats
+    except BaseException:
+        stats.status = "failed"
+        raise
+    finally:
+        stats.wall_seconds = time.perf_counter() - started
+        stats.cpu_seconds = _cpu_seconds(stats.concurrent) - cpu
+        own.remove(stats)
+        with _lock:
+            _open_threads[me] -= 1
+            if not _open_threads[me]:
+                del _open_threads[me]
+        if stats.concurrent:
+            stats.peak_rss_mb = None  # shared with the other threads' stages; see the module docstring
+        else:
+            # Without a reset, the process-lifetime high-water mark is the best available bound
+            stats.peak_rss_mb = max(stats.peak_rss_mb or 0, _peak_rss_mb()) if reset else _peak_rss_mb()
+        if profiler is not None:
+            _finish_profile(name, profiler)
+        rows = stats.rows_out if stats.rows_out is not None else stats.rows_in
+        throughput = f", {rows / max(stats.wall_seconds, 1e-9):,.0f} rows/sec" if rows is not None else ""
+        peak = f"peak RSS {stats.peak_rss_mb:,.0f} MB" if stats.peak_rss_mb is not None else "thread CPU, no peak RSS"
+        log.info(
+            f"📊 {name}: {stats.wall_seconds:.2f}s wall, {stats.cpu_seconds:.2f}s CPU{throughput}, "
+            f"{peak} [{stats.status}]"
+        )
+        record([stats])
+
+
+def split_sql(sql):
+    """
+    Split a SQL script into statements on top-level semicolons, skipping
+    those inside quotes, dollar-quoted bodies and comments. Comment-only
+    fragments are dropped.
+    """
+    statements = []
+    start = i = 0
+    has_code = False
+    n = len(sql)
+    while i < n:
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        if sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            continue
+        c = sql[i]
+        if c in ("'", '"'):
+            i += 1
+            while i < n:
+                if sql[i] == c:
+                    if i + 1 < n and sql[i + 1] == c:  # doubled quote
+                        i += 2
+                        continue
+                    break
+                i += 1
+            i += 1
+            has_code = True
+            continue
+        if c == "$":
+            tag = re.match(r"\$[A-Za-z_]*\$", sql[i:])
+            if tag:
+                end = sql.find(tag.group(), i + len(tag.group()))
+                i = n if end < 0 else end + len(tag.group())
+                has_code = True
+                continue
+        if c == ";":
+            if has_code:
+                statements.append(sql[start:i].strip())
+            start, has_code = i + 1, False
+        elif not c.isspace():
+            has_code = True
+        i += 1
+    if has_code:
+        statements.append(sql[start:].strip())
+    return statements
+
+
+def _label(path, number, statement):
+    """<file>:<n> plus the statement's first code line, e.g. 'transform.sql:12 CREATE TABLE fact_sales ...'"""
+    lines = [line.strip() for line in statement.splitlines() if line.strip() and not line.strip().startswith("--")]
+    first = lines[0] if lines else ""
+    return f"{os.path.basename(path)}:{number} {first[:60]}"
+
+
+def run_sql_files(name, paths):
+    """
+    Execute SQL files in order, in ONE transaction, as stage `name`; each
+    statement is recorded as a step with its wall time and row count.
+    """
+    steps = []
+    with stage(name) as stats:
+        try:
+            with get_engine().begin() as conn:
+                for path in paths:
+                    with open(path) as f:
+                        statements = split_sql(f.read())
+                    for number, statement in enumerate(statements, start=1):
+                        step = StageStats(name, step=_label(path, number, statement))
+                        steps.append(step)
+                        started = time.perf_counter()
+                        try:
+                            result = conn.exec_driver_sql(statement)
+                        except BaseException:
+                            step.status = "failed"
+                            raise
+                        finally:
+                            step.wall_seconds = time.perf_counter() - started
+                        step.rows_out = result.rowcount if result.rowcount >= 0 else None
+        finally:
+            record(steps)
+        counted = [s.rows_out for s in steps if s.rows_out is not None]
+        stats.rows_out = sum(counted) if counted else None
+        slowest = sorted(steps, key=lambda s: s.wall_seconds, reverse=True)[:5]
+        log.info(f"🐢 Slowest statements in {name}: " + "; ".join(f"{s.step} {s.wall_seconds:.3f}s" for s in slowest))
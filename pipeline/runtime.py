@@ -0,0 +1,32 @@
+"""
+Process Setup for the Command-Line Entry Points
+- load_env(): loads the project's .env into the environment, once per
+  process (variables already set win). Called by the settings getters
+  (db.engine.get_engine, etl.load_data.csv_path) and by each entry
+  point's configure() before it reads its settings, never at import
+- configure_logging(): the root logging setup shared by the entry points
+  and the benchmarks, so none of them imports another stage just for it
+- Stdlib-only at module level, like the DAG file that imports the task
+  modules lazily
+"""
+import logging
+
+_env_loaded = False
+
+
+def load_env():
+    """Load .env (python-dotenv) into os.environ the first time it's called"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def configure_logging(stream=None):
+    """Root logging for command-line runs (stderr unless `stream` is given); called from main(), never at import"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+        stream=stream,
+    )
@@ -1,8 +1,10 @@
 import logging
 import pytest
-from sqlalchemy import create_engine
 import os
-from dotenv import load_dotenv
+import sys
+
+# Make etl/, forecast/, db/ importable (same layout locally and in /opt/airflow/dags)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Logging setup (applies to all tests)
 logging.basicConfig(
@@ -10,18 +12,61 @@ logging.basicConfig(
     format="%(asctime)s | %(levelname)s | %(message)s"
 )
 
-# Database fixture
-load_dotenv()
+# Test runs don't append to pipeline_run_stats / data/run_stats (tests/test_instrumentation.py opts back in)
+os.environ.setdefault("PIPELINE_STATS", "0")
+
+from sqlalchemy import create_engine, text
+
+from db import duckdb_backend, quality
+from db import engine as db_engine
+from db.engine import dispose, get_engine, read_sql_chunks
 
-DB_USER = os.getenv("DB_USER", "salesuser")
-DB_PASS = os.getenv("DB_PASS", "salespass")
-DB_NAME = os.getenv("DB_NAME", "salesdb")
-DB_HOST = os.getenv("DB_HOST", "postgres_db")
-DB_PORT = os.getenv("DB_PORT", "5432")
+ETL_SCHEMA = "etl_scratch"
 
+
+# Database fixture
 @pytest.fixture(scope="session")
 def engine():
-    """Provide a reusable SQLAlchemy engine for all tests"""
-    conn_str = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    return create_engine(conn_str)
+    """The shared pooled engine (db/engine.py) for all tests; pool closed at session end"""
+    yield get_engine()
+    dispose()
+
 
+@pytest.fixture
+def etl_schema(engine, monkeypatch):
+    """
+    Every get_engine() connection (the ETL, the transform graph's nodes,
+    the instrumentation; forked workers included, re-pooled as usual)
+    confined to an empty scratch schema whose search_path has nothing else.
+    Dropped afterwards: the shared tables and their load state are never
+    touched. The `engine` fixture still reaches public.
+    """
+    scratch = create_engine(engine.url, connect_args={"options": f"-c search_path={ETL_SCHEMA}"})
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {ETL_SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {ETL_SCHEMA}"))
+    monkeypatch.setattr(db_engine, "_engine", scratch)
+    monkeypatch.setattr(db_engine, "_engine_pid", os.getpid())
+    try:
+        yield ETL_SCHEMA
+    finally:
+        scratch.dispose()
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {ETL_SCHEMA} CASCADE"))
+
+
+@pytest.fixture(scope="session")
+def profile(engine):
+    """One data-quality profile (db/quality.py: one scan per table) shared by the quality tests"""
+    with engine.connect() as conn:
+        return quality.profile_tables(conn)
+
+
+@pytest.fixture(scope="session")
+def duck(engine):
+    """Embedded DuckDB build (db/duckdb_backend.py) over the same rows as raw_sales in Postgres"""
+    pytest.importorskip("duckdb")
+    # Streamed from a server-side cursor in several chunks, so the parity tests cover the appends too
+    con = duckdb_backend.connect(read_sql_chunks("SELECT * FROM raw_sales", chunksize=2_000, engine=engine))
+    yield con
+    con.close()
@@ -0,0 +1,77 @@
+"""
+Actual vs Forecast Tests:
+actual_vs_forecast is an indexed materialized view matching the live join,
+and db/join_actuals_forecast.sql only refreshes it when an input changed.
+Refresh checks run inside a transaction that is rolled back.
+"""
+
+import logging
+import os
+import pandas as pd
+
+log = logging.getLogger("tests.actual_vs_forecast")
+
+JOIN_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "db", "join_actuals_forecast.sql")
+
+LIVE_JOIN = """
+    SELECT COALESCE(k.order_date, f.ds) AS ds, k.total_revenue AS actual_revenue,
+           f.yhat AS forecast, f.yhat_lower, f.yhat_upper
+    FROM kpi_daily k
+    FULL OUTER JOIN forecast_revenue f ON k.order_date = f.ds
+"""
+
+
+def _refresh(conn, caplog):
+    """Run the join script, return the NOTICEs it raised"""
+    # SQLAlchemy's psycopg2 dialect moves server NOTICEs to this logger
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="sqlalchemy.dialects.postgresql"):
+        with open(JOIN_SQL) as fh:
+            conn.exec_driver_sql(fh.read())
+    return " ".join(r.getMessage() for r in caplog.records)
+
+
+def test_actual_vs_forecast_is_indexed_matview(engine):
+    """Materialized view, unique index on ds, same rows as the live join"""
+    kind = pd.read_sql(
+        "SELECT relkind FROM pg_class WHERE relname = 'actual_vs_forecast'", engine
+    )["relkind"].tolist()
+    assert kind == ["m"], f"❌ actual_vs_forecast should be a materialized view, got relkind {kind}"
+
+    indexes = pd.read_sql(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = 'actual_vs_forecast'", engine
+    )["indexdef"].tolist()
+    assert any("UNIQUE" in d and "(ds)" in d for d in indexes), f"❌ No unique index on ds: {indexes}"
+
+    diff = pd.read_sql(
+        f"(SELECT * FROM actual_vs_forecast EXCEPT {LIVE_JOIN}) UNION ALL ({LIVE_JOIN} EXCEPT SELECT * FROM actual_vs_forecast)",
+        engine,
+    )
+    assert diff.empty, f"❌ actual_vs_forecast differs from the live join:\n{diff.head()}"
+
+
+def test_refresh_skipped_until_an_input_changes(engine, caplog):
+    """Unchanged versions skip the refresh; a new forecast version refreshes it"""
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            _refresh(conn, caplog)  # record the current input versions
+            notices = _refresh(conn, caplog)
+            log.info(f"Second run: {notices.strip()}")
+            assert "refresh skipped" in notices, f"❌ Refresh not skipped with unchanged inputs: {notices}"
+
+            conn.exec_driver_sql("DELETE FROM forecast_revenue WHERE ds = (SELECT MAX(ds) FROM forecast_revenue)")
+            conn.exec_driver_sql(
+                "UPDATE pipeline_state SET value = value || '-test' WHERE key = 'forecast_revenue.version'"
+            )
+            notices = _refresh(conn, caplog)
+            log.info(f"After forecast change: {notices.strip()}")
+            assert "refreshed" in notices, f"❌ Refresh skipped although forecast_revenue changed: {notices}"
+
+            diff = conn.exec_driver_sql(
+                f"SELECT COUNT(*) FROM ((SELECT * FROM actual_vs_forecast EXCEPT {LIVE_JOIN}) "
+                f"UNION ALL ({LIVE_JOIN} EXCEPT SELECT * FROM actual_vs_forecast)) d"
+            ).scalar()
+            assert diff == 0, f"❌ {diff} rows differ from the live join after refresh"
+        finally:
+            trans.rollback()
@@ -2,43 +2,36 @@
 Business Quality Tests:
 Validate that transformed dimension, KPI, and forecast tables
 make business sense (not just data integrity).
+Assertions run over the shared one-scan profile (db/quality.py).
 """
 
 import logging
-import pandas as pd
 
 log = logging.getLogger("tests.business_quality")
 
 
 # Dimension Tests
 
-def test_segment_values(engine):
+def test_segment_values(profile):
     """Segments in dim_customer should only be expected categories"""
-    df = pd.read_sql("SELECT DISTINCT segment FROM dim_customer", engine)
-    allowed = {"Consumer", "Corporate", "Home Office"}
-    bad = set(df["segment"]) - allowed
-    log.info(f"Segments found = {set(df['segment'])}")
-    assert not bad, f"❌ Unexpected segment values found: {bad}"
+    bad = profile["dim_customer"]["checks"]["unexpected_segment"]
+    log.info(f"Customers with an unexpected segment = {bad}")
+    assert bad == 0, f"❌ {bad} customers have a segment outside the expected categories"
 
 
-def test_region_values(engine):
+def test_region_values(profile):
     """Regions in dim_customer should only be expected categories"""
-    df = pd.read_sql("SELECT DISTINCT region FROM dim_customer", engine)
-    allowed = {"West", "East", "Central", "South"}
-    bad = set(df["region"]) - allowed
-    log.info(f"Regions found = {set(df['region'])}")
-    assert not bad, f"❌ Unexpected region values found: {bad}"
+    bad = profile["dim_customer"]["checks"]["unexpected_region"]
+    log.info(f"Customers with an unexpected region = {bad}")
+    assert bad == 0, f"❌ {bad} customers have a region outside the expected categories"
 
 
 # KPI vs Raw Consistency
 
-def test_fact_vs_raw_revenue(engine):
+def test_fact_vs_raw_revenue(profile):
     """Fact/KPI revenue should exactly match raw sales totals"""
-    raw_df = pd.read_sql('SELECT SUM("Sales")::NUMERIC AS raw_sum FROM raw_sales', engine)
-    fact_df = pd.read_sql('SELECT SUM(total_revenue)::NUMERIC AS fact_sum FROM kpi_daily', engine)
-
-    raw_sum = raw_df["raw_sum"].iloc[0]
-    fact_sum = fact_df["fact_sum"].iloc[0]
+    raw_sum = profile["raw_sales"]["revenue"]
+    fact_sum = profile["kpi_daily"]["revenue"]
     diff = abs(raw_sum - fact_sum)
 
     log.info(f"Raw total={raw_sum}, Fact total={fact_sum}, Diff={diff}")
@@ -47,15 +40,10 @@ def test_fact_vs_raw_revenue(engine):
 
 # Forecast Tests
 
-def test_forecast_continuity(engine):
+def test_forecast_continuity(profile):
     """Forecast should start after the last actual KPI date"""
-    last_actual = pd.read_sql(
-        "SELECT MAX(order_date)::DATE AS last_actual FROM kpi_daily", engine
-    )["last_actual"].iloc[0]
-
-    first_forecast = pd.read_sql(
-        "SELECT MIN(ds)::DATE AS first_forecast FROM forecast_revenue", engine
-    )["first_forecast"].iloc[0]
+    last_actual = profile["kpi_daily"]["max_date"]
+    first_forecast = profile["forecast_revenue"]["min_date"]
 
     log.info(f"Last actual={last_actual}, First forecast={first_forecast}")
     assert first_forecast > last_actual, (
@@ -64,14 +52,10 @@ def test_forecast_continuity(engine):
     )
 
 
-def test_forecast_ranges(engine):
+def test_forecast_ranges(profile):
     """Forecast values must be non-negative and within prediction intervals"""
-    df = pd.read_sql("SELECT * FROM forecast_revenue", engine)
-
-    bad_bounds = df[(df["yhat"] < df["yhat_lower"]) | (df["yhat"] > df["yhat_upper"])]
-    negatives = df[df["yhat"] < 0]
-
-    log.info(f"Checked {len(df)} forecast rows")
-    assert bad_bounds.empty, "❌ Some forecasts fall outside prediction intervals"
-    assert negatives.empty, "❌ Some forecasts are negative"
+    forecast = profile["forecast_revenue"]
 
+    log.info(f"Checked {forecast['row_count']} forecast rows")
+    assert forecast["checks"]["outside_interval"] == 0, "❌ Some forecasts fall outside prediction intervals"
+    assert forecast["negative_count"] == 0, "❌ Some forecasts are negative"
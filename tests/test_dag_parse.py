@@ -0,0 +1,102 @@
+"""
+DAG Parse Tests:
+The scheduler re-imports the DAG file every few seconds, so it must stay
+cheap: no heavy top-level imports, task modules that don't configure
+logging, load .env or read their settings on import (settings set only in
+.env are still honored when used), and a parse time /
+peak memory regression threshold
+(DAG_PARSE_MAX_SECONDS, DAG_PARSE_MAX_MB; measured where Airflow is installed).
+"""
+
+import ast
+import json
+import logging
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks import bench_dag_parse
+
+log = logging.getLogger("tests.dag_parse")
+
+
+def _top_level_imports(path):
+    """Root package names imported at module level (not inside functions)"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.add(node.module.split(".")[0])
+    return names
+
+
+def test_dag_has_no_heavy_top_level_imports():
+    """Task callables import pandas/SQLAlchemy/etl/forecast when they run, not when the DAG is parsed"""
+    heavy = _top_level_imports(bench_dag_parse.DAG_FILE) & set(bench_dag_parse.HEAVY_MODULES)
+    assert not heavy, f"❌ DAG file imports {sorted(heavy)} at parse time"
+
+
+def test_task_modules_leave_logging_alone_on_import():
+    """Importing etl/forecast must not install root log handlers; main() does that"""
+    code = (
+        "import logging, etl.load_data, forecast.revenue_forecast, forecast.backtest; "
+        "print(len(logging.getLogger().handlers))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=bench_dag_parse.REPO_ROOT)
+    assert result.stdout.strip() == "0", f"❌ Root logger configured at import ({result.stdout.strip()} handlers)"
+
+
+def test_task_modules_defer_settings_and_heavy_imports():
+    """No .env load on import, forecast imports pandas/SQLAlchemy/DuckDB when it runs, CSV_PATH is read when used"""
+    code = (
+        "import json, os, sys; import forecast.revenue_forecast; "
+        "heavy = sorted(m for m in ('pandas', 'sqlalchemy', 'duckdb', 'prophet') if m in sys.modules); "
+        "import etl.load_data, forecast.backtest; "
+        "os.environ['CSV_PATH'] = 'set_after_import.csv'; "
+        "print(json.dumps({'heavy': heavy, 'dotenv': 'dotenv' in sys.modules, 'csv': etl.load_data.csv_path()}))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=bench_dag_parse.REPO_ROOT)
+    imported = json.loads(result.stdout.strip().splitlines()[-1])
+    assert not imported["heavy"], f"❌ forecast.revenue_forecast imports {imported['heavy']} at import"
+    assert not imported["dotenv"], "❌ .env loaded at import; configure()/get_engine() should load it"
+    assert imported["csv"] == "set_after_import.csv", f"❌ CSV_PATH captured at import ({imported['csv']})"
+
+
+def test_settings_from_dotenv_are_honored(tmp_path):
+    """Cache, stats and transform settings given only in .env apply when used, though read after import"""
+    (tmp_path / ".env").write_text("ETL_CACHE=0\nPIPELINE_STATS=0\nFORECAST_CACHE=0\nTRANSFORM_WORKERS=7\n")
+    code = (
+        "import json; from etl import cache; from pipeline import instrumentation; "
+        "from forecast import model_cache; from db import transform_graph; "
+        "print(json.dumps([cache.enabled(), instrumentation.settings()['stats_enabled'], "
+        "model_cache.enabled(), transform_graph.settings()['workers']]))"
+    )
+    env = {k: v for k, v in os.environ.items()
+           if k not in ("ETL_CACHE", "PIPELINE_STATS", "FORECAST_CACHE", "TRANSFORM_WORKERS")}
+    env["PYTHONPATH"] = bench_dag_parse.REPO_ROOT
+    # `python -c` looks for .env from the working directory
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=tmp_path, env=env)
+    settings = json.loads(result.stdout.strip().splitlines()[-1])
+    assert settings == [False, False, False, 7], f"❌ .env settings ignored: {settings}"
+
+
+def test_dag_parse_within_budget():
+    """Parse time and peak memory of the DAG file stay under the regression thresholds"""
+    pytest.importorskip("airflow")
+    result = bench_dag_parse.measure(runs=3)
+    log.info(f"DAG parse: {result['seconds'] * 1000:.1f} ms, peak {result['peak_mb']:.1f} MB, {result['modules']} modules")
+    assert not result["heavy"], f"❌ Heavy modules imported at parse time: {result['heavy']}"
+    assert result["seconds"] <= bench_dag_parse.DAG_PARSE_MAX_SECONDS, (
+        f"❌ DAG parse took {result['seconds']:.3f}s (limit {bench_dag_parse.DAG_PARSE_MAX_SECONDS}s)"
+    )
+    assert result["peak_mb"] <= bench_dag_parse.DAG_PARSE_MAX_MB, (
+        f"❌ DAG parse peaked at {result['peak_mb']:.1f} MB (limit {bench_dag_parse.DAG_PARSE_MAX_MB} MB)"
+    )
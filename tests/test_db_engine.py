@@ -0,0 +1,83 @@
+"""
+Shared Engine Tests:
+One pooled engine per process with the configured statement timeout,
+fork-safe pools for worker processes, streaming reads that return their
+connection, and COPY writes through the shared helper.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from sqlalchemy import text
+
+from db import engine as db_engine
+
+log = logging.getLogger("tests.db_engine")
+
+
+def _backend_pid(_):
+    """Worker task: query through the worker's own get_engine()"""
+    with db_engine.get_engine().connect() as conn:
+        return os.getpid(), conn.execute(text("SELECT pg_backend_pid()")).scalar()
+
+
+def test_engine_is_shared_and_pooled(engine):
+    """Every caller gets the same engine; repeated queries reuse pooled connections"""
+    assert db_engine.get_engine() is engine, "❌ get_engine() should return the process-wide engine"
+    assert engine.pool.size() == db_engine.settings()["pool_size"], "❌ Pool size not taken from DB_POOL_SIZE"
+
+    backends = set()
+    for _ in range(20):
+        with db_engine.get_engine().connect() as conn:
+            backends.add(conn.execute(text("SELECT pg_backend_pid()")).scalar())
+    log.info(f"20 sequential queries used {len(backends)} server connection(s)")
+    assert len(backends) == 1, f"❌ Sequential queries opened {len(backends)} connections instead of reusing one"
+
+    timeout = pd.read_sql("SELECT setting FROM pg_settings WHERE name = 'statement_timeout'", engine)["setting"].iloc[0]
+    assert int(timeout) == db_engine.settings()["statement_timeout_ms"], f"❌ statement_timeout is {timeout}, expected DB_STATEMENT_TIMEOUT_MS"
+
+
+def test_forked_workers_get_their_own_pool(engine):
+    """A worker process never reuses the parent's socket, and the parent's pool survives the fork"""
+    with engine.connect() as conn:
+        parent_backend = conn.execute(text("SELECT pg_backend_pid()")).scalar()
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(_backend_pid, range(2)))
+    worker_backends = {backend for _, backend in results}
+    assert all(pid != os.getpid() for pid, _ in results), "❌ Tasks did not run in worker processes"
+    assert parent_backend not in worker_backends, "❌ A worker reused the parent's database connection"
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1, "❌ Parent pool broken after forking workers"
+
+
+def test_read_sql_chunks_streams_and_releases(engine):
+    """Fixed-size chunks from a server-side cursor; the connection goes back to the pool"""
+    chunks = db_engine.read_sql_chunks(
+        "SELECT g AS n FROM generate_series(1, :rows) g", params={"rows": 25_000}, chunksize=10_000, engine=engine,
+    )
+    sizes = []
+    for chunk in chunks:
+        sizes.append(len(chunk))
+        assert engine.pool.checkedout() == 1, "❌ Streaming read should hold exactly one connection"
+    assert sizes == [10_000, 10_000, 5_000], f"❌ Unexpected chunk sizes {sizes}"
+    assert engine.pool.checkedout() == 0, "❌ Connection not returned after the stream was consumed"
+
+
+def test_copy_dataframe_roundtrip(engine):
+    """COPY helper writes every row, dates in the requested format"""
+    df = pd.DataFrame({
+        "ds": pd.date_range("2018-01-01", periods=1_000, freq="D"),
+        "label": [f'row "{i}", quoted' for i in range(1_000)],
+        "value": [i / 4 for i in range(1_000)],
+    })
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TEMP TABLE copy_roundtrip (ds DATE, label TEXT, value NUMERIC)"))
+        db_engine.copy_dataframe(conn, df, "copy_roundtrip", date_format="%Y-%m-%d")
+        back = pd.read_sql("SELECT * FROM copy_roundtrip ORDER BY ds", conn, parse_dates=["ds"])
+        conn.execute(text("DROP TABLE copy_roundtrip"))
+
+    back["value"] = back["value"].astype(float)
+    pd.testing.assert_frame_equal(back, df, check_dtype=False)
@@ -0,0 +1,97 @@
+"""
+DuckDB Backend Parity Tests:
+The embedded build over the same raw rows (streamed from Postgres in
+chunks, tests/conftest.py `duck`) produces the same KPI, cohort
+and forecast-input tables as Postgres, the same actual-vs-forecast join
+and the same quality profile; without explicit rows it reads the ETL's
+Parquet snapshot.
+"""
+
+import logging
+import pandas as pd
+import pytest
+
+from db import duckdb_backend
+from etl import cache, load_data
+from forecast import revenue_forecast as rf
+
+log = logging.getLogger("tests.duckdb_backend")
+
+
+def _normalized(df):
+    """Dates as datetime64, numbers (Postgres NUMERIC arrives as Decimal) as float"""
+    df = df.copy()
+    for col in df.columns:
+        if col in ("order_date", "cohort_month", "order_month", "ds"):
+            df[col] = pd.to_datetime(df[col])
+        elif df[col].dtype == object:
+            df[col] = df[col].astype(float)
+    return df.astype({c: float for c in df.columns if pd.api.types.is_numeric_dtype(df[c])})
+
+
+@pytest.mark.parametrize("table, order", [
+    ("kpi_daily", "order_date"),
+    ("cohort_analysis", "cohort_month, order_month"),
+])
+def test_tables_match_postgres(engine, duck, table, order):
+    """Same rows and values (within float rounding) for the KPI and cohort tables"""
+    sql = f"SELECT * FROM {table} ORDER BY {order}"
+    arrow = duckdb_backend.fetch_arrow(sql, duck)
+    log.info(f"{table}: {arrow.num_rows} rows, Arrow schema {arrow.schema.names}")
+    pd.testing.assert_frame_equal(
+        _normalized(arrow.to_pandas()), _normalized(pd.read_sql(sql, engine)), rtol=1e-9, obj=table
+    )
+
+
+def test_forecast_inputs_match_postgres(engine, duck, monkeypatch):
+    """load_history / load_series return the same frames from either backend"""
+    history = rf.load_history(engine)
+    series = rf.load_series(engine, pd.DatetimeIndex(history["ds"]))
+
+    monkeypatch.setattr(duckdb_backend, "ANALYTICS_BACKEND", "duckdb")
+    monkeypatch.setattr(duckdb_backend, "_connection", duck)
+    duck_history = rf.load_history(engine)
+    duck_series = rf.load_series(engine, pd.DatetimeIndex(duck_history["ds"]))
+
+    pd.testing.assert_frame_equal(duck_history, history, rtol=1e-9, obj="history")
+    assert sorted(duck_series) == sorted(series), "❌ Different series keys"
+    for key in series:
+        pd.testing.assert_frame_equal(duck_series[key], series[key], rtol=1e-9, obj=key)
+
+
+def test_actual_vs_forecast_matches_view(engine, duck):
+    """The in-process join equals the Postgres materialized view"""
+    forecast = pd.read_sql("SELECT ds, yhat, yhat_lower, yhat_upper FROM forecast_revenue", engine)
+    joined = duckdb_backend.actual_vs_forecast(forecast, duck).to_pandas()
+    view = pd.read_sql("SELECT * FROM actual_vs_forecast ORDER BY ds", engine)
+    pd.testing.assert_frame_equal(_normalized(joined), _normalized(view), rtol=1e-9, obj="actual_vs_forecast")
+
+
+def test_profile_matches_postgres(duck, profile):
+    """Same quality profile (rows, NULLs, duplicates, dates, revenue) and no failures"""
+    duck_profile, problems = duckdb_backend.profile(duck)
+    assert problems == [], f"❌ DuckDB build fails checks: {problems}"
+    for table, p in duck_profile.items():
+        expected = profile[table]
+        for field in ["row_count", "nulls", "negative_count", "duplicate_keys", "min_date", "max_date", "checks"]:
+            assert p[field] == expected[field], f"❌ {table}.{field}: {p[field]} != {expected[field]}"
+        if expected["revenue"] is not None:
+            assert p["revenue"] == pytest.approx(float(expected["revenue"]), rel=1e-9), f"❌ {table} revenue differs"
+
+
+def test_reads_parquet_snapshot(engine, tmp_path, monkeypatch):
+    """With no rows given, the build cleans the CSV once, then reads its Parquet snapshot"""
+    pytest.importorskip("duckdb")
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(cache, "CACHE_ENABLED", True)
+    key = load_data.snapshot_key(load_data.file_fingerprint(load_data.csv_path()))
+
+    first = duckdb_backend.connect()
+    assert cache.has_snapshot(key), "❌ Cleaned CSV was not cached as a snapshot"
+    second = duckdb_backend.connect()
+    counts = [con.execute("SELECT COUNT(*), SUM(total_revenue) FROM kpi_daily").fetchone() for con in (first, second)]
+    first.close()
+    second.close()
+    assert counts[0][0] == counts[1][0] and counts[0][1] == pytest.approx(counts[1][1]), (
+        f"❌ CSV and snapshot builds differ: {counts}"
+    )
@@ -0,0 +1,122 @@
+"""
+ETL Parquet Cache Tests:
+Snapshots round-trip the cleaned frame exactly, prune by date range and
+columns, agree with raw_sales, and respect the retention policy. Snapshot
+keys follow the parse schema, and strict mode still rejects a dirty feed
+when its snapshot is cached.
+"""
+
+import logging
+import os
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from etl import cache, load_data
+from etl.load_data import KEY_COLUMNS, clean_csv, file_fingerprint
+
+log = logging.getLogger("tests.etl_cache")
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "train.csv")
+
+pytestmark = pytest.mark.skipif(not cache.HAS_PYARROW, reason="pyarrow not installed")
+
+
+@pytest.fixture(scope="module")
+def cleaned():
+    return clean_csv(CSV_PATH)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_snapshot_roundtrip(cleaned, cache_dir):
+    """Same rows, values and dtypes as the frame that was cached"""
+    fingerprint = file_fingerprint(CSV_PATH)
+    cache.write_snapshot(cleaned, fingerprint)
+    assert cache.has_snapshot(fingerprint), "❌ Snapshot directory not published"
+
+    actual = cache.read_snapshot(fingerprint).sort_values(KEY_COLUMNS, ignore_index=True)
+    pd.testing.assert_frame_equal(actual[cleaned.columns], cleaned.reset_index(drop=True))
+
+
+def test_snapshot_date_range_and_columns(cleaned, cache_dir):
+    """Only the requested columns and Order Date range come back"""
+    cache.write_snapshot(cleaned, "range")
+    start, end = pd.Timestamp("2017-01-15"), pd.Timestamp("2017-03-10")
+    df = cache.read_snapshot(start=start, end=end, columns=["Order Date", "Sales"])
+    expected = cleaned[cleaned["Order Date"].between(start, end)]
+    log.info(f"Range read: {len(df)} rows, columns={list(df.columns)}")
+
+    assert list(df.columns) == ["Order Date", "Sales"], f"❌ Unexpected columns {list(df.columns)}"
+    assert len(df) == len(expected), f"❌ Expected {len(expected)} rows in range, got {len(df)}"
+    assert df["Sales"].sum() == pytest.approx(expected["Sales"].sum()), "❌ Sales differ in range read"
+
+
+def test_snapshot_matches_raw_sales(cleaned, cache_dir, engine):
+    """The cached frame holds the same rows and revenue as the loaded table"""
+    cache.write_snapshot(cleaned, "db")
+    df = cache.read_snapshot("db", columns=["Order ID", "Sales"])
+    with engine.connect() as conn:
+        rows, revenue = conn.execute(text('SELECT COUNT(*), SUM("Sales") FROM raw_sales')).one()
+
+    assert len(df) == rows, f"❌ Snapshot has {len(df)} rows, raw_sales has {rows}"
+    assert df["Sales"].sum() == pytest.approx(float(revenue)), "❌ Snapshot revenue differs from raw_sales"
+
+
+def test_retention_keeps_most_recent(cleaned, cache_dir, monkeypatch):
+    """Writing past CACHE_RETENTION deletes the least recently used snapshots"""
+    monkeypatch.setattr(cache, "CACHE_RETENTION", 2)
+    small = cleaned.head(50)
+    for i, name in enumerate(["old", "mid", "new"]):
+        cache.write_snapshot(small, name)
+        os.utime(cache.snapshot_path(name), (1_000_000 + i, 1_000_000 + i))
+    cache.prune()
+
+    assert cache.list_snapshots() == ["new", "mid"], f"❌ Retention kept {cache.list_snapshots()}"
+
+
+def test_snapshot_key_follows_schema(monkeypatch):
+    """Changing the dtypes, the date format or CACHE_VERSION changes the key"""
+    fingerprint = file_fingerprint(CSV_PATH)
+    key = load_data.snapshot_key(fingerprint)
+    assert key.startswith(fingerprint) and key == load_data.snapshot_key(fingerprint), "❌ Key not deterministic"
+
+    changes = [
+        ("CSV_DTYPES", {**load_data.CSV_DTYPES, "Segment": "object"}),
+        ("DATE_FORMAT", "%m/%d/%Y"),
+        ("CACHE_VERSION", load_data.CACHE_VERSION + 1),
+    ]
+    for name, value in changes:
+        with monkeypatch.context() as m:
+            m.setattr(load_data, name, value)
+            assert load_data.snapshot_key(fingerprint) != key, f"❌ {name} is not part of the snapshot key"
+
+
+def test_strict_mode_checks_cached_feed(cache_dir, tmp_path, monkeypatch):
+    """A snapshot of a feed with coerced values is not served in strict mode; a clean one is"""
+    monkeypatch.setattr(cache, "CACHE_ENABLED", True)
+    monkeypatch.setattr(load_data, "STRICT_SCHEMA", False)
+    feed = pd.read_csv(CSV_PATH, nrows=50, dtype=str)
+    dirty = feed.copy()
+    dirty.loc[3, "Sales"] = "12,50"
+
+    keys = {}
+    for name, frame in [("clean", feed), ("dirty", dirty)]:
+        path = tmp_path / f"{name}.csv"
+        frame.to_csv(path, index=False)
+        fingerprint = file_fingerprint(path)
+        load_data.write_cleaned_snapshot(clean_csv(path), fingerprint)
+        keys[name] = (path, fingerprint)
+
+    assert cache.read_meta(load_data.snapshot_key(keys["dirty"][1])) == {"schema_violations": 1}
+    assert load_data.cached_snapshot(keys["dirty"][1]) is not None, "❌ Lenient mode ignored the snapshot"
+
+    monkeypatch.setattr(load_data, "STRICT_SCHEMA", True)
+    assert load_data.cached_snapshot(keys["clean"][1]) is not None, "❌ Clean feed's snapshot not served in strict mode"
+    assert load_data.cached_snapshot(keys["dirty"][1]) is None, "❌ Dirty feed's snapshot served in strict mode"
+    with pytest.raises(ValueError, match="failed the CSV schema"):
+        clean_csv(keys["dirty"][0])
@@ -0,0 +1,43 @@
+"""
+ETL Dedupe Tests:
+The key-only duplicate aggregation must match the original groupby/agg
+reference row for row, including "first" skipping nulls.
+"""
+
+import logging
+import os
+import numpy as np
+import pandas as pd
+
+from etl.load_data import aggregate_duplicates, aggregate_duplicates_groupby, clean, read_sales_csv
+
+log = logging.getLogger("tests.etl_dedupe")
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "train.csv")
+
+
+def test_dedupe_matches_groupby_on_train_csv():
+    """Same rows, order, values and dtypes as the groupby reference on the real feed"""
+    df = clean(read_sales_csv(CSV_PATH))
+    expected = aggregate_duplicates_groupby(df)
+    actual = aggregate_duplicates(df)
+    log.info(f"Aggregated {len(df)} rows -> {len(actual)}")
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_dedupe_first_skips_nulls():
+    """A null in a group's first row falls through to the next non-null value"""
+    df = pd.DataFrame({
+        "Order ID": ["B-2", "A-1", "A-1", "B-2", "A-1", "C-3"],
+        "Product ID": ["P1", "P2", "P2", "P1", "P3", "P1"],
+        "City": [None, "Austin", "Boston", "Dallas", None, None],
+        "Postal Code": [np.nan, 73301.0, 2108.0, 75201.0, np.nan, np.nan],
+        "Sales": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+    })
+    expected = aggregate_duplicates_groupby(df)
+    actual = aggregate_duplicates(df)
+    log.info(f"Edge-case result:\n{actual}")
+    pd.testing.assert_frame_equal(actual, expected)
+    assert actual.loc[actual["Order ID"] == "B-2", "City"].iloc[0] == "Dallas", (
+        "❌ First non-null City not picked for B-2/P1"
+    )
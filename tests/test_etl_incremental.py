@@ -0,0 +1,109 @@
+"""
+ETL Incremental Tests:
+A delta load after a full load ends with the same raw_sales as a full load
+of the new file: new keys on the watermark date (another line item of the
+watermark order, a late order with a lower Order ID) and past it are
+loaded, and an already loaded key that gains a line is re-aggregated
+rather than skipped or counted twice. Runs in the etl_schema scratch schema
+(tests/conftest.py).
+"""
+
+import logging
+import os
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from etl import cache, load_data
+
+log = logging.getLogger("tests.etl_incremental")
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "train.csv")
+RAW_SALES_MD5 = "SELECT md5(string_agg(t::text, chr(10) ORDER BY t::text)) FROM {schema}.raw_sales t"
+
+
+@pytest.fixture
+def day1(etl_schema, tmp_path, monkeypatch):
+    """The first 300 CSV rows, loaded by a first incremental run (no watermark yet: a full load)"""
+    monkeypatch.setattr(cache, "CACHE_ENABLED", False)
+    monkeypatch.setattr(load_data, "LOAD_METHOD", "copy")
+    feed = pd.read_csv(CSV_PATH, nrows=300, dtype=str, keep_default_na=False)
+    path = tmp_path / "day1.csv"
+    feed.to_csv(path, index=False)
+    monkeypatch.setattr(load_data, "CSV_PATH", str(path))
+    load_data.run_incremental()
+    return feed
+
+
+def _watermark(engine, schema):
+    with engine.connect() as conn:
+        watermark = conn.execute(
+            text(f"SELECT value FROM {schema}.pipeline_state WHERE key = :key"),
+            {"key": load_data.WATERMARK_KEY},
+        ).scalar()
+    return watermark.split("|", 1)
+
+
+def _load_incremental(engine, schema, feed, new_rows, tmp_path, monkeypatch):
+    """Incremental load of feed + new_rows; returns (delta keys, raw_sales md5)"""
+    path = tmp_path / "day2.csv"
+    pd.concat([feed, new_rows], ignore_index=True).to_csv(path, index=False)
+    monkeypatch.setattr(load_data, "CSV_PATH", str(path))
+    load_data.run_incremental()
+    with engine.connect() as conn:
+        delta = {tuple(key) for key in conn.execute(text(
+            f'SELECT "Order ID", "Product ID" FROM {schema}.{load_data.DELTA_TABLE}'
+        ))}
+        return delta, conn.execute(text(RAW_SALES_MD5.format(schema=schema))).scalar()
+
+
+def _load_full(engine, schema):
+    """Full load of the same file; returns the raw_sales md5"""
+    load_data.run_full()
+    with engine.connect() as conn:
+        return conn.execute(text(RAW_SALES_MD5.format(schema=schema))).scalar()
+
+
+def _sales(engine, schema, key):
+    with engine.connect() as conn:
+        return conn.execute(text(
+            f'SELECT "Sales" FROM {schema}.raw_sales WHERE "Order ID" = :o AND "Product ID" = :p'
+        ), {"o": key[0], "p": key[1]}).scalar()
+
+
+def test_incremental_loads_new_keys_on_watermark_date(engine, etl_schema, day1, tmp_path, monkeypatch):
+    """New keys on and past the watermark date are loaded, whatever their Order ID"""
+    wm_date, wm_order = _watermark(engine, etl_schema)
+    last = day1[day1["Order ID"] == wm_order].iloc[0]
+    next_day = (pd.Timestamp(wm_date) + pd.Timedelta(days=1)).strftime(load_data.DATE_FORMAT)
+    new_rows = pd.DataFrame([
+        {**last, "Row ID": "100001", "Product ID": "TST-SIBLING", "Sales": "10"},
+        {**last, "Row ID": "100002", "Order ID": "AA-0000-000001", "Product ID": "TST-LATE", "Sales": "20"},
+        {**last, "Row ID": "100003", "Order ID": "ZZ-9999-999999", "Product ID": "TST-NEXT",
+         "Order Date": next_day, "Ship Date": next_day, "Sales": "30"},
+    ])
+    assert new_rows["Order ID"].iloc[1] < wm_order, "❌ Late order must sort before the watermark order"
+
+    delta, incremental = _load_incremental(engine, etl_schema, day1, new_rows, tmp_path, monkeypatch)
+    full = _load_full(engine, etl_schema)
+    log.info(f"Watermark {wm_date}|{wm_order}, delta {sorted(delta)}")
+    missing = set(zip(new_rows["Order ID"], new_rows["Product ID"])) - delta
+    assert not missing, f"❌ New keys missing from the delta: {missing}"
+    assert incremental == full, "❌ Incremental raw_sales differs from a full load of the same file"
+
+
+def test_incremental_reaggregates_existing_key(engine, etl_schema, day1, tmp_path, monkeypatch):
+    """An already loaded key on the watermark date that gains a line gets the summed Sales of a full load"""
+    wm_date, wm_order = _watermark(engine, etl_schema)
+    last = day1[day1["Order ID"] == wm_order].iloc[0]
+    key = (last["Order ID"], last["Product ID"])
+    before = _sales(engine, etl_schema, key)
+    new_rows = pd.DataFrame([{**last, "Row ID": "100001", "Sales": "1000"}])
+
+    delta, incremental = _load_incremental(engine, etl_schema, day1, new_rows, tmp_path, monkeypatch)
+    after = _sales(engine, etl_schema, key)
+    full = _load_full(engine, etl_schema)
+    log.info(f"Key {key}: Sales {before} -> {after}")
+    assert key in delta, f"❌ Re-aggregated key {key} missing from the delta"
+    assert float(after) == pytest.approx(float(before) + 1000), f"❌ Key {key} has Sales {after}, expected {before} + 1000"
+    assert incremental == full, "❌ Incremental raw_sales differs from a full load of the same file"
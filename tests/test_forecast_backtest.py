@@ -0,0 +1,151 @@
+"""
+Forecast Backtest Tests:
+Cutoffs leave a full horizon of actuals, accuracy metrics are computed per
+horizon bucket, the time budget drops unfinished cutoffs instead of
+waiting (killing the workers still fitting), and forecast_accuracy holds a sane latest run.
+"""
+
+import logging
+import multiprocessing
+import os
+import subprocess
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecast import backtest
+from forecast import revenue_forecast as rf
+
+log = logging.getLogger("tests.forecast_backtest")
+
+
+@pytest.fixture(scope="module")
+def history(engine):
+    return rf.load_history(engine)
+
+
+def test_cutoffs_leave_full_horizon(history):
+    """Most recent first, BACKTEST_STEP apart, horizon observable, enough training data"""
+    cutoffs = backtest.plan_cutoffs(history, horizon=90, count=5, step=30)
+    log.info(f"Cutoffs: {[f'{c:%Y-%m-%d}' for c in cutoffs]}")
+    assert len(cutoffs) == 5, f"❌ Expected 5 cutoffs, got {len(cutoffs)}"
+    assert cutoffs[0] == history["ds"].max() - pd.Timedelta(days=90), "❌ Latest cutoff should leave 90 days"
+    assert all(a - b == pd.Timedelta(days=30) for a, b in zip(cutoffs, cutoffs[1:])), "❌ Cutoffs not 30 days apart"
+
+    # Asking for more cutoffs than the history supports just yields fewer
+    many = backtest.plan_cutoffs(history, horizon=90, count=1000, step=30)
+    assert all(c - history["ds"].min() >= pd.Timedelta(days=backtest.BACKTEST_MIN_TRAIN) for c in many), (
+        "❌ A cutoff has less than BACKTEST_MIN_TRAIN days of training data"
+    )
+
+
+def test_accuracy_by_bucket():
+    """MAPE/RMSE/coverage per bucket on a hand-checkable frame"""
+    cutoff = pd.Timestamp("2018-01-01")
+    h = np.array([1, 2, 10, 40])
+    scored = pd.DataFrame({
+        "cutoff": cutoff,
+        "ds": cutoff + pd.to_timedelta(h, unit="D"),
+        "h": h,
+        "y": [100.0, 200.0, 50.0, 0.0],
+        "yhat": [110.0, 180.0, 50.0, 10.0],
+        "yhat_lower": [90.0, 170.0, 40.0, 5.0],
+        "yhat_upper": [120.0, 190.0, 60.0, 20.0],
+    })
+    metrics = backtest.accuracy_by_bucket([scored]).set_index("horizon_bucket")
+
+    assert list(metrics.index) == ["1-7", "8-30", "31-60"], f"❌ Unexpected buckets: {list(metrics.index)}"
+    first = metrics.loc["1-7"]
+    assert first["mape"] == pytest.approx(10.0), "❌ MAPE of (10%, 10%) should be 10%"
+    assert first["rmse"] == pytest.approx(np.sqrt((100 + 400) / 2)), "❌ Wrong RMSE"
+    assert first["coverage"] == pytest.approx(0.5), "❌ One of two actuals is inside its interval"
+    assert np.isnan(metrics.loc["31-60", "mape"]), "❌ Days without sales must not enter MAPE"
+    assert metrics.loc["31-60", "coverage"] == 0, "❌ Actual 0 is below the interval"
+
+
+def test_budget_stops_running_fits(history, monkeypatch):
+    """Fits still running when the budget runs out are killed, not left to finish in the background"""
+    def stuck_forecast_all(series):
+        time.sleep(60)
+
+    monkeypatch.setattr(rf, "forecast_all", stuck_forecast_all)
+    cutoffs = backtest.plan_cutoffs(history, count=4)
+
+    started = time.perf_counter()
+    scored = backtest.run_backtest(history, cutoffs, workers=2, budget=0.5)
+    elapsed = time.perf_counter() - started
+    alive = multiprocessing.active_children()
+    log.info(f"{len(scored)} cutoffs in {elapsed:.2f}s, {len(alive)} worker(s) left")
+    assert scored == [], f"❌ No cutoff can finish, got {len(scored)}"
+    assert elapsed < 5, f"❌ Backtest waited for its running fits: {elapsed:.2f}s"
+    assert alive == [], f"❌ Backtest workers still running after the budget: {alive}"
+
+
+def _running(pid):
+    """Whether pid is a live process (zombies waiting to be reaped don't count)"""
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            return fh.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_budget_leaves_no_worker_processes(history, tmp_path, monkeypatch):
+    """Workers and the processes their fits started (like Prophet's Stan) are all gone after the budget"""
+    def stuck_forecast_all(series):
+        child = subprocess.Popen(["sleep", "60"])
+        (tmp_path / f"{os.getpid()}.pids").write_text(f"{os.getpid()} {child.pid}")
+        time.sleep(60)
+
+    monkeypatch.setattr(rf, "forecast_all", stuck_forecast_all)
+    cutoffs = backtest.plan_cutoffs(history, count=4)
+
+    backtest.run_backtest(history, cutoffs, workers=2, budget=1.0)
+    pids = [int(pid) for path in tmp_path.glob("*.pids") for pid in path.read_text().split()]
+    deadline = time.monotonic() + 2  # orphaned children are reaped by init, not by us
+    while any(_running(pid) for pid in pids) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    alive = [pid for pid in pids if _running(pid)]
+    log.info(f"Fit processes {pids}, {len(alive)} left")
+    assert len(pids) == 4, f"❌ Expected 2 workers with one child each, got {pids}"
+    assert alive == [], f"❌ Backtest processes still running after the budget: {alive}"
+
+
+def test_budget_drops_unfinished_cutoffs(history, monkeypatch):
+    """A budget smaller than the work returns the cutoffs done so far, promptly"""
+    real_forecast_all = rf.forecast_all
+
+    def slow_forecast_all(series):
+        time.sleep(0.5)
+        return real_forecast_all(series)
+
+    # Forked workers inherit the patched module state
+    monkeypatch.setattr(rf, "FORECAST_BACKEND", "numpy")
+    monkeypatch.setattr(rf, "forecast_all", slow_forecast_all)
+    cutoffs = backtest.plan_cutoffs(history, count=6)
+
+    started = time.perf_counter()
+    scored = backtest.run_backtest(history, cutoffs, workers=1, budget=1.2)
+    elapsed = time.perf_counter() - started
+    log.info(f"{len(scored)} of {len(cutoffs)} cutoffs in {elapsed:.2f}s")
+    assert 0 < len(scored) < len(cutoffs), f"❌ Expected a partial backtest, got {len(scored)} of {len(cutoffs)}"
+    assert elapsed < 2.5, f"❌ Backtest overran its budget: {elapsed:.2f}s"
+    assert scored[0]["cutoff"].iloc[0] == cutoffs[0], "❌ Most recent cutoff should be evaluated first"
+
+
+def test_forecast_accuracy_latest_run(engine):
+    """Latest run: every bucket present once, metrics in range"""
+    exists = pd.read_sql(f"SELECT to_regclass('{backtest.ACCURACY_TABLE}') IS NOT NULL AS ok", engine)["ok"].iloc[0]
+    if not exists:
+        pytest.skip(f"{backtest.ACCURACY_TABLE} not built (run python -m forecast.backtest)")
+
+    df = pd.read_sql(f"""
+        SELECT * FROM {backtest.ACCURACY_TABLE}
+        WHERE run_at = (SELECT MAX(run_at) FROM {backtest.ACCURACY_TABLE})
+    """, engine)
+    log.info(f"Latest run:\n{df[['backend', 'horizon_bucket', 'mape', 'rmse', 'coverage']]}")
+    assert not df.empty, "❌ forecast_accuracy is empty"
+    assert df["horizon_bucket"].is_unique, "❌ Duplicate horizon buckets in one run"
+    assert df["coverage"].between(0, 1).all(), "❌ Coverage outside [0, 1]"
+    assert (df["rmse"] >= 0).all() and (df["points"] > 0).all(), "❌ Invalid RMSE or empty bucket"
@@ -0,0 +1,91 @@
+"""
+Forecast Model Cache Tests:
+An unchanged training frame reuses the stored forecast without fitting,
+appended days warm-start from the previous model, and each series keeps
+only its most recently used entries.
+"""
+
+import logging
+import pytest
+
+from forecast import model_cache
+from forecast import revenue_forecast as rf
+
+log = logging.getLogger("tests.forecast_cache")
+
+
+@pytest.fixture(scope="module")
+def history(engine):
+    return rf.load_history(engine)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, "MODEL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(model_cache, "MODEL_CACHE_ENABLED", True)
+    return tmp_path
+
+
+@pytest.fixture
+def fits(monkeypatch):
+    """Records the init passed to every Prophet fit"""
+    calls = []
+    real_fit = rf.fit_prophet
+
+    def spy(history, horizon=rf.FORECAST_HORIZON, init=None):
+        calls.append(init)
+        return real_fit(history, horizon, init=init)
+
+    monkeypatch.setattr(rf, "fit_prophet", spy)
+    return calls
+
+
+def test_fingerprint_tracks_data_and_horizon(history):
+    """Same frame -> same key; any changed value, row or horizon -> new key"""
+    fp = model_cache.fingerprint(history, 90)
+    assert fp == model_cache.fingerprint(history.copy(), 90), "❌ Fingerprint not deterministic"
+    changed = history.copy()
+    changed.loc[changed.index[-1], "y"] += 0.01
+    assert model_cache.fingerprint(changed, 90) != fp, "❌ Changed revenue kept the fingerprint"
+    assert model_cache.fingerprint(history.iloc[:-1], 90) != fp, "❌ Dropped row kept the fingerprint"
+    assert model_cache.fingerprint(history, 30) != fp, "❌ Horizon not part of the fingerprint"
+
+
+def test_unchanged_history_skips_fit(history, cache_dir, fits):
+    """Second run on the same frame returns the stored forecast, no fit"""
+    first = rf.fit_forecast(history, key="total")
+    second = rf.fit_forecast(history, key="total")
+    log.info(f"Fits: {len(fits)}, entries: {model_cache.list_entries('total')}")
+    assert len(fits) == 1, f"❌ Expected one fit, got {len(fits)}"
+    assert (second["ds"] == first["ds"]).all(), "❌ Cached forecast dates differ"
+    assert (second["yhat"] - first["yhat"]).abs().max() < 1e-9, "❌ Cached forecast values differ"
+
+
+def test_appended_history_warm_starts(history, cache_dir, fits):
+    """New days at the end -> fit initialised from the previous model's parameters"""
+    rf.fit_forecast(history.iloc[:-7], key="total")
+    forecast = rf.fit_forecast(history, key="total")
+
+    assert fits[0] is None, "❌ First fit should be a cold start"
+    assert fits[1] is not None and set(fits[1]) == {"k", "m", "delta", "beta", "sigma_obs"}, (
+        f"❌ Second fit not warm-started: {fits[1]}"
+    )
+    assert forecast["ds"].min() > history["ds"].max(), "❌ Warm-started forecast overlaps history"
+    assert len(forecast) == rf.FORECAST_HORIZON, "❌ Warm-started forecast has the wrong horizon"
+
+    # An edit inside the history is not an append: no prefix matches
+    edited = history.copy()
+    edited.loc[edited.index[0], "y"] += 1
+    assert model_cache.warm_start_params("total", edited, rf.FORECAST_HORIZON) is None, (
+        "❌ Warm start offered for a frame whose history changed"
+    )
+
+
+def test_retention_keeps_most_recent_entries(history, cache_dir, monkeypatch):
+    """Only MODEL_CACHE_RETENTION entries per series survive"""
+    monkeypatch.setattr(model_cache, "MODEL_CACHE_RETENTION", 2)
+    model, forecast = rf.fit_prophet(history)
+    for days in [4, 3, 2, 1]:
+        model_cache.save("total", history.iloc[:-days], rf.FORECAST_HORIZON, model, forecast)
+    rows = [rows for rows, _ in model_cache.list_entries("total")]
+    assert rows == [len(history) - 1, len(history) - 2], f"❌ Wrong entries kept: {rows}"
@@ -0,0 +1,77 @@
+"""
+NumPy Forecast Backend Tests:
+The trend + Fourier model recovers a known seasonal signal, a batched fit
+equals fitting each series alone, intervals bracket the forecast, and the
+backend registry rejects unknown names.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecast import numpy_backend
+from forecast import revenue_forecast as rf
+
+log = logging.getLogger("tests.forecast_numpy")
+
+
+def _signal(days):
+    """Trend + weekly + yearly pattern the model can represent exactly"""
+    t = np.arange(days, dtype=float)
+    return 1000 + 0.5 * t + 80 * np.sin(2 * np.pi * t / 7) + 200 * np.cos(2 * np.pi * t / 365.25)
+
+
+def test_recovers_seasonal_signal():
+    """Noise-free trend + seasonality is extrapolated exactly, same output schema as Prophet"""
+    ds = pd.date_range("2016-01-01", periods=800 + 30, freq="D")
+    y = _signal(len(ds))
+    history = pd.DataFrame({"ds": ds[:800], "y": y[:800]})
+
+    forecast = numpy_backend.forecast_many({"total": history}, 30)["total"]
+    assert list(forecast.columns) == ["ds", "yhat", "yhat_lower", "yhat_upper"], "❌ Unexpected output columns"
+    assert (forecast["ds"] == ds[800:]).all(), "❌ Forecast dates should be the 30 days after history"
+    error = np.abs(forecast["yhat"].to_numpy() - y[800:]).max()
+    log.info(f"Max extrapolation error on a noise-free signal: {error:.2e}")
+    assert error < 1e-6, f"❌ Noise-free signal not recovered (max error {error})"
+
+
+def test_batched_fit_matches_single_fits():
+    """One solve over many series == solving each series on its own"""
+    rng = np.random.default_rng(7)
+    ds = pd.date_range("2017-01-01", periods=400, freq="D")
+    series = {
+        f"s{i}": pd.DataFrame({"ds": ds, "y": _signal(len(ds)) * rng.uniform(0.5, 2) + rng.normal(0, 30, len(ds))})
+        for i in range(25)
+    }
+    batched = numpy_backend.forecast_many(series, 14)
+    for key in ["s0", "s11", "s24"]:
+        single = numpy_backend.forecast_many({key: series[key]}, 14)[key]
+        pd.testing.assert_frame_equal(batched[key], single, check_exact=False, rtol=1e-9)
+
+    for key, fc in batched.items():
+        assert (fc["yhat_lower"] <= fc["yhat"]).all() and (fc["yhat"] <= fc["yhat_upper"]).all(), (
+            f"❌ {key}: interval does not bracket yhat"
+        )
+
+
+def test_rejects_series_on_different_dates():
+    """The shared design matrix needs every series on the same dates"""
+    a = pd.DataFrame({"ds": pd.date_range("2017-01-01", periods=30), "y": 1.0})
+    b = a.iloc[1:]
+    with pytest.raises(ValueError):
+        numpy_backend.forecast_many({"a": a, "b": b}, 7)
+
+
+def test_backend_registry(monkeypatch):
+    """FORECAST_BACKEND picks the engine; unknown names fail fast"""
+    assert set(rf.BACKENDS) == {"prophet", "numpy"}, f"❌ Unexpected backends: {sorted(rf.BACKENDS)}"
+    history = pd.DataFrame({"ds": pd.date_range("2017-01-01", periods=60), "y": np.arange(60.0)})
+
+    monkeypatch.setattr(rf, "FORECAST_BACKEND", "numpy")
+    forecast = rf.forecast_all({rf.TOTAL_KEY: history})[rf.TOTAL_KEY]
+    assert len(forecast) == rf.FORECAST_HORIZON, "❌ numpy backend returned the wrong horizon"
+
+    monkeypatch.setattr(rf, "FORECAST_BACKEND", "arima")
+    with pytest.raises(ValueError):
+        rf.forecast_all({rf.TOTAL_KEY: history})
@@ -0,0 +1,66 @@
+"""
+Forecast Publish Tests:
+forecast_revenue is replaced atomically: an uncommitted publish is
+invisible to other sessions, a failed one leaves the old forecast, and the
+table (with the views built on it) survives. Every publish here is rolled
+back.
+"""
+
+import logging
+import time
+import pandas as pd
+import psycopg2
+import pytest
+
+from forecast import revenue_forecast as rf
+
+log = logging.getLogger("tests.forecast_publish")
+
+
+def _forecast(days):
+    ds = pd.date_range("2030-01-01", periods=days, freq="D")
+    return pd.DataFrame({"ds": ds, "yhat": 1.5, "yhat_lower": 1.0, "yhat_upper": 2.0})
+
+
+def test_publish_is_invisible_until_commit(engine):
+    """Other sessions keep seeing the complete old forecast while a publish is in flight"""
+    before = pd.read_sql("SELECT COUNT(*) AS n, MAX(ds) AS last FROM forecast_revenue", engine).iloc[0]
+    new = _forecast(3650)
+
+    with engine.connect() as writer:
+        trans = writer.begin()
+        try:
+            started = time.perf_counter()
+            rf.publish(writer, "forecast_revenue", new)
+            elapsed = time.perf_counter() - started
+            inside = writer.exec_driver_sql("SELECT COUNT(*) FROM forecast_revenue").scalar()
+            outside = pd.read_sql("SELECT COUNT(*) AS n, MAX(ds) AS last FROM forecast_revenue", engine).iloc[0]
+            view = writer.exec_driver_sql(
+                "SELECT relkind FROM pg_class WHERE relname = 'actual_vs_forecast'"
+            ).scalar()
+        finally:
+            trans.rollback()
+
+    log.info(f"Published {len(new)} rows in {elapsed * 1000:.1f} ms; reader saw {outside['n']} rows meanwhile")
+    assert inside == len(new), f"❌ Writer sees {inside} rows, expected {len(new)}"
+    assert outside["n"] == before["n"] and outside["last"] == before["last"], "❌ Reader saw a partial or new forecast"
+    assert view == "m", "❌ Publishing dropped the actual_vs_forecast materialized view"
+    assert elapsed < 2, f"❌ COPY publish of {len(new)} rows took {elapsed:.2f}s"
+
+
+def test_failed_publish_keeps_old_forecast(engine):
+    """A bad row aborts the COPY; the old forecast is untouched"""
+    before = pd.read_sql("SELECT * FROM forecast_revenue ORDER BY ds", engine)
+    bad = _forecast(10).astype({"yhat": object})
+    bad.loc[5, "yhat"] = "not-a-number"
+
+    with engine.connect() as writer:
+        trans = writer.begin()
+        try:
+            with pytest.raises(psycopg2.DataError):
+                rf.publish(writer, "forecast_revenue", bad)
+        finally:
+            trans.rollback()
+
+    after = pd.read_sql("SELECT * FROM forecast_revenue ORDER BY ds", engine)
+    pd.testing.assert_frame_equal(after, before)
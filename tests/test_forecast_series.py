@@ -0,0 +1,82 @@
+"""
+Series Forecast Tests:
+Per-Region / per-Category histories add up to kpi_daily, reconciliation
+makes each level sum to the total, and forecast_revenue_series (written by
+FORECAST_MODE=series) is keyed by (series_key, ds) and coherent.
+"""
+
+import logging
+import pandas as pd
+import pytest
+
+from forecast import revenue_forecast as rf
+
+log = logging.getLogger("tests.forecast_series")
+
+
+def _series_table_exists(engine):
+    return pd.read_sql(f"SELECT to_regclass('{rf.SERIES_TABLE}') IS NOT NULL AS ok", engine)["ok"].iloc[0]
+
+
+def test_series_history_sums_to_kpi_daily(engine):
+    """Every level's daily series add up to total revenue on every day"""
+    history = rf.load_history(engine)
+    series = rf.load_series(engine, pd.DatetimeIndex(history["ds"]))
+    levels = {key.split("=", 1)[0] for key in series}
+    log.info(f"{len(series)} series across levels {sorted(levels)}")
+    assert levels == {"region", "category"}, f"❌ Unexpected series levels: {sorted(levels)}"
+
+    for level in levels:
+        total = sum(frame.set_index("ds")["y"] for key, frame in series.items() if key.startswith(level + "="))
+        diff = (total - history.set_index("ds")["y"]).abs().max()
+        assert diff < 1e-6, f"❌ {level} series differ from kpi_daily by up to {diff}"
+
+
+def test_reconcile_scales_levels_to_total():
+    """Reconciled members sum to the total; shares within a level are kept"""
+    ds = pd.date_range("2019-01-01", periods=3, freq="D")
+
+    def frame(yhat):
+        yhat = pd.Series(yhat, dtype=float)
+        return pd.DataFrame({"ds": ds, "yhat": yhat, "yhat_lower": yhat - 1, "yhat_upper": yhat + 1})
+
+    forecasts = {
+        "total": frame([100, 200, 300]),
+        "region=East": frame([30, 50, 0]),
+        "region=West": frame([30, 50, 0]),
+        "category=Furniture": frame([100, 200, 300]),
+    }
+    out = rf.reconcile(forecasts)
+
+    region_sum = out["region=East"]["yhat"] + out["region=West"]["yhat"]
+    assert region_sum.iloc[:2].tolist() == [100, 200], f"❌ Regions not reconciled: {region_sum.tolist()}"
+    assert region_sum.iloc[2] == 0, "❌ A zero-sum day should be left as fitted"
+    assert out["region=East"]["yhat_upper"].iloc[0] == pytest.approx(31 * 100 / 60), "❌ Interval not scaled with yhat"
+    pd.testing.assert_frame_equal(out["category=Furniture"], forecasts["category=Furniture"])
+
+
+def test_series_table_is_keyed_and_coherent(engine):
+    """One row per (series_key, ds), same horizon as forecast_revenue, levels sum to the total"""
+    if not _series_table_exists(engine):
+        pytest.skip(f"{rf.SERIES_TABLE} not built (run with FORECAST_MODE=series)")
+
+    pk = pd.read_sql(f"""
+        SELECT a.attname FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = '{rf.SERIES_TABLE}'::regclass AND i.indisprimary
+    """, engine)["attname"].tolist()
+    assert sorted(pk) == ["ds", "series_key"], f"❌ Primary key should be (series_key, ds), got {pk}"
+
+    df = pd.read_sql(f"SELECT * FROM {rf.SERIES_TABLE}", engine)
+    total = pd.read_sql("SELECT ds, yhat FROM forecast_revenue", engine)
+    days = df.groupby("series_key")["ds"].nunique()
+    log.info(f"{len(days)} series, {days.min()}-{days.max()} days each")
+    assert (days == len(total)).all(), f"❌ Series horizons differ from forecast_revenue:\n{days}"
+    assert df[["yhat", "yhat_lower", "yhat_upper"]].notna().all().all(), "❌ NULL forecasts in series table"
+
+    # Holds when the run reconciled (FORECAST_RECONCILE=1, the default)
+    df["level"] = df["series_key"].str.split("=").str[0]
+    sums = df[df["level"] != rf.TOTAL_KEY].groupby(["level", "ds"])["yhat"].sum().astype(float).reset_index()
+    merged = sums.merge(total, on="ds")
+    error = (merged["yhat_x"] - merged["yhat_y"].astype(float)).abs().max()
+    assert error < 1e-3, f"❌ Series levels don't sum to the total forecast (max error {error})"
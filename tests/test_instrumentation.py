@@ -0,0 +1,163 @@
+"""
+Pipeline Instrumentation Tests:
+SQL scripts split on the right semicolons, stages record timings, rows,
+peak RSS and failures to the JSON artifact and pipeline_run_stats, SQL
+files are timed per statement, stages running side by side in threads
+only charge their own CPU, and the profiling hook writes its profile.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from pipeline import instrumentation
+
+log = logging.getLogger("tests.instrumentation")
+
+
+@pytest.fixture
+def stats_run(tmp_path, monkeypatch):
+    """Stats switched on, written under tmp_path with a unique run id; returns a reader of the artifact"""
+    run = f"test__{uuid.uuid4().hex[:12]}"
+    monkeypatch.setenv("PIPELINE_RUN_ID", run)
+    monkeypatch.setattr(instrumentation, "STATS_ENABLED", True)
+    monkeypatch.setattr(instrumentation, "STATS_DIR", str(tmp_path))
+
+    def records():
+        with open(tmp_path / f"{run}.jsonl") as f:
+            return [json.loads(line) for line in f]
+
+    yield records
+    with instrumentation.get_engine().begin() as conn:
+        conn.execute(text(f"DELETE FROM {instrumentation.STATS_TABLE} WHERE run_id = :run"), {"run": run})
+
+
+def test_split_sql():
+    """Semicolons in strings, identifiers, dollar-quoted bodies and comments don't split"""
+    script = """
+        -- header; not a statement
+        CREATE TABLE t (a TEXT, "b;c" INT);
+        INSERT INTO t VALUES ('x;y', 1), ('it''s;', 2);
+        /* block; comment */
+        CREATE FUNCTION f() RETURNS INT LANGUAGE sql AS $$ SELECT 1; $$;
+        DO $body$ BEGIN PERFORM 1; END $body$;
+        SELECT $1::INT;
+        -- trailing comment only
+    """
+    statements = instrumentation.split_sql(script)
+    assert len(statements) == 5, f"❌ Expected 5 statements, got {len(statements)}: {statements}"
+    assert statements[1].endswith("('it''s;', 2)"), "❌ Quoted semicolon split the INSERT"
+    assert statements[2].endswith("$$ SELECT 1; $$"), "❌ Dollar-quoted body split the function"
+    assert statements[4] == "SELECT $1::INT", "❌ Positional parameter taken for a dollar quote"
+
+
+def test_stage_records_rows_peak_and_failure(stats_run):
+    """A stage records rows/sec and its own memory peak; a failing stage is recorded, then re-raised"""
+    with instrumentation.stage("probe.allocate", rows_in=1_000) as stats:
+        block = np.ones(64 * 2**20 // 8)  # 64 MB touched
+        stats.rows_out = 500
+        del block
+    with pytest.raises(ZeroDivisionError):
+        with instrumentation.stage("probe.fail"):
+            1 / 0
+
+    allocate, fail = stats_run()
+    log.info(f"probe.allocate: {allocate}")
+    assert allocate["stage"] == "probe.allocate" and allocate["status"] == "ok", "❌ Stage not recorded"
+    assert (allocate["rows_in"], allocate["rows_out"]) == (1_000, 500), "❌ Rows in/out not recorded"
+    assert allocate["rows_per_sec"] == pytest.approx(500 / allocate["wall_seconds"]), "❌ rows/sec should use rows_out"
+    assert allocate["peak_rss_mb"] >= 64, f"❌ Peak RSS {allocate['peak_rss_mb']:.0f} MB misses the 64 MB block"
+    assert fail["stage"] == "probe.fail" and fail["status"] == "failed", "❌ Failed stage not marked failed"
+
+    with instrumentation.get_engine().connect() as conn:
+        stored = conn.execute(
+            text(f"SELECT stage, status FROM {instrumentation.STATS_TABLE} WHERE run_id = :run ORDER BY started_at"),
+            {"run": allocate["run_id"]},
+        ).all()
+    assert [tuple(r) for r in stored] == [("probe.allocate", "ok"), ("probe.fail", "failed")], (
+        f"❌ pipeline_run_stats does not match the artifact: {stored}"
+    )
+
+
+def test_run_sql_files_times_each_statement(stats_run, tmp_path):
+    """Every statement is a step with its row count, under one stage record"""
+    script = tmp_path / "probe.sql"
+    script.write_text("""
+        -- probe; created and dropped in one transaction
+        CREATE TABLE instrumentation_probe (n INT);
+        INSERT INTO instrumentation_probe SELECT g FROM generate_series(1, 3) g;
+        UPDATE instrumentation_probe SET n = n + 1 WHERE n > 1;
+        DROP TABLE instrumentation_probe;
+    """)
+    instrumentation.run_sql_files("probe.sql_stage", [str(script)])
+
+    records = stats_run()
+    steps = [r for r in records if r["step"]]
+    total = [r for r in records if not r["step"]]
+    assert [s["step"].split(" ")[0] for s in steps] == [f"probe.sql:{i}" for i in range(1, 5)], (
+        f"❌ Unexpected steps: {[s['step'] for s in steps]}"
+    )
+    assert [s["rows_out"] for s in steps[1:3]] == [3, 2], "❌ INSERT/UPDATE row counts not recorded"
+    assert len(total) == 1 and total[0]["rows_out"] == 5, "❌ Stage total should sum the statement row counts"
+
+
+def _busy_work():
+    return sum(i * i for i in range(300_000))
+
+
+def test_concurrent_stages_charge_own_thread(stats_run):
+    """Sibling stages in threads get their own thread's CPU and no peak RSS; the enclosing stage keeps both"""
+    def busy():
+        with instrumentation.stage("probe.busy"):
+            deadline = time.perf_counter() + 0.4
+            while time.perf_counter() < deadline:
+                _busy_work()
+
+    def idle():
+        with instrumentation.stage("probe.idle"):
+            time.sleep(0.4)
+
+    with instrumentation.stage("probe.outer"):
+        threads = [threading.Thread(target=busy), threading.Thread(target=idle)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    records = {r["stage"]: r for r in stats_run()}
+    log.info({s: (r["cpu_seconds"], r["peak_rss_mb"]) for s, r in records.items()})
+    assert records["probe.idle"]["cpu_seconds"] < 0.1, (
+        f"❌ Sleeping stage charged {records['probe.idle']['cpu_seconds']:.2f}s of its sibling's CPU"
+    )
+    assert records["probe.busy"]["cpu_seconds"] > 0.2, "❌ Busy stage lost its own CPU time"
+    assert records["probe.busy"]["peak_rss_mb"] is None and records["probe.idle"]["peak_rss_mb"] is None, (
+        "❌ Concurrent stages reported a process-wide peak RSS"
+    )
+    outer = records["probe.outer"]
+    assert outer["peak_rss_mb"] is not None, "❌ Enclosing stage lost its peak RSS"
+    assert outer["cpu_seconds"] >= records["probe.busy"]["cpu_seconds"] * 0.9, "❌ Enclosing stage misses its threads' CPU"
+
+
+@pytest.mark.parametrize("mode, suffix", [("cprofile", ".prof"), ("sample", ".folded")])
+def test_profile_hook(stats_run, tmp_path, monkeypatch, mode, suffix):
+    """PIPELINE_PROFILE picks the stage; the profile lands next to the JSON artifact"""
+    monkeypatch.setattr(instrumentation, "PROFILE_STAGE", "probe.prof*")
+    monkeypatch.setattr(instrumentation, "PROFILE_MODE", mode)
+    monkeypatch.setattr(instrumentation, "SAMPLE_INTERVAL", 0.001)
+
+    with instrumentation.stage("probe.unprofiled"):
+        _busy_work()
+    with instrumentation.stage("probe.profiled"):
+        for _ in range(5):
+            _busy_work()
+
+    profiles = sorted(p.name for p in tmp_path.iterdir() if p.suffix == suffix)
+    assert len(profiles) == 1 and "probe.profiled" in profiles[0], f"❌ Expected one profile, got {profiles}"
+    if mode == "sample":
+        folded = (tmp_path / profiles[0]).read_text()
+        assert "_busy_work" in folded, "❌ Sampled stacks miss the busy function"
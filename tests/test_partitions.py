@@ -0,0 +1,109 @@
+"""
+Partitioning Tests:
+raw_sales and fact_sales are range-partitioned by order month, date-bounded
+queries prune to the matching partitions, and a full COPY load replaces
+only the months whose content changed. Reload checks run inside a
+transaction that is rolled back.
+"""
+
+import logging
+import os
+import pandas as pd
+
+from etl import load_data
+
+log = logging.getLogger("tests.partitions")
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "train.csv")
+
+PARTITIONS = """
+    SELECT c.relname, c.oid
+    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = to_regclass(%(parent)s)
+    ORDER BY c.relname
+"""
+
+
+def _scanned_tables(plan):
+    """Relation names read anywhere in an EXPLAIN (FORMAT JSON) plan"""
+    found = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for child in plan.get("Plans", []):
+        found |= _scanned_tables(child)
+    return found
+
+
+def _explain(engine, sql):
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        conn.rollback()
+    return _scanned_tables(plan[0]["Plan"])
+
+
+def test_tables_partitioned_by_month(engine):
+    """One partition per order month, for both the landing and the fact table"""
+    checks = {
+        "raw_sales": "SELECT COUNT(DISTINCT DATE_TRUNC('month', \"Order Date\")) FROM raw_sales",
+        "fact_sales": "SELECT COUNT(DISTINCT DATE_TRUNC('month', order_date)) FROM fact_sales",
+    }
+    for table, months_sql in checks.items():
+        kind = pd.read_sql(f"SELECT relkind FROM pg_class WHERE relname = '{table}'", engine)["relkind"].tolist()
+        assert kind == ["p"], f"❌ {table} should be a partitioned table, got relkind {kind}"
+        parts = pd.read_sql(PARTITIONS, engine, params={"parent": table})
+        months = pd.read_sql(months_sql, engine).iloc[0, 0]
+        log.info(f"{table}: {len(parts)} partitions, {months} months of data")
+        assert len(parts) == months, f"❌ {table} has {len(parts)} partitions for {months} months"
+        assert parts["relname"].str.fullmatch(rf"{table}_y\d{{4}}m\d{{2}}").all(), f"❌ Bad partition names: {parts['relname'].tolist()}"
+
+
+def test_date_predicates_prune_partitions(engine):
+    """EXPLAIN only lists the partitions a date range can hit"""
+    fact = _explain(engine, """
+        SELECT SUM(sales) FROM fact_sales
+        WHERE order_date >= '2017-03-01' AND order_date < '2017-04-01'
+    """)
+    log.info(f"fact_sales March 2017 scans {sorted(fact)}")
+    assert fact == {"fact_sales_y2017m03"}, f"❌ fact_sales not pruned to one month: {sorted(fact)}"
+
+    raw = _explain(engine, """
+        SELECT COUNT(*) FROM raw_sales
+        WHERE "Order Date" BETWEEN '2016-01-01' AND '2016-03-31'
+    """)
+    log.info(f"raw_sales Q1 2016 scans {sorted(raw)}")
+    assert raw == {"raw_sales_y2016m01", "raw_sales_y2016m02", "raw_sales_y2016m03"}, (
+        f"❌ raw_sales not pruned to Q1 2016: {sorted(raw)}"
+    )
+
+    cohort = _explain(engine, """
+        SELECT customer_key, COUNT(*) FROM fact_sales
+        WHERE order_date >= DATE '2018-12-01' GROUP BY customer_key
+    """)
+    assert cohort == {"fact_sales_y2018m12"}, f"❌ Open-ended range not pruned: {sorted(cohort)}"
+
+
+def test_reload_replaces_only_changed_months(engine):
+    """An edit in one month swaps that partition and leaves the others untouched"""
+    df = load_data.clean_csv(CSV_PATH)
+    month = pd.Timestamp("2017-06-01")
+    edited = df.copy()
+    in_month = edited["Order Date"].dt.to_period("M").dt.start_time == month
+    edited.loc[edited.index[in_month][0], "Sales"] += 100
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            load_data.load_copy(df, conn)  # full load: records the month hashes
+            before = dict(conn.exec_driver_sql(PARTITIONS, {"parent": "raw_sales"}).fetchall())
+
+            load_data.load_copy(edited, conn)
+            after = dict(conn.exec_driver_sql(PARTITIONS, {"parent": "raw_sales"}).fetchall())
+            reloaded = conn.exec_driver_sql("SELECT month FROM raw_sales_reloaded_months").scalars().all()
+            total = conn.exec_driver_sql('SELECT SUM("Sales") FROM raw_sales').scalar()
+        finally:
+            trans.rollback()
+
+    replaced = sorted(name for name in before if after.get(name) != before[name])
+    log.info(f"Replaced partitions: {replaced}; reloaded months: {reloaded}")
+    assert before.keys() == after.keys(), "❌ Partition set changed"
+    assert replaced == ["raw_sales_y2017m06"], f"❌ Expected only June 2017 to be reloaded, got {replaced}"
+    assert [pd.Timestamp(m) for m in reloaded] == [month], f"❌ Wrong reloaded months: {reloaded}"
+    assert abs(total - edited["Sales"].sum()) < 1e-6, "❌ raw_sales total differs from the edited feed"
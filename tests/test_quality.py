@@ -0,0 +1,106 @@
+"""
+Data-Quality Profiler Tests:
+Each table is profiled with exactly one query, the aggregate counts match
+a hand-built table, violations (per table and cross-table) are reported,
+and a run is persisted to dq_results under its own run_id.
+"""
+
+import copy
+import datetime
+import logging
+from sqlalchemy import event, text
+
+from db import quality
+
+log = logging.getLogger("tests.quality")
+
+
+def test_one_query_per_table(engine):
+    """Profiling every table issues exactly one statement that reads each of them"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with engine.connect() as conn:
+            profiles = quality.profile_tables(conn)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    log.info(f"{len(statements)} statements for {len(profiles)} tables")
+    for table in quality.PROFILES:
+        reads = [s for s in statements if f'FROM "{table}"' in s]
+        assert len(reads) == 1, f"❌ {table} read by {len(reads)} statements, expected one scan"
+
+
+def test_profile_counts(engine):
+    """NULL, negative, duplicate-key, date and revenue aggregates on a known table"""
+    spec = {
+        "nulls": ["id", "amount"],
+        "negative": "amount < 0",
+        "key": ["id", "sku"],
+        "date": "day",
+        "revenue": "amount",
+        "checks": {"big": "amount > 100"},
+    }
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TEMP TABLE dq_probe (id TEXT, sku TEXT, day DATE, amount NUMERIC)"))
+        conn.execute(text("""
+            INSERT INTO dq_probe VALUES
+                ('a', 'x', '2018-01-05', 10), ('a', 'x', '2018-01-06', 20),
+                ('b', 'x', '2018-01-01', -5), (NULL, 'y', '2018-02-01', 200),
+                ('c', 'y', '2018-01-09', NULL)
+        """))
+        p = quality.profile_table(conn, "dq_probe", spec)
+        conn.execute(text("DROP TABLE dq_probe"))
+
+    assert p["row_count"] == 5, "❌ Wrong row count"
+    assert p["nulls"] == {"id": 1, "amount": 1}, f"❌ Wrong NULL counts {p['nulls']}"
+    assert p["negative_count"] == 1, "❌ Wrong negative count"
+    assert p["duplicate_keys"] == 1, "❌ ('a', 'x') appears twice: one duplicate row"
+    assert (p["min_date"], p["max_date"]) == (datetime.date(2018, 1, 1), datetime.date(2018, 2, 1)), "❌ Wrong date bounds"
+    assert p["revenue"] == 225, f"❌ Wrong revenue total {p['revenue']}"
+    assert p["checks"] == {"big": 1}, f"❌ Wrong check counts {p['checks']}"
+
+
+def test_failures_reported(profile):
+    """A clean profile passes; injected per-table and cross-table problems are each reported"""
+    assert quality.failures(profile) == [], f"❌ Current tables fail checks: {quality.failures(profile)}"
+
+    broken = copy.deepcopy(profile)
+    broken["raw_sales"]["nulls"]["Order ID"] = 3
+    broken["raw_sales"]["duplicate_keys"] = 2
+    broken["kpi_daily"]["revenue"] += 1
+    broken["forecast_revenue"]["min_date"] = broken["kpi_daily"]["max_date"]
+    broken["dim_customer"]["checks"]["unexpected_region"] = 4
+    del broken["cohort_analysis"]
+
+    problems = quality.failures(broken)
+    log.info("Reported:\n" + "\n".join(problems))
+    for needle in ["NULL Order ID", "duplicate", "kpi_daily revenue", "forecast_revenue starts",
+                   "unexpected_region", "cohort_analysis is missing"]:
+        assert any(needle in p for p in problems), f"❌ '{needle}' not reported"
+
+
+def test_results_persisted_by_run(engine, profile):
+    """Each run appends one row per table under a fresh run_id"""
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            first = quality.write_results(conn, profile)
+            second = quality.write_results(conn, profile)
+            rows = conn.execute(
+                text(f"SELECT run_id, table_name, row_count FROM {quality.RESULTS_TABLE} WHERE run_id IN (:a, :b)"),
+                {"a": first, "b": second},
+            ).all()
+        finally:
+            trans.rollback()
+
+    assert second > first, "❌ run_id should increase per run"
+    assert len(rows) == 2 * len(profile), f"❌ Expected {2 * len(profile)} rows, got {len(rows)}"
+    raw = {r.run_id: r.row_count for r in rows if r.table_name == "raw_sales"}
+    assert raw == {first: profile["raw_sales"]["row_count"], second: profile["raw_sales"]["row_count"]}, (
+        "❌ Persisted row counts differ from the profile"
+    )
@@ -0,0 +1,104 @@
+"""
+Sales Rollup Tests:
+sales_rollup agrees with the fact table at every grain, its HLL sketches
+estimate distinct customers closely and merge exactly, and dashboard
+slices are served by the primary key index.
+"""
+
+import logging
+import pandas as pd
+
+log = logging.getLogger("tests.sales_rollup")
+
+ALL_SLICE = "region = 'All' AND segment = 'All' AND category = 'All' AND ship_mode = 'All'"
+
+
+def test_rollup_totals_match_kpi_daily(engine):
+    """Day-grain 'All' cells carry the same revenue/orders as kpi_daily"""
+    df = pd.read_sql(f"""
+        SELECT k.order_date, k.total_revenue, k.total_orders, k.unique_customers,
+               r.revenue, r.orders, r.customers
+        FROM kpi_daily k
+        FULL OUTER JOIN (SELECT * FROM sales_rollup WHERE grain = 'day' AND {ALL_SLICE}) r
+            ON r.period_start = k.order_date
+    """, engine)
+    assert df["revenue"].notna().all() and df["total_revenue"].notna().all(), "❌ Rollup days differ from kpi_daily"
+    assert (df["revenue"].astype(float) - df["total_revenue"].astype(float)).abs().max() < 1e-6, "❌ Revenue mismatch"
+    assert (df["orders"] == df["total_orders"]).all(), "❌ Order count mismatch vs kpi_daily"
+    # Linear-counting range: small daily counts are estimated (near) exactly
+    error = (df["customers"] - df["unique_customers"]).abs()
+    log.info(f"Daily distinct-customer estimate: max abs error {error.max()}")
+    assert error.max() <= 1, "❌ HLL daily customer estimate off by more than 1"
+
+
+def test_rollup_slice_matches_fact_scan(engine):
+    """Month x region x category slice == the fact/dimension join it replaces"""
+    expected = pd.read_sql("""
+        SELECT DATE_TRUNC('month', f.order_date)::DATE AS period_start, c.region, p.category,
+               SUM(f.sales) AS revenue, COUNT(DISTINCT f.order_key) AS orders,
+               COUNT(DISTINCT f.customer_key) AS exact_customers
+        FROM fact_sales f
+        JOIN dim_customer c ON c.customer_key = f.customer_key
+        JOIN dim_product p ON p.product_key = f.product_key
+        GROUP BY 1, 2, 3
+    """, engine)
+    actual = pd.read_sql("""
+        SELECT period_start, region, category, revenue, orders, customers
+        FROM sales_rollup
+        WHERE grain = 'month' AND segment = 'All' AND ship_mode = 'All'
+          AND region <> 'All' AND category <> 'All'
+    """, engine)
+    merged = expected.merge(actual, on=["period_start", "region", "category"], how="outer", indicator=True)
+    assert (merged["_merge"] == "both").all(), "❌ Rollup cells differ from the fact scan"
+    assert (merged["revenue_x"].astype(float) - merged["revenue_y"].astype(float)).abs().max() < 1e-6, "❌ Revenue mismatch"
+    assert (merged["orders_x"] == merged["orders_y"]).all(), "❌ Order count mismatch"
+    # Small cells can lose a customer to a register collision: allow 2 or 5 percent
+    error = (merged["customers"] - merged["exact_customers"]).abs()
+    allowed = (merged["exact_customers"] * 0.05).clip(lower=2)
+    log.info(f"Slice distinct-customer estimate: max abs error {error.max()}")
+    assert (error <= allowed).all(), f"❌ HLL estimates off:\n{merged[error > allowed].head()}"
+
+
+def test_hll_sketches_merge_exactly(engine):
+    """Union of a month's day sketches == the month sketch; estimate close to exact"""
+    df = pd.read_sql(f"""
+        SELECT m.period_start, m.customers_hll = d.merged AS same_sketch,
+               hll_cardinality(d.merged) AS merged_estimate
+        FROM sales_rollup m
+        JOIN (
+            SELECT DATE_TRUNC('month', period_start)::DATE AS month, hll_union_agg(customers_hll) AS merged
+            FROM sales_rollup
+            WHERE grain = 'day' AND {ALL_SLICE}
+            GROUP BY 1
+        ) d ON d.month = m.period_start
+        WHERE m.grain = 'month' AND {ALL_SLICE}
+    """, engine)
+    assert not df.empty, "❌ No monthly rollup rows"
+    assert df["same_sketch"].all(), "❌ Merged day sketches differ from the month sketch"
+
+    total = pd.read_sql(f"""
+        SELECT hll_cardinality(hll_union_agg(customers_hll)) AS estimate,
+               (SELECT COUNT(DISTINCT customer_key) FROM fact_sales) AS exact
+        FROM sales_rollup WHERE grain = 'month' AND {ALL_SLICE}
+    """, engine).iloc[0]
+    log.info(f"All-time customers: estimate={total['estimate']}, exact={total['exact']}")
+    assert abs(total["estimate"] - total["exact"]) / total["exact"] < 0.05, "❌ Merged estimate off by more than 5%"
+
+
+def test_rollup_slice_uses_index(engine):
+    """A dashboard slice over a date range is an index lookup, not a scan"""
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql("""
+            EXPLAIN (FORMAT JSON)
+            SELECT period_start, revenue, orders, customers
+            FROM sales_rollup
+            WHERE grain = 'week' AND region = 'West' AND segment = 'All'
+              AND category = 'Technology' AND ship_mode = 'All'
+              AND period_start BETWEEN '2017-01-01' AND '2017-12-31'
+        """).scalar()
+        conn.rollback()
+    node = plan[0]["Plan"]
+    log.info(f"Slice plan: {node['Node Type']} on {node.get('Index Name')}")
+    assert node["Node Type"] == "Index Scan" and node["Index Name"] == "sales_rollup_pkey", (
+        f"❌ Slice not served by the primary key index: {node['Node Type']} {node.get('Index Name')}"
+    )
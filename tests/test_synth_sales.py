@@ -0,0 +1,78 @@
+"""
+Synthetic Feed Tests:
+The generator is deterministic per seed, scales orders and customers,
+keeps train.csv's order sizes and monthly seasonality, and its duplicate
+and dirty rows are what the ETL merges and drops.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import synth_sales
+from etl import load_data
+
+log = logging.getLogger("tests.synth_sales")
+
+SCALE = 3
+
+
+@pytest.fixture(scope="module")
+def feed(tmp_path_factory):
+    """A 3x feed with extra dirty rows, plus its summary"""
+    out = tmp_path_factory.mktemp("synth") / "synth.csv"
+    summary = synth_sales.generate(SCALE, out, seed=7, dirty_rate=0.005)
+    return out, summary
+
+
+def test_deterministic_per_seed(feed, tmp_path):
+    """Same seed, same bytes; another seed, another feed"""
+    out, _ = feed
+    again, other = tmp_path / "again.csv", tmp_path / "other.csv"
+    synth_sales.generate(SCALE, again, seed=7, dirty_rate=0.005)
+    synth_sales.generate(SCALE, other, seed=8, dirty_rate=0.005)
+    assert again.read_bytes() == out.read_bytes(), "❌ Same seed produced a different feed"
+    assert other.read_bytes() != out.read_bytes(), "❌ Different seeds produced the same feed"
+
+
+def test_distributions_preserved(feed):
+    """Scaled orders and customers, train.csv's items per order and monthly shape"""
+    out, summary = feed
+    real = pd.read_csv(synth_sales.CSV_PATH, dtype=str, keep_default_na=False)
+    synth = pd.read_csv(out, dtype=str, keep_default_na=False)
+    assert len(synth) == summary["rows"], "❌ Summary row count differs from the file"
+    assert summary["orders"] == SCALE * real["Order ID"].nunique(), "❌ Order count should scale"
+    assert synth["Customer ID"].nunique() > 2 * real["Customer ID"].nunique(), "❌ Customers should scale with the feed"
+
+    real_size = real.groupby("Order ID").size().mean()
+    synth_size = synth[synth["Order ID"] != ""].groupby("Order ID").size().mean()
+    log.info(f"Items per order: real {real_size:.3f}, synthetic {synth_size:.3f}")
+    assert synth_size == pytest.approx(real_size, rel=0.05), "❌ Items per order drifted"
+
+    def monthly(df):
+        return df["Order Date"].str[-7:].value_counts().sort_index()
+
+    m_real, m_synth = monthly(real), monthly(synth).reindex(monthly(real).index)
+    corr = np.corrcoef(m_real, m_synth)[0, 1]
+    log.info(f"Monthly order-line correlation: {corr:.3f}")
+    assert corr > 0.95, f"❌ Monthly seasonality lost (correlation {corr:.3f})"
+
+
+def test_dirty_and_duplicate_rows(feed):
+    """The ETL drops every dirty row and merges the duplicate order lines"""
+    out, summary = feed
+    assert summary["duplicate_lines"] > 0, "❌ No duplicate order lines"
+    assert all(summary["dirty_rows"].values()), f"❌ Some dirty kinds missing: {summary['dirty_rows']}"
+
+    df = load_data.clean(load_data.read_sales_csv(str(out)))
+    dropped = summary["rows"] - len(df)
+    assert dropped == sum(summary["dirty_rows"].values()), (
+        f"❌ clean() dropped {dropped} rows, expected the {sum(summary['dirty_rows'].values())} dirty ones"
+    )
+    assert (df["Sales"] >= 0).all(), "❌ Negative Sales in the synthetic feed"
+    merged = len(df) - len(load_data.aggregate_duplicates(df))
+    # A dirty row can hit a duplicate line, so a few may be dropped rather than merged
+    assert summary["duplicate_lines"] - sum(summary["dirty_rows"].values()) <= merged <= summary["duplicate_lines"], (
+        f"❌ Merged {merged} rows, expected about {summary['duplicate_lines']} duplicate lines"
+    )
@@ -0,0 +1,163 @@
+"""
+Transform Graph Tests:
+Every db/transform/ file is a node, nodes run after their upstream nodes,
+independent nodes overlap on separate connections, a failure skips only
+its downstream nodes, and the full graph rebuilds the tables in place of
+the old ones without dropping the actual_vs_forecast materialized view
+(adding the kpi_daily primary key older databases lack).
+The real graph runs in the etl_schema scratch schema (tests/conftest.py)
+over a copy of raw_sales and forecast_revenue; the live tables are never
+rebuilt.
+"""
+
+import logging
+import os
+import threading
+import time
+import pytest
+from sqlalchemy import text
+
+from db import transform_graph
+from db.engine import get_engine
+from pipeline.instrumentation import run_sql_files
+
+log = logging.getLogger("tests.transform_graph")
+
+
+def test_graph_matches_sql_files():
+    """One SQL file per node, and every node's upstream nodes come first"""
+    files = {f[:-4] for f in os.listdir(transform_graph.TRANSFORM_DIR) if f.endswith(".sql")}
+    assert files == set(transform_graph.TRANSFORM_GRAPH), f"❌ Nodes and db/transform/ files differ: {files}"
+
+    order = transform_graph.topological_order()
+    for node, upstream in transform_graph.TRANSFORM_GRAPH.items():
+        assert all(order.index(up) < order.index(node) for up in upstream), f"❌ {node} ordered before its inputs"
+    with pytest.raises(ValueError):
+        transform_graph.topological_order({"a": ["b"], "b": ["a"]})
+
+
+def test_critical_path():
+    """The longest chain by time, not the longest by node count"""
+    graph = {"a": [], "b": ["a"], "c": ["b"], "d": ["a"]}
+    path, seconds = transform_graph.critical_path(graph, {"a": 1.0, "b": 1.0, "c": 1.0, "d": 5.0})
+    assert (path, seconds) == (["a", "d"], 6.0), f"❌ Wrong critical path {path} ({seconds}s)"
+
+
+def test_independent_nodes_overlap(engine):
+    """Two independent 0.5s nodes take about 0.5s together, each on its own backend"""
+    backends, lock = {}, threading.Lock()
+
+    def runner(node):
+        with engine.connect() as conn:
+            pid = conn.execute(text("SELECT pg_backend_pid()")).scalar()
+            conn.execute(text("SELECT pg_sleep(0.5)"))
+        with lock:
+            backends[node] = pid
+
+    graph = {"first": [], "left": ["first"], "right": ["first"], "last": ["left", "right"]}
+    started = time.perf_counter()
+    seconds = transform_graph.run_graph(graph, workers=2, runner=runner, stage_name="probe.graph")
+    elapsed = time.perf_counter() - started
+    log.info(f"Graph of 4 x 0.5s nodes: {elapsed:.2f}s, serial {sum(seconds.values()):.2f}s")
+    assert elapsed < 1.8, f"❌ left/right did not overlap ({elapsed:.2f}s for a 1.5s critical path)"
+    assert backends["left"] != backends["right"], "❌ Concurrent nodes shared one connection"
+
+
+def test_failure_skips_downstream_only():
+    """A failed node's dependents never run; the independent branch still does"""
+    ran = []
+
+    def runner(node):
+        if node == "broken":
+            raise RuntimeError("boom")
+        ran.append(node)
+
+    graph = {"root": [], "broken": ["root"], "after_broken": ["broken"], "sibling": ["root"]}
+    with pytest.raises(ValueError, match="broken"):
+        transform_graph.run_graph(graph, workers=2, runner=runner, stage_name="probe.graph")
+    assert sorted(ran) == ["root", "sibling"], f"❌ Unexpected nodes ran: {ran}"
+
+
+@pytest.fixture
+def graph_inputs(engine, etl_schema):
+    """The graph's inputs copied into the scratch schema: raw_sales, forecast_revenue and its version stamp"""
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE {etl_schema}.raw_sales AS SELECT * FROM public.raw_sales"))
+        conn.execute(text(f"CREATE TABLE {etl_schema}.forecast_revenue AS SELECT * FROM public.forecast_revenue"))
+        conn.execute(text(f"CREATE TABLE {etl_schema}.pipeline_state (LIKE public.pipeline_state INCLUDING ALL)"))
+        conn.execute(text(f"""
+            INSERT INTO {etl_schema}.pipeline_state
+            SELECT * FROM public.pipeline_state WHERE key = 'forecast_revenue.version'
+        """))
+    return etl_schema
+
+
+def test_full_graph_rebuilds_tables(graph_inputs):
+    """The real graph runs end to end and leaves every node's table populated"""
+    seconds = transform_graph.run_graph()
+    assert set(seconds) == set(transform_graph.TRANSFORM_GRAPH), "❌ Not every node ran"
+    with get_engine().connect() as conn:
+        for table in ["dim_customer", "dim_product", "fact_sales", "kpi_daily", "cohort_analysis", "sales_rollup"]:
+            rows = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+            assert rows > 0, f"❌ {table} is empty after the graph ran"
+
+
+def test_full_graph_adds_missing_kpi_daily_key(graph_inputs):
+    """A kpi_daily built before it had a primary key (duplicate days included) gets one on the next run"""
+    with get_engine().begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE kpi_daily (
+                order_date DATE, total_orders BIGINT, unique_customers BIGINT,
+                total_revenue NUMERIC, avg_order_value NUMERIC
+            )
+        """))
+        conn.execute(text("INSERT INTO kpi_daily VALUES ('2017-01-01', 1, 1, 1, 1), ('2017-01-01', 1, 1, 1, 1)"))
+
+    transform_graph.run_graph()
+    with get_engine().connect() as conn:
+        key = conn.execute(text("""
+            SELECT pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = 'kpi_daily'::regclass AND contype = 'p'
+        """)).scalar()
+        duplicates = conn.execute(text(
+            "SELECT COUNT(*) - COUNT(DISTINCT order_date) FROM kpi_daily"
+        )).scalar()
+    assert key == "PRIMARY KEY (order_date)", f"❌ kpi_daily primary key not added: {key!r}"
+    assert duplicates == 0, f"❌ {duplicates} duplicate kpi_daily days after the rebuild"
+
+
+def _join_view():
+    run_sql_files("join_actual_forecast", [os.path.join(transform_graph.DB_DIR, "join_actuals_forecast.sql")])
+
+
+def _view_storage(conn):
+    """(oid, relfilenode) of actual_vs_forecast: a plain REFRESH swaps the relfilenode, CONCURRENTLY keeps it"""
+    return tuple(conn.execute(text(
+        "SELECT oid, relfilenode FROM pg_class WHERE oid = 'actual_vs_forecast'::regclass"
+    )).one())
+
+
+def test_full_graph_keeps_actual_vs_forecast(graph_inputs):
+    """A full rebuild leaves the view in place, and the join step refreshes it concurrently"""
+    transform_graph.run_graph()
+    _join_view()
+    with get_engine().connect() as conn:
+        before = _view_storage(conn)
+
+    transform_graph.run_graph()
+    _join_view()
+    with get_engine().connect() as conn:
+        after = _view_storage(conn)
+        kpi_version = conn.execute(text("SELECT value FROM pipeline_state WHERE key = 'kpi_daily.version'")).scalar()
+        inputs = conn.execute(text("SELECT value FROM pipeline_state WHERE key = 'actual_vs_forecast.inputs'")).scalar()
+        missing = conn.execute(text("""
+            SELECT COUNT(*) FROM kpi_daily k
+            LEFT JOIN actual_vs_forecast v ON v.ds = k.order_date AND v.actual_revenue = k.total_revenue
+            WHERE v.ds IS NULL
+        """)).scalar()
+    assert after[0] == before[0], f"❌ actual_vs_forecast was recreated (OID {before[0]} -> {after[0]})"
+    assert after[1] == before[1], "❌ actual_vs_forecast was refreshed without CONCURRENTLY (relfilenode changed)"
+    assert inputs is not None and inputs.startswith(f"{kpi_version}|"), (
+        f"❌ Refresh did not record the new kpi_daily version ({inputs!r} vs {kpi_version!r})"
+    )
+    assert missing == 0, f"❌ {missing} kpi_daily days missing from the refreshed view"
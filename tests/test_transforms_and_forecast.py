@@ -1,6 +1,7 @@
 """
 Transformation & Forecast Tests:
 Ensure transformed KPI, cohort, and forecast tables are valid and consistent.
+Row, NULL and range checks run over the shared one-scan profile (db/quality.py).
 """
 
 import logging
@@ -10,26 +11,18 @@ log = logging.getLogger("tests.transforms_forecast")
 
 
 # KPI Table Tests
-def test_kpi_daily_not_empty(engine):
+def test_kpi_daily_not_empty(profile):
     """kpi_daily should have rows"""
-    df = pd.read_sql("SELECT COUNT(*) AS cnt FROM kpi_daily", engine)
-    log.info(f"kpi_daily row count = {df['cnt'].iloc[0]}")
-    assert df["cnt"].iloc[0] > 0, "❌ kpi_daily is empty"
+    count = profile["kpi_daily"]["row_count"]
+    log.info(f"kpi_daily row count = {count}")
+    assert count > 0, "❌ kpi_daily is empty"
 
 
-def test_kpi_daily_no_nulls(engine):
+def test_kpi_daily_no_nulls(profile):
     """kpi_daily should not contain NULLs"""
-    df = pd.read_sql("""
-        SELECT COUNT(*) AS cnt
-        FROM kpi_daily
-        WHERE order_date IS NULL
-           OR total_revenue IS NULL
-           OR total_orders IS NULL
-           OR unique_customers IS NULL
-           OR avg_order_value IS NULL
-    """, engine)
-    log.info(f"kpi_daily null violations = {df['cnt'].iloc[0]}")
-    assert df["cnt"].iloc[0] == 0, "❌ Found NULLs in kpi_daily"
+    nulls = profile["kpi_daily"]["nulls"]
+    log.info(f"kpi_daily null counts = {nulls}")
+    assert not any(nulls.values()), f"❌ Found NULLs in kpi_daily: {nulls}"
 
 
 # Cohort Analysis Tests
@@ -42,12 +35,11 @@ def test_cohort_analysis_structure(engine):
     assert required.issubset(set(df.columns)), "❌ cohort_analysis missing required columns"
 
 
-def test_cohort_retention_non_negative(engine):
+def test_cohort_retention_non_negative(profile):
     """Retained customers should never be negative"""
-    df = pd.read_sql("SELECT MIN(retained_customers) AS min_val FROM cohort_analysis", engine)
-    min_val = df["min_val"].iloc[0]
-    log.info(f"Minimum retained_customers = {min_val}")
-    assert min_val >= 0, "❌ Found negative retained_customers in cohort_analysis"
+    negatives = profile["cohort_analysis"]["negative_count"]
+    log.info(f"Negative retained_customers rows = {negatives}")
+    assert negatives == 0, "❌ Found negative retained_customers in cohort_analysis"
 
 
 # Forecast Table Tests
@@ -60,30 +52,18 @@ def test_forecast_has_required_columns(engine):
     assert required.issubset(set(df.columns)), "❌ forecast_revenue missing required columns"
 
 
-def test_forecast_length(engine):
+def test_forecast_length(profile):
     """Forecast should extend at least 1 day beyond history"""
-    last_actual = pd.read_sql(
-        "SELECT MAX(order_date) AS d FROM kpi_daily", engine
-    )["d"].iloc[0]
-    last_forecast = pd.read_sql(
-        "SELECT MAX(ds) AS d FROM forecast_revenue", engine
-    )["d"].iloc[0]
-
-    # Normalize both to Timestamps for safe comparison
-    last_actual = pd.to_datetime(last_actual)
-    last_forecast = pd.to_datetime(last_forecast)
+    last_actual = profile["kpi_daily"]["max_date"]
+    last_forecast = profile["forecast_revenue"]["max_date"]
 
     log.info(f"Last actual = {last_actual}, Last forecast = {last_forecast}")
     assert last_forecast > last_actual, "❌ Forecast table does not extend beyond history"
 
 
-def test_forecast_no_nulls(engine):
+def test_forecast_no_nulls(profile):
     """Forecast predictions should not be NULL"""
-    df = pd.read_sql("""
-        SELECT COUNT(*) AS cnt
-        FROM forecast_revenue
-        WHERE ds IS NULL OR yhat IS NULL OR yhat_lower IS NULL OR yhat_upper IS NULL
-    """, engine)
-    log.info(f"forecast_revenue null violations = {df['cnt'].iloc[0]}")
-    assert df["cnt"].iloc[0] == 0, "❌ Found NULL values in forecast_revenue"
+    nulls = profile["forecast_revenue"]["nulls"]
+    log.info(f"forecast_revenue null counts = {nulls}")
+    assert not any(nulls.values()), f"❌ Found NULL values in forecast_revenue: {nulls}"
 